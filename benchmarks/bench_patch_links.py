@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""db2qthelp - micro-benchmark for Db2QtHelp.patch_links.
+
+Builds synthetic documents with a growing number of images and reports the
+time needed for patching their links. The time per image should stay
+(roughly) constant when the link rewriting scales linearly.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports ---------------------------------------------------------------
+import sys
+import os
+import timeit
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+
+
+# --- functions -------------------------------------------------------------
+def build_document(num_images : int) -> str:
+    """Builds a synthetic HTML document referencing the given number of images
+
+    Args:
+        num_images (int): The number of (distinct) images to reference
+
+    Returns:
+        (str): The document
+    """
+    para = "<p>" + "Lorem ipsum dolor sit amet. " * 20 + "</p>\n"
+    parts = ["<html><body>\n"]
+    for i in range(num_images):
+        parts.append(para)
+        parts.append(f'<div class="mediaobject"><img src="images/screenshot{i}.png"></div>\n')
+    parts.append("</body></html>\n")
+    return "".join(parts)
+
+
+def main(arguments=None) -> int:
+    """Runs the benchmark for several scales and prints the results
+
+    Args:
+        arguments (List[str]): The scales (numbers of images) to test
+
+    Returns:
+        (int): The exit code (0 for success).
+    """
+    scales = [int(a) for a in arguments] if arguments else [250, 500, 1000, 2000, 4000]
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    print("images;bytes;seconds;us_per_image")
+    for scale in scales:
+        doc = build_document(scale)
+        number = 5
+        t = timeit.timeit(lambda: conv.patch_links(doc, "bench", set()), number=number) / number
+        print(f"{scale};{len(doc)};{t:.6f};{t*1e6/scale:.3f}")
+    return 0
+
+
+# -- main check
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
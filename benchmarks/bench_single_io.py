@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""db2qthelp - benchmark for processing large single HTML documents.
+
+Writes a single HTML document of the given size (see corpus.py) and
+measures the wall time and the peak resident memory of building it. Each
+build runs in an own process, so that the peak memory is not influenced by
+earlier runs. Another version of db2qthelp.py may be given for comparing
+the results.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports ---------------------------------------------------------------
+import sys
+import os
+import io
+import shutil
+import argparse
+import tempfile
+import time
+import resource
+import subprocess
+import contextlib
+import importlib.util
+from typing import List, Tuple
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import corpus
+
+
+# --- variables and constants -----------------------------------------------
+MODULE_PATH = os.path.join(os.path.split(__file__)[0], "..", "db2qthelp", "db2qthelp.py")
+
+
+# --- functions -------------------------------------------------------------
+def run_build(module_path : str, source : str, dst_folder : str) -> Tuple[float, int]:
+    """Builds the given document using the given version of db2qthelp
+
+    Args:
+        module_path (str): The path to db2qthelp.py
+        source (str): The single HTML document to build
+        dst_folder (str): The destination folder
+
+    Returns:
+        (Tuple[float, int]): The duration in seconds and the peak resident memory in kB
+    """
+    spec = importlib.util.spec_from_file_location("db2qthelp", module_path)
+    db2qthelp = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(db2qthelp)
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none")
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        conv.process(source, dst_folder, "bench")
+    return time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def measure(module_path : str, source : str, dst_folder : str, repeat : int) -> Tuple[float, int]:
+    """Builds the given document several times, each time in an own process
+
+    Args:
+        module_path (str): The path to db2qthelp.py
+        source (str): The single HTML document to build
+        dst_folder (str): The destination folder
+        repeat (int): The number of runs
+
+    Returns:
+        (Tuple[float, int]): The shortest duration in seconds and the largest peak resident memory in kB
+    """
+    best, peak = None, 0
+    for _ in range(repeat):
+        shutil.rmtree(dst_folder, ignore_errors=True)
+        output = subprocess.check_output([sys.executable, __file__, "--run", module_path, source, dst_folder], text=True)
+        seconds, rss = output.split()
+        best = float(seconds) if best is None else min(best, float(seconds))
+        peak = max(peak, int(rss))
+    return best, peak
+
+
+def main(arguments : List[str] = None) -> int:
+    """Runs the benchmark and prints the results
+
+    Args:
+        arguments (List[str]): A list of command line arguments.
+
+    Returns:
+        (int): The exit code (0 for success).
+    """
+    parser = argparse.ArgumentParser(prog='bench_single_io', description="measures processing a large single HTML document")
+    parser.add_argument("--size", dest="size", type=int, default=500, help="Sets the size of the document in MB")
+    parser.add_argument("--page-size", dest="page_size", type=int, default=2048, help="Sets the size of a section's text in bytes")
+    parser.add_argument("--repeat", dest="repeat", type=int, default=3, help="Sets the number of runs")
+    parser.add_argument("--compare", dest="compare", default=None, help="Sets another db2qthelp.py to measure")
+    parser.add_argument("--run", dest="run", nargs=3, default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(arguments)
+    if args.run is not None:
+        seconds, rss = run_build(*args.run)
+        print(f"{seconds} {rss}")
+        return 0
+    modules = [("current", MODULE_PATH)] + ([("compare", args.compare)] if args.compare is not None else [])
+    with tempfile.TemporaryDirectory(prefix="db2qthelp_bench_") as tmp_dir:
+        sections = max(1, args.size * (1 << 20) // (args.page_size + 256))
+        source = corpus.write_single_html(tmp_dir, sections, images=0, page_size=args.page_size)
+        size = os.path.getsize(source)
+        print("version;document_bytes;seconds;peak_rss_kb")
+        for name, module_path in modules:
+            seconds, rss = measure(module_path, source, os.path.join(tmp_dir, "out"), args.repeat)
+            print(f"{name};{size};{seconds:.3f};{rss}")
+    return 0
+
+
+# -- main check
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
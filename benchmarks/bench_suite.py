@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""db2qthelp - benchmark suite using synthetic corpora.
+
+Generates single HTML and chunked HTML corpora of several scales (see
+corpus.py) and measures complete builds using Db2QtHelp.process, with
+qhelpgenerator replaced by a stub, as well as the hot functions: link
+patching, rewriting the links of a single HTML document's sections,
+splitting a single HTML document, sorting the pages, and
+building the toc-section.
+
+Besides the durations, the growth exponent between consecutive scales is
+reported; values clearly above 1 hint at super-linear behaviour.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports ---------------------------------------------------------------
+import sys
+import os
+import io
+import json
+import math
+import random
+import shutil
+import argparse
+import tempfile
+import time
+import contextlib
+from typing import List, Dict, Callable
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+import corpus
+
+
+# --- functions -------------------------------------------------------------
+def write_qhelpgenerator_stub(folder : str) -> str:
+    """Writes a qhelpgenerator replacement that only creates its output file
+
+    Args:
+        folder (str): The folder to write the stub into
+
+    Returns:
+        (str): The folder containing the stub, None if stubs are not supported
+    """
+    if os.name!="posix": # pragma: no cover
+        return None
+    path = os.path.join(folder, "qhelpgenerator")
+    with open(path, "w", encoding="utf-8") as fdo:
+        fdo.write(f"#!{sys.executable}\nimport sys\nopen(sys.argv[sys.argv.index('-o')+1], 'wb').close()\n")
+    os.chmod(path, 0o755)
+    return folder
+
+
+def measure(function : Callable[[], None], repeat : int, setup : Callable[[], None] = None) -> float:
+    """Runs the given function several times and returns its best duration
+
+    Args:
+        function (Callable[[], None]): The function to measure
+        repeat (int): The number of runs
+        setup (Callable[[], None]): A function to run before each run, not measured
+
+    Returns:
+        (float): The shortest duration in seconds
+    """
+    best = None
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        function()
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def run_scale(tmp_dir : str, sections : int, args : argparse.Namespace, qt_path : str) -> List[Dict]:
+    """Runs all benchmarks for a single scale
+
+    Args:
+        tmp_dir (str): The folder to write the corpora and the outputs into
+        sections (int): The number of sections of the corpora
+        args (argparse.Namespace): The benchmark options
+        qt_path (str): The folder containing the qhelpgenerator stub, None if no Qt Help files shall be generated
+
+    Returns:
+        (List[Dict]): The results
+    """
+    results = []
+    folder = os.path.join(tmp_dir, str(sections))
+    single = corpus.write_single_html(os.path.join(folder, "single"), sections, args.depth, args.images, args.page_size, args.image_size)
+    chunked = corpus.write_chunked_html(os.path.join(folder, "chunked"), sections, args.depth, args.images, args.page_size, args.image_size)
+    conv = db2qthelp.Db2QtHelp(qt_path or "", "", None, None, jobs=args.jobs, qt_help="all" if qt_path else "none")
+    dst_folder = os.path.join(folder, "out")
+    # complete builds
+    for name, source in [("process_single", single), ("process_chunked", chunked)]:
+        with contextlib.redirect_stdout(io.StringIO()):
+            seconds = measure(lambda: conv.process(source, dst_folder, "bench"), args.repeat, lambda: shutil.rmtree(dst_folder, ignore_errors=True))
+        stages = { stage["stage"]: round(stage["wall"], 6) for stage in conv.timings }
+        results.append({ "benchmark": name, "sections": sections, "seconds": seconds, "stages": stages })
+    # hot functions
+    with open(single, encoding="utf-8") as fdi:
+        doc = fdi.read()
+    results.append({ "benchmark": "patch_links", "sections": sections, "seconds": measure(lambda: conv.patch_links(doc, "bench", set()), args.repeat) })
+    transformer = db2qthelp.PageTransformer("bench", "", {})
+    results.append({ "benchmark": "rewrite_links", "sections": sections, "seconds": measure(lambda: transformer.rewrite_links(doc, set()), args.repeat) })
+    pages = []
+    def split():
+        os.makedirs(dst_folder, exist_ok=True)
+        conv._process_single(single, dst_folder, pages, set(), "bench")
+    def reset_split():
+        shutil.rmtree(dst_folder, ignore_errors=True)
+        conv._previous = {}
+        pages.clear()
+    results.append({ "benchmark": "split_single", "sections": sections, "seconds": measure(split, args.repeat, reset_split) })
+    shuffled = list(pages)
+    random.Random(42).shuffle(shuffled)
+    results.append({ "benchmark": "sort_pages", "sections": sections, "seconds": measure(lambda: sorted(shuffled, key=lambda page: page[2]), args.repeat) })
+    results.append({ "benchmark": "build_toc_sections", "sections": sections, "seconds": measure(lambda: conv.build_toc_sections(pages), args.repeat) })
+    shutil.rmtree(folder, ignore_errors=True)
+    return results
+
+
+def add_exponents(results : List[Dict]) -> None:
+    """Adds the growth exponent relative to the previous scale of each benchmark
+
+    Args:
+        results (List[Dict]): The results ordered by scale
+    """
+    previous = {}
+    for result in results:
+        last = previous.get(result["benchmark"])
+        if last is not None and last["seconds"]>0 and result["seconds"]>0 and result["sections"]!=last["sections"]:
+            result["exponent"] = round(math.log(result["seconds"] / last["seconds"]) / math.log(result["sections"] / last["sections"]), 3)
+        else:
+            result["exponent"] = None
+        previous[result["benchmark"]] = result
+
+
+def main(arguments : List[str] = None) -> int:
+    """Runs the benchmark suite and prints the results
+
+    Args:
+        arguments (List[str]): A list of command line arguments.
+
+    Returns:
+        (int): The exit code (0 for success).
+    """
+    parser = argparse.ArgumentParser(prog='bench_suite', description="runs the db2qthelp benchmark suite")
+    parser.add_argument("scales", nargs="*", type=int, default=[1000, 2000, 4000, 8000], help="The numbers of sections to test")
+    parser.add_argument("--depth", dest="depth", type=int, default=3, help="Sets the maximum nesting depth of sections")
+    parser.add_argument("--images", dest="images", type=int, default=1, help="Sets the number of images per section")
+    parser.add_argument("--page-size", dest="page_size", type=int, default=2048, help="Sets the size of a section's text in bytes")
+    parser.add_argument("--image-size", dest="image_size", type=int, default=1024, help="Sets the size of an image in bytes")
+    parser.add_argument("--repeat", dest="repeat", type=int, default=3, help="Sets the number of runs per benchmark")
+    parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=1, help="Sets the number of parallel jobs")
+    parser.add_argument("--json", dest="json", default=None, help="Writes the results as JSON into the named file")
+    args = parser.parse_args(arguments)
+    results = []
+    with tempfile.TemporaryDirectory(prefix="db2qthelp_bench_") as tmp_dir:
+        qt_path = write_qhelpgenerator_stub(tmp_dir)
+        for sections in sorted(args.scales):
+            results.extend(run_scale(tmp_dir, sections, args, qt_path))
+    add_exponents(results)
+    print("benchmark;sections;seconds;us_per_section;exponent")
+    for result in results:
+        exponent = "" if result["exponent"] is None else f"{result['exponent']:.3f}"
+        print(f"{result['benchmark']};{result['sections']};{result['seconds']:.6f};{result['seconds']*1e6/result['sections']:.3f};{exponent}")
+    if args.json is not None:
+        with open(args.json, "w", encoding="utf-8") as fdo:
+            json.dump({ "db2qthelp": db2qthelp.__version__, "options": vars(args), "results": results }, fdo, indent=1)
+    return 0
+
+
+# -- main check
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
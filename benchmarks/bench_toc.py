@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""db2qthelp - benchmark for writing the QtHelp project (.qhp).
+
+Builds a synthetic, sorted list of pages and measures the time and the
+peak memory needed for building the toc-section as a string and for
+streaming the complete QtHelp project into a file.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports ---------------------------------------------------------------
+import sys
+import os
+import time
+import tempfile
+import tracemalloc
+from typing import List
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+
+
+# --- functions -------------------------------------------------------------
+def build_pages(num_pages : int) -> List[list]:
+    """Builds a sorted list of pages with chapters of 10 sections of 10 sub-sections each
+
+    Args:
+        num_pages (int): The number of pages to generate
+
+    Returns:
+        (List[list]): The pages
+    """
+    pages = []
+    for i in range(num_pages):
+        key = [i // 111 + 1]
+        if i % 111 != 0:
+            key.append((i % 111 - 1) // 11 + 1)
+            if (i % 111 - 1) % 11 != 0:
+                key.append((i % 111 - 1) % 11)
+        title = ".".join(str(k) for k in key) + ". Section & title " + str(i)
+        pages.append([f"page{i}.html", title, key])
+    return pages
+
+
+def measure(function) -> tuple:
+    """Runs the given function, measuring its duration and peak memory
+
+    Args:
+        function (Callable): The function to run
+
+    Returns:
+        (tuple): The duration in seconds and the peak memory in bytes
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    function()
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak
+
+
+def main(arguments=None) -> int:
+    """Runs the benchmark for several scales and prints the results
+
+    Args:
+        arguments (List[str]): The scales (numbers of pages) to test
+
+    Returns:
+        (int): The exit code (0 for success).
+    """
+    scales = [int(a) for a in arguments] if arguments else [10000, 25000, 50000, 100000]
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    print("pages;toc_string_seconds;toc_string_peak_bytes;qhp_stream_seconds;qhp_stream_peak_bytes")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for scale in scales:
+            pages = build_pages(scale)
+            t1, m1 = measure(lambda: conv.build_toc_sections(pages))
+            def stream():
+                with open(os.path.join(tmp_dir, "bench.qhp"), "w", encoding="utf-8") as fdo:
+                    conv.write_qhp(fdo, pages, "bench")
+            t2, m2 = measure(stream)
+            print(f"{scale};{t1:.4f};{m1};{t2:.4f};{m2}")
+    return 0
+
+
+# -- main check
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
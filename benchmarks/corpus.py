@@ -0,0 +1,248 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""db2qthelp - generator for synthetic benchmark corpora.
+
+Writes DocBook-like single HTML documents and chunked HTML folders of a
+configurable size: the number of sections, their nesting depth, the
+number of images referenced per page, and the size of the pages' text.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports ---------------------------------------------------------------
+import sys
+import os
+import argparse
+from typing import List, Tuple
+
+
+# --- variables and constants -----------------------------------------------
+FANOUT = 4
+
+PARAGRAPH = "<p>Lorem ipsum dolor sit amet, consectetur adipiscing elit &amp; sed do eiusmod tempor.</p>\n"
+
+GIF_HEADER = b"GIF89a\x01\x00\x01\x00\x80\x00\x00\x00\x00\x00\xff\xff\xff!\xf9\x04\x01\x00\x00\x00\x00,\x00\x00\x00\x00\x01\x00\x01\x00\x00\x02\x02D\x01\x00;"
+
+
+# --- functions -------------------------------------------------------------
+def outline(sections : int, depth : int) -> List[Tuple[int, ...]]:
+    """Returns the numbers of the sections in document order
+
+    Each section below the given depth has up to FANOUT sub-sections; the
+    number of chapters is not limited.
+
+    Args:
+        sections (int): The number of sections
+        depth (int): The maximum nesting depth (1 for chapters only)
+
+    Returns:
+        (List[Tuple[int, ...]]): The sections' numbers
+    """
+    numbers = []
+    number = (1,)
+    for _ in range(sections):
+        numbers.append(number)
+        if len(number)<depth:
+            number = number + (1,)
+            continue
+        while len(number)>1 and number[-1]==FANOUT:
+            number = number[:-1]
+        number = number[:-1] + (number[-1] + 1,)
+    return numbers
+
+
+def section_id(number : Tuple[int, ...]) -> str:
+    """Returns the DocBook ID of a section
+
+    Args:
+        number (Tuple[int, ...]): The section's number
+
+    Returns:
+        (str): The section's ID
+    """
+    return "s" + "_".join(str(n) for n in number)
+
+
+def section_title(number : Tuple[int, ...]) -> str:
+    """Returns the title of a section as generated by DocBook
+
+    Args:
+        number (Tuple[int, ...]): The section's number
+
+    Returns:
+        (str): The section's title
+    """
+    return ".".join(str(n) for n in number) + f". Section &amp; <code>{section_id(number)}</code>"
+
+
+def section_body(number : Tuple[int, ...], numbers : List[Tuple[int, ...]], index : int, images : int, page_size : int, chunked : bool = False) -> str:
+    """Returns the content of a section
+
+    The content consists of paragraphs up to the given size, references to
+    images, and a link to the next section.
+
+    Args:
+        number (Tuple[int, ...]): The section's number
+        numbers (List[Tuple[int, ...]]): The numbers of all sections
+        index (int): The section's position in the document
+        images (int): The number of images to reference
+        page_size (int): The (approximate) size of the text in bytes
+        chunked (bool): Whether the link points to a page instead of an anchor
+
+    Returns:
+        (str): The section's content
+    """
+    parts = [PARAGRAPH] * max(1, page_size // len(PARAGRAPH))
+    for i in range(images):
+        parts.append(f'<div class="mediaobject"><img src="images/{section_id(number)}_{i}.gif"></div>\n')
+    target = section_id(numbers[(index + 1) % len(numbers)])
+    href = f"{target}.html" if chunked else f"#{target}"
+    parts.append(f'<p>See <a class="link" href="{href}">{target}</a>.</p>\n')
+    return "".join(parts)
+
+
+def section_head(number : Tuple[int, ...]) -> str:
+    """Returns the opening of a section as generated by DocBook
+
+    Args:
+        number (Tuple[int, ...]): The section's number
+
+    Returns:
+        (str): The section's opening div-element and title
+    """
+    kind = "chapter" if len(number)==1 else f"sect{len(number)-1}"
+    level = min(len(number), 6)
+    return (f'<div class="{kind}">\n<div class="titlepage"><div><div><h{level} class="title">\n'
+        f'<a name="{section_id(number)}"></a>{section_title(number)}</h{level}></div></div></div>\n')
+
+
+def write_images(folder : str, numbers : List[Tuple[int, ...]], images : int, image_size : int) -> int:
+    """Writes the images referenced by the sections
+
+    Args:
+        folder (str): The folder to write the images into
+        numbers (List[Tuple[int, ...]]): The numbers of all sections
+        images (int): The number of images per section
+        image_size (int): The size of each image in bytes
+
+    Returns:
+        (int): The number of written images
+    """
+    os.makedirs(os.path.join(folder, "images"), exist_ok=True)
+    for number in numbers:
+        for i in range(images):
+            padding = f"{section_id(number)}_{i}".encode("utf-8")
+            data = GIF_HEADER + (padding * (image_size // len(padding) + 1))[:max(0, image_size-len(GIF_HEADER))]
+            with open(os.path.join(folder, "images", f"{section_id(number)}_{i}.gif"), "wb") as fdo:
+                fdo.write(data)
+    return len(numbers) * images
+
+
+def write_single_html(folder : str, sections : int, depth : int = 3, images : int = 1, page_size : int = 2048, image_size : int = 1024) -> str:
+    """Writes a single HTML document and the images it references
+
+    Args:
+        folder (str): The folder to write the corpus into
+        sections (int): The number of sections
+        depth (int): The maximum nesting depth
+        images (int): The number of images per section
+        page_size (int): The (approximate) size of each section's text in bytes
+        image_size (int): The size of each image in bytes
+
+    Returns:
+        (str): The path to the written document
+    """
+    os.makedirs(folder, exist_ok=True)
+    numbers = outline(sections, depth)
+    path = os.path.join(folder, "corpus.html")
+    with open(path, "w", encoding="utf-8") as fdo:
+        fdo.write('<html>\n<head>\n<meta http-equiv="Content-Type" content="text/html; charset=utf-8">\n<title>Benchmark</title>\n</head>\n')
+        fdo.write('<body><div class="book">\n<div class="titlepage"><div><div><h1 class="title">\n<a name="book"></a>Benchmark</h1></div></div><hr></div>\n')
+        open_sections = 0
+        for index, number in enumerate(numbers):
+            fdo.write("</div>\n" * (open_sections - len(number) + 1))
+            open_sections = len(number)
+            fdo.write(section_head(number))
+            fdo.write(section_body(number, numbers, index, images, page_size))
+        fdo.write("</div>\n" * open_sections)
+        fdo.write("</div></body></html>\n")
+    write_images(folder, numbers, images, image_size)
+    return path
+
+
+def write_chunked_html(folder : str, sections : int, depth : int = 3, images : int = 1, page_size : int = 2048, image_size : int = 1024) -> str:
+    """Writes a folder of chunked HTML pages and the images they reference
+
+    Each section is written as an own page, including the navigation links
+    generated by DocBook.
+
+    Args:
+        folder (str): The folder to write the corpus into
+        sections (int): The number of sections
+        depth (int): The maximum nesting depth
+        images (int): The number of images per section
+        page_size (int): The (approximate) size of each section's text in bytes
+        image_size (int): The size of each image in bytes
+
+    Returns:
+        (str): The path to the written folder
+    """
+    os.makedirs(folder, exist_ok=True)
+    numbers = outline(sections, depth)
+    names = [section_id(number) + ".html" for number in numbers]
+    with open(os.path.join(folder, "index.html"), "w", encoding="utf-8") as fdo:
+        fdo.write(f'<html><head><title>Benchmark</title><link rel="next" href="{names[0]}" title="next"></head><body><div class="book"></div></body></html>\n')
+    for index, number in enumerate(numbers):
+        up = section_id(number[:-1]) + ".html" if len(number)>1 else "index.html"
+        prev = names[index-1] if index>0 else "index.html"
+        links = f'<link rel="home" href="index.html" title="Benchmark"><link rel="up" href="{up}" title="up"><link rel="prev" href="{prev}" title="prev">'
+        if index+1<len(names):
+            links += f'<link rel="next" href="{names[index+1]}" title="next">'
+        with open(os.path.join(folder, names[index]), "w", encoding="utf-8") as fdo:
+            fdo.write(f'<html><head><meta http-equiv="Content-Type" content="text/html; charset="><title>{section_title(number)}</title>{links}</head><body>')
+            fdo.write(section_head(number))
+            fdo.write(section_body(number, numbers, index, images, page_size, True))
+            fdo.write("</div></body></html>\n")
+    write_images(folder, numbers, images, image_size)
+    return folder
+
+
+def main(arguments : List[str] = None) -> int:
+    """Writes a corpus using the options given on the command line
+
+    Args:
+        arguments (List[str]): A list of command line arguments.
+
+    Returns:
+        (int): The exit code (0 for success).
+    """
+    parser = argparse.ArgumentParser(prog='corpus', description="writes a synthetic db2qthelp benchmark corpus")
+    parser.add_argument("-o", "--output", dest="output", required=True, help="Sets the folder to write the corpus into")
+    parser.add_argument("--format", dest="format", choices=["single", "chunked"], default="single", help="Selects the kind of HTML to generate")
+    parser.add_argument("--sections", dest="sections", type=int, default=1000, help="Sets the number of sections")
+    parser.add_argument("--depth", dest="depth", type=int, default=3, help="Sets the maximum nesting depth of sections")
+    parser.add_argument("--images", dest="images", type=int, default=1, help="Sets the number of images per section")
+    parser.add_argument("--page-size", dest="page_size", type=int, default=2048, help="Sets the size of a section's text in bytes")
+    parser.add_argument("--image-size", dest="image_size", type=int, default=1024, help="Sets the size of an image in bytes")
+    args = parser.parse_args(arguments)
+    write = write_single_html if args.format=="single" else write_chunked_html
+    print(write(args.output, args.sections, args.depth, args.images, args.page_size, args.image_size))
+    return 0
+
+
+# -- main check
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -60,4 +60,22 @@ sect5     nop
 section   nop
 set       toc,title
 </xsl:param>
+
+<!-- index terms are kept as anchors carrying their terms; db2qthelp collects them as keywords -->
+<xsl:template match="indexterm">
+  <xsl:variable name="id">
+    <xsl:call-template name="object.id"/>
+  </xsl:variable>
+  <xsl:element name="a">
+    <xsl:attribute name="class">indexterm</xsl:attribute>
+    <xsl:attribute name="name"><xsl:value-of select="$id"/></xsl:attribute>
+    <xsl:attribute name="data-primary"><xsl:value-of select="normalize-space(primary)"/></xsl:attribute>
+    <xsl:if test="secondary">
+      <xsl:attribute name="data-secondary"><xsl:value-of select="normalize-space(secondary)"/></xsl:attribute>
+    </xsl:if>
+    <xsl:if test="tertiary">
+      <xsl:attribute name="data-tertiary"><xsl:value-of select="normalize-space(tertiary)"/></xsl:attribute>
+    </xsl:if>
+  </xsl:element>
+</xsl:template>
 </xsl:stylesheet>
@@ -26,7 +26,39 @@ import re
 import argparse
 import configparser
 import subprocess
-from typing import List, Set, Tuple
+import itertools
+import hashlib
+import json
+import time
+import copy
+import datetime
+import tempfile
+import pathlib
+import urllib.request
+import zipfile
+import io
+import html
+import contextlib
+import cProfile
+import sqlite3
+import struct
+import zlib
+import mmap
+import fnmatch
+import gzip
+import xml.etree.ElementTree
+import concurrent.futures
+import threading
+import queue
+from typing import List, Set, Tuple, Dict, NamedTuple, Callable, TextIO, Union, Iterator, Iterable
+try:
+    from lxml import etree
+except ImportError: # pragma: no cover
+    etree = None
+try:
+    import fcntl
+except ImportError: # pragma: no cover
+    fcntl = None
 
 
 # --- variables and constants -----------------------------------------------
@@ -91,9 +123,1389 @@ QCHP = """<?xml version="1.0" encoding="UTF-8"?>
 </QHelpCollectionProject>
 """
 
+SRC_PATTERN = re.compile(r'(src\s*=\s*")(.+?)"')
+SRC_BYTES_PATTERN = re.compile(SRC_PATTERN.pattern.encode("utf-8"))
+ANCHOR_LINK_PATTERN = re.compile(r'(<a\b[^>]*?\shref=")#([^"]*)"')
+ANCHOR_LINK_BYTES_PATTERN = re.compile(ANCHOR_LINK_PATTERN.pattern.encode("utf-8"))
+ANCHOR_NAME_PATTERN = re.compile(r'(?:<a name=|\sid=)"([^"]+)"')
+ANCHOR_NAME_BYTES_PATTERN = re.compile(ANCHOR_NAME_PATTERN.pattern.encode("utf-8"))
+
+TAG_PATTERN = re.compile(r"<[^>]*>")
+
+QHP_PLACEHOLDER_PATTERN = re.compile(r"(%toc%|%keywords%|%appname%)")
+
+SECTION_PATTERN = re.compile(r'<div class="(?:chapter|appendix|sect([0-9]+))">')
+SECTION_BYTES_PATTERN = re.compile(SECTION_PATTERN.pattern.encode("utf-8"))
+MAPPING_RELEASE_SIZE = 1 << 22
+READ_CHUNK_SIZE = 1 << 16
+
+HEAD_LINK_PATTERN = re.compile(r'<link rel="(up|prev|next)" href="([^"]*)"')
+
+MANIFEST_NAME = ".db2qthelp-manifest.json"
+
+SEARCH_INDEX_SUFFIX = ".search.json.gz"
+SEARCH_INDEX_VERSION = 1
+WORD_PATTERN = re.compile(r"\w+")
+NON_TEXT_PATTERN = re.compile(r"<(style|script)\b.*?</\1>", re.DOTALL | re.IGNORECASE)
+
+INDEXTERM_PATTERN = re.compile(r'<a class="indexterm"[^>]*>')
+ATTRIBUTE_PATTERN = re.compile(r"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)')""")
+GLOSSTERM_PATTERN = re.compile(r'<dt>\s*(?:<a name="([^"]*)"></a>)?\s*<span class="glossterm">(.*?)</span>', re.DOTALL)
+# pages without these (encoded) markers have no keywords (see page_keywords)
+KEYWORD_MARKERS = [b'<a class="indexterm"', b'<span class="glossterm">']
+
+XINCLUDE_PATTERN = re.compile(r"""<(?:[\w.-]+:)?include\b[^>]*?\bhref\s*=\s*["']([^"']+)["']""")
+WATCH_INTERVAL = 0.1
+WATCH_DEBOUNCE = 0.25
+
+PAGE_CACHE_SIZE = 256 << 20
+PAGE_CACHE_HEADER = struct.Struct(">I")
+
+WRITE_QUEUE_SIZE = 64
+CHUNK_POLL_INTERVAL = 0.01
+
+QT_HELP_MODES = ["all", "qch", "qhc", "none"]
+
+XSLT_BACKENDS = ["xsltproc", "lxml"]
+
+QT_HELP_BACKENDS = ["qhelpgenerator", "native"]
+
+QCH_TABLES = [
+    "CREATE TABLE NamespaceTable (Id INTEGER PRIMARY KEY, Name TEXT)",
+    "CREATE TABLE FilterAttributeTable (Id INTEGER PRIMARY KEY, Name TEXT)",
+    "CREATE TABLE FilterNameTable (Id INTEGER PRIMARY KEY, Name TEXT)",
+    "CREATE TABLE FilterTable (NameId INTEGER, FilterAttributeId INTEGER)",
+    "CREATE TABLE IndexTable (Id INTEGER PRIMARY KEY, Name TEXT, Identifier TEXT, NamespaceId INTEGER, FileId INTEGER, Anchor TEXT)",
+    "CREATE TABLE IndexItemTable (Id INTEGER, IndexId INTEGER)",
+    "CREATE TABLE IndexFilterTable (FilterAttributeId INTEGER, IndexId INTEGER)",
+    "CREATE TABLE ContentsTable (Id INTEGER PRIMARY KEY, NamespaceId INTEGER, Data BLOB)",
+    "CREATE TABLE ContentsFilterTable (FilterAttributeId INTEGER, ContentsId INTEGER)",
+    "CREATE TABLE FileAttributeSetTable (Id INTEGER, FilterAttributeId INTEGER)",
+    "CREATE TABLE FileDataTable (Id INTEGER PRIMARY KEY, Data BLOB)",
+    "CREATE TABLE FileFilterTable (FilterAttributeId INTEGER, FileId INTEGER)",
+    "CREATE TABLE FileNameTable (FolderId INTEGER, Name TEXT, FileId INTEGER, Title TEXT)",
+    "CREATE TABLE FolderTable (Id INTEGER PRIMARY KEY, Name Text, NamespaceID INTEGER)",
+    "CREATE TABLE MetaDataTable (Name Text, Value BLOB)"
+]
+
+QHC_TABLES = [
+    "CREATE TABLE NamespaceTable (Id INTEGER PRIMARY KEY, Name TEXT, FilePath TEXT)",
+    "CREATE TABLE FolderTable (Id INTEGER PRIMARY KEY, NamespaceId INTEGER, Name TEXT)",
+    "CREATE TABLE FilterAttributeTable (Id INTEGER PRIMARY KEY, Name TEXT)",
+    "CREATE TABLE FilterNameTable (Id INTEGER PRIMARY KEY, Name TEXT)",
+    "CREATE TABLE FilterTable (NameId INTEGER, FilterAttributeId INTEGER)",
+    "CREATE TABLE SettingsTable (Key TEXT PRIMARY KEY, Value BLOB)"
+]
+
+ASSET_MODES = ["copy", "link", "clone"]
+
+STYLESHEET_MODES = ["inline", "external"]
+STYLESHEET_NAME = "db2qthelp.css"
+CSS_LITERAL = r"""("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|url\([^)"']*\))"""
+CSS_COMMENT_PATTERN = re.compile(CSS_LITERAL + r"|/\*.*?\*/", re.DOTALL)
+CSS_SPACE_PATTERN = re.compile(CSS_LITERAL + r"|\s*;\s*(})\s*|\s*([{};,>])\s*|(:)\s+|\s+")
+
+HTML_PRESERVED = r"(<(pre|textarea|script|style)\b.*?</\2>)"
+HTML_COMMENT_PATTERN = re.compile(HTML_PRESERVED + r"|<!--(?!\[if).*?-->", re.DOTALL | re.IGNORECASE)
+HTML_SPACE_PATTERN = re.compile(HTML_PRESERVED + r"|\s+", re.DOTALL | re.IGNORECASE)
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+PNG_DROPPED_CHUNKS = [b"tEXt", b"zTXt", b"iTXt", b"tIME"]
+GIF_KEPT_APPLICATIONS = [b"NETSCAPE2.0", b"ANIMEXTS1.0"]
+OPTIMIZED_IMAGES = [".png", ".gif"]
+
+FICLONE = 0x40049409
+
+CHUNK_XSL_PATH = os.path.join(os.path.split(__file__)[0], "data", "chunk_html.xsl")
+
+_TRANSFORMS = {}
+
+DOCBOOK_XSL_URI = "http://cdn.docbook.org/release/xsl/current/"
+
+DOCBOOK_XSL_URL = "https://github.com/docbook/xslt10-stylesheets/releases/download/release/1.79.2/docbook-xsl-1.79.2.zip"
+
+# SHA-256 of the archive at DOCBOOK_XSL_URL; while unknown (None), the archive is only extracted if unverified downloads are allowed
+DOCBOOK_XSL_SHA256 = None
+
+CATALOG_NAME = "db2qthelp-catalog.xml"
+
+CATALOG_TEMPLATE = """<?xml version="1.0"?>
+<catalog xmlns="urn:oasis:names:tc:entity:xmlns:xml:catalog">
+    <rewriteURI uriStartString="%uri%" rewritePrefix="%prefix%"/>
+    <rewriteSystem systemIdStartString="%uri%" rewritePrefix="%prefix%"/>
+</catalog>
+"""
+
+
+# --- classes ---------------------------------------------------------------
+class ToolResult(NamedTuple):
+    """The result of running an external tool"""
+    command : List[str]
+    returncode : int
+    output : str
+    duration : float
+
+
+class PageResult(NamedTuple):
+    """The result of processing a chunked HTML page"""
+    filename : str
+    title : str
+    files : Set[str]
+    digest : str
+    links : Dict[str, str]
+    bytes_read : int
+    bytes_written : int
+    data : bytes
+    terms : Dict[str, List[int]]
+    keywords : List[Tuple[str, str]]
+
+
+class HelpBundle(NamedTuple):
+    """The result of a conversion in memory (see Db2QtHelp.convert)"""
+    pages : Dict[str, bytes]
+    files : Dict[str, bytes]
+    qhp : str
+    toc : List[Tuple[str, str, Tuple[int, ...]]]
+    keywords : List[Tuple[str, str]]
+    unresolved : List[str]
+    missing : List[str]
+
+
+class SearchIndex:
+    """A full-text search index mapping terms to the pages they occur in
+
+    The occurrences of a term are stored as a flat list of integers: per
+    page the difference to the previous page's ID, the number of
+    occurrences, and the differences between consecutive word positions.
+    """
+
+    def __init__(self, pages : List[Tuple[str, str]], terms : Dict[str, List[int]]):
+        """Contructor
+
+        Args:
+            pages (List[Tuple[str, str]]): The pages given as file name and title, in document order
+            terms (Dict[str, List[int]]): Maps terms to their encoded occurrences
+        """
+        self.pages = pages
+        self._terms = terms
+
+
+    @staticmethod
+    def build(pages : List[Tuple[str, str]], page_terms : Dict[str, Dict[str, List[int]]]) -> "SearchIndex":
+        """Builds the index from the terms of the single pages
+
+        Args:
+            pages (List[Tuple[str, str]]): The pages given as file name and title, in document order
+            page_terms (Dict[str, Dict[str, List[int]]]): Maps file names to the terms of the page and their positions
+
+        Returns:
+            (SearchIndex): The index
+        """
+        postings = {}
+        for page_id, (filename, _) in enumerate(pages):
+            for term, positions in page_terms.get(filename, {}).items():
+                postings.setdefault(term, []).append((page_id, positions))
+        terms = {}
+        for term in sorted(postings):
+            encoded = []
+            last_page = 0
+            for page_id, positions in postings[term]:
+                encoded.extend([page_id - last_page, len(positions)])
+                last_page = page_id
+                last = 0
+                for position in positions:
+                    encoded.append(position - last)
+                    last = position
+            terms[term] = encoded
+        return SearchIndex(pages, terms)
+
+
+    @staticmethod
+    def load(path : str) -> "SearchIndex":
+        """Loads an index written by db2qthelp
+
+        Args:
+            path (str): The path to the index file
+
+        Returns:
+            (SearchIndex): The index
+        """
+        with gzip.open(path, "rt", encoding="utf-8") as fdi:
+            data = json.load(fdi)
+        return SearchIndex([tuple(page) for page in data["pages"]], data["terms"])
+
+
+    def to_bytes(self) -> bytes:
+        """Serializes the index as compressed JSON
+
+        Returns:
+            (bytes): The serialized index
+        """
+        data = json.dumps({ "version": SEARCH_INDEX_VERSION, "pages": self.pages, "terms": self._terms }, separators=(",", ":"), ensure_ascii=False)
+        return gzip.compress(data.encode("utf-8"), mtime=0)
+
+
+    def lookup(self, term : str) -> Dict[int, List[int]]:
+        """Returns the occurrences of a term
+
+        Args:
+            term (str): The term to look up
+
+        Returns:
+            (Dict[int, List[int]]): Maps the IDs of the pages the term occurs in to the word positions
+        """
+        encoded = self._terms.get(term.casefold(), [])
+        occurrences = {}
+        page_id = 0
+        i = 0
+        while i<len(encoded):
+            page_id += encoded[i]
+            count = encoded[i+1]
+            positions = list(itertools.accumulate(encoded[i+2:i+2+count]))
+            occurrences[page_id] = positions
+            i += 2 + count
+        return occurrences
+
+
+    def search(self, text : str, phrase : bool = False) -> List[Tuple[str, str]]:
+        """Returns the pages containing all words of the given text
+
+        Args:
+            text (str): The words to search for
+            phrase (bool): If set, the words must occur in the given order, one after the other
+
+        Returns:
+            (List[Tuple[str, str]]): The matching pages given as file name and title, the ones with the most occurrences first
+        """
+        words = WORD_PATTERN.findall(text)
+        if len(words)==0:
+            return []
+        occurrences = [self.lookup(word) for word in words]
+        hits = []
+        for page_id in set(occurrences[0]).intersection(*occurrences[1:]):
+            if phrase:
+                starts = set(occurrences[0][page_id])
+                for offset, word_occurrences in enumerate(occurrences[1:], 1):
+                    starts &= { position - offset for position in word_occurrences[page_id] }
+                count = len(starts)
+            else:
+                count = sum(len(word_occurrences[page_id]) for word_occurrences in occurrences)
+            if count>0:
+                hits.append((-count, page_id))
+        return [self.pages[page_id] for _, page_id in sorted(hits)]
+
+
+class Pipeline:
+    """Overlaps writing pages and staging referenced files with processing pages
+
+    Pages are written by a background thread that is fed by a bounded queue,
+    so that processing does not run ahead of writing too far. Referenced
+    files are staged by a pool of threads as soon as they are known.
+    """
+
+    def __init__(self, stage_asset : Callable[[str, str], Tuple[str, int, int]], base_path : str, jobs : int = 1, queue_size : int = WRITE_QUEUE_SIZE):
+        """Contructor
+
+        Args:
+            stage_asset (Callable[[str, str], Tuple[str, int, int]]): Stages a file given its source path and its name in the destination folder, returning its hash and the bytes read and written
+            base_path (str): The folder references are relative to
+            jobs (int): The number of threads staging files
+            queue_size (int): The maximum number of pages waiting for being written
+        """
+        self._stage_asset = stage_asset
+        self._base_path = base_path
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._error = None
+        self._writer = threading.Thread(target=self._write, daemon=True)
+        self._writer.start()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, jobs))
+        self._staged = {}
+
+
+    def _write(self) -> None:
+        """Writes the queued pages until the end of the queue is reached"""
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+            path, content = item
+            try:
+                if isinstance(content, list):
+                    with open(path, "wb") as fdo:
+                        fdo.writelines(content)
+                elif isinstance(content, bytes):
+                    with open(path, "wb") as fdo:
+                        fdo.write(content)
+                else:
+                    with open(path, "w", encoding="utf-8") as fdo:
+                        fdo.write(content)
+            except OSError as e:
+                self._error = e
+
+
+    def write(self, path : str, content : Union[str, bytes, List[bytes]]) -> None:
+        """Queues a page for being written, waiting if the queue is full
+
+        Args:
+            path (str): The path to write the page to
+            content (Union[str, bytes, List[bytes]]): The content to write, written as binary data if given as bytes or as a list of binary parts
+        """
+        self._queue.put((path, content))
+
+
+    def stage(self, file : str, filename : str) -> None:
+        """Starts staging a referenced file unless a file of this name is staged already
+
+        Args:
+            file (str): The reference to the file
+            filename (str): The file's name in the destination folder
+        """
+        if filename not in self._staged:
+            src = os.path.join(self._base_path, file)
+            self._staged[filename] = (src, self._executor.submit(self._stage_asset, src, filename))
+
+
+    def close(self) -> Dict[str, Tuple[str, Tuple[str, int, int]]]:
+        """Waits until all pages are written and all files are staged
+
+        Returns:
+            (Dict[str, Tuple[str, Tuple[str, int, int]]]): Maps the names of the staged files to their source paths and their hashes and bytes read and written
+
+        Raises:
+            OSError: If a page could not be written
+        """
+        self._queue.put(None)
+        self._writer.join()
+        self._executor.shutdown(wait=True)
+        if self._error is not None:
+            raise self._error
+        return { filename: (src, future.result()) for filename, (src, future) in self._staged.items() }
+
+
+class PageTransformer:
+    """Turns the sections of a single HTML document into pages
+
+    The pages' head and foot are built once per document. Images are
+    referenced within the help's namespace. Links to anchors point to the
+    pages the anchors are located in, regardless of the links' content;
+    the anchor is kept unless it names the page itself. The references are
+    resolved once; anchors that cannot be resolved are collected in the
+    attribute unresolved and are assumed to name a page.
+    """
+
+    def __init__(self, app_name : str, css_definition : str, asset_names : Dict[str, str], anchors : Dict[str, str] = None):
+        """Contructor
+
+        Args:
+            app_name (str): The application name
+            css_definition (str): The CSS definition to embed, including the style-element
+            asset_names (Dict[str, str]): Maps references of renamed files to the files' names in the destination folder
+            anchors (Dict[str, str]): Maps anchors to the file names of their pages, None if all anchors name pages
+        """
+        self._prefix = f"qthelp://{app_name}/doc/"
+        self._asset_names = asset_names
+        self._hrefs = None
+        if anchors is not None:
+            self._hrefs = { anchor: page if page==f"{anchor}.html" else f"{page}#{anchor}" for anchor, page in anchors.items() }
+        self.unresolved = set()
+        self._prefix_bytes = self._prefix.encode("utf-8")
+        self._head = '<html><head><meta http-equiv="Content-Type" content="text/html; charset=UTF-8"/>' + css_definition + "</head><body>"
+        self._foot = "</body></html>"
+        self._head_bytes = self._head.encode("utf-8")
+        self._foot_bytes = self._foot.encode("utf-8")
+
+
+    def rewrite_links(self, html : Union[str, bytes], files : Set[str]) -> Union[str, bytes]:
+        """Rewrites the references to images and the links to anchors of a section
+
+        Content given encoded is rewritten without being decoded (see
+        rewrite_links_bytes).
+
+        Args:
+            html (Union[str, bytes]): The section's content, optionally encoded
+            files (Set[str]): The container to store the referenced files into
+
+        Returns:
+            (Union[str, bytes]): The changed content, encoded if given encoded
+        """
+        if isinstance(html, bytes):
+            return self.rewrite_links_bytes(html, files)
+        def _patch(match : re.Match) -> str:
+            src = match.group(2)
+            files.add(src)
+            return f'{match.group(1)}{self._prefix}{self._asset_names.get(src) or os.path.split(src)[1]}"'
+        def _link(match : re.Match) -> str:
+            anchor = match.group(2)
+            href = self._hrefs.get(anchor)
+            if href is None:
+                self.unresolved.add(anchor)
+                href = f"{anchor}.html"
+            return f'{match.group(1)}{href}"'
+        # two passes using patterns that start with a literal are faster than a single one using an alternation
+        html = SRC_PATTERN.sub(_patch, html)
+        if self._hrefs is None:
+            return ANCHOR_LINK_PATTERN.sub(r'\1\2.html"', html)
+        return ANCHOR_LINK_PATTERN.sub(_link, html)
+
+
+    def rewrite_links_bytes(self, html : bytes, files : Set[str]) -> bytes:
+        """Rewrites the references to images and the links to anchors of an
+        encoded section without decoding it
+
+        Only the references and the anchors are decoded; content without
+        links is returned unchanged.
+
+        Args:
+            html (bytes): The section's (encoded) content
+            files (Set[str]): The container to store the referenced files into
+
+        Returns:
+            (bytes): The changed (encoded) content
+        """
+        def _patch(match : re.Match) -> bytes:
+            src = match.group(2).decode("utf-8")
+            files.add(src)
+            return match.group(1) + self._prefix_bytes + (self._asset_names.get(src) or os.path.split(src)[1]).encode("utf-8") + b'"'
+        def _link(match : re.Match) -> bytes:
+            anchor = match.group(2).decode("utf-8")
+            href = self._hrefs.get(anchor)
+            if href is None:
+                self.unresolved.add(anchor)
+                href = f"{anchor}.html"
+            return match.group(1) + href.encode("utf-8") + b'"'
+        html = SRC_BYTES_PATTERN.sub(_patch, html)
+        if self._hrefs is None:
+            return ANCHOR_LINK_BYTES_PATTERN.sub(rb'\1\2.html"', html)
+        return ANCHOR_LINK_BYTES_PATTERN.sub(_link, html)
+
+
+    def page(self, html : str) -> str:
+        """Returns the page consisting of the given section content
+
+        Args:
+            html (str): The section's (rewritten) content
+
+        Returns:
+            (str): The page
+        """
+        return self._head + html + self._foot
+
+
+    def page_parts(self, html : Union[str, bytes]) -> List[bytes]:
+        """Returns the encoded parts of the page consisting of the given section content
+
+        The head and the foot are encoded once per document.
+
+        Args:
+            html (Union[str, bytes]): The section's (rewritten) content, optionally encoded
+
+        Returns:
+            (List[bytes]): The page's head, the encoded content, and the page's foot
+        """
+        return [self._head_bytes, html if isinstance(html, bytes) else html.encode("utf-8"), self._foot_bytes]
+
+
+class PageCache:
+    """A persistent, content-addressed cache of processed pages
+
+    Each entry stores a page's output and the metadata extracted from it
+    under a key that is derived from the page's content and the settings
+    used for processing it. The entries' modification times are used as
+    their last access times; once the cache grows beyond its size, the
+    least recently used entries are removed. Errors of reading and writing
+    the cache are ignored, so that a broken cache results in misses only.
+    """
+
+    def __init__(self, folder : str, max_size : int = PAGE_CACHE_SIZE):
+        """Contructor
+
+        Args:
+            folder (str): The folder the entries are stored in
+            max_size (int): The maximum size of all entries in bytes
+        """
+        self.folder = folder
+        self.max_size = max_size
+
+
+    def _path(self, key : str) -> str:
+        """Returns the path of the entry stored under the given key
+
+        Args:
+            key (str): The entry's key
+
+        Returns:
+            (str): The path to the entry
+        """
+        return os.path.join(self.folder, key[:2], key)
+
+
+    def get(self, key : str) -> Tuple[Dict, bytes]:
+        """Returns the entry stored under the given key, marking it as used
+
+        Args:
+            key (str): The entry's key
+
+        Returns:
+            (Tuple[Dict, bytes]): The metadata and the content of the entry, None if no valid entry exists
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as fdi:
+                data = fdi.read()
+            length, = PAGE_CACHE_HEADER.unpack_from(data)
+            metadata = json.loads(data[PAGE_CACHE_HEADER.size:PAGE_CACHE_HEADER.size+length])
+            os.utime(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        return metadata, data[PAGE_CACHE_HEADER.size+length:]
+
+
+    def put(self, key : str, metadata : Dict, content : bytes) -> None:
+        """Stores an entry under the given key
+
+        The entry is written into a temporary file that replaces an existing
+        entry, so that concurrent builds never read incomplete entries.
+
+        Args:
+            key (str): The entry's key
+            metadata (Dict): The metadata to store, must be serializable as JSON
+            content (bytes): The content to store
+        """
+        path = self._path(key)
+        header = json.dumps(metadata, separators=(",", ":")).encode("utf-8")
+        try:
+            os.makedirs(os.path.split(path)[0], exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=os.path.split(path)[0])
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "wb") as fdo:
+                fdo.write(PAGE_CACHE_HEADER.pack(len(header)) + header)
+                fdo.write(content)
+            os.replace(tmp_path, path)
+        except OSError:
+            with contextlib.suppress(OSError):
+                os.remove(tmp_path)
+
+
+    def evict(self) -> int:
+        """Removes the least recently used entries until the cache fits its size
+
+        Returns:
+            (int): The number of removed entries
+        """
+        entries = []
+        for path in glob.glob(os.path.join(self.folder, "*", "*")):
+            with contextlib.suppress(OSError):
+                stat = os.stat(path)
+                entries.append((stat.st_mtime_ns, stat.st_size, path))
+        size = sum(entry[1] for entry in entries)
+        removed = 0
+        for _, entry_size, path in sorted(entries):
+            if size<=self.max_size:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+                removed += 1
+            size -= entry_size
+        return removed
+
+
+class HashingWriter:
+    """A text writer that computes the hash of the written content"""
+
+    def __init__(self, fdo : TextIO):
+        """Contructor
+
+        Args:
+            fdo (TextIO): The file to write to
+        """
+        self._fdo = fdo
+        self._sha = hashlib.sha1()
+
+
+    def write(self, text : str) -> None:
+        """Writes the given text
+
+        Args:
+            text (str): The text to write
+        """
+        self._fdo.write(text)
+        self._sha.update(text.encode("utf-8"))
+
+
+    def hexdigest(self) -> str:
+        """Returns the hash of the content written so far
+
+        Returns:
+            (str): The content's hash as a hex string
+        """
+        return self._sha.hexdigest()
+
+
 # --- functions -------------------------------------------------------------
+def plain_text(title : str) -> str:
+    """Converts a title taken from HTML into plain text
+
+    Markup is removed and HTML entities are resolved.
+
+    Args:
+        title (str): The title as found in the HTML document
+
+    Returns:
+        (str): The title's text
+    """
+    if "<" in title:
+        title = TAG_PATTERN.sub("", title)
+    if "&" in title:
+        title = html.unescape(title)
+    return title
+
+
+def xml_text(title : str) -> str:
+    """Converts a title taken from HTML into XML attribute text
+
+    Markup is removed, HTML entities are resolved, and the result is
+    escaped for being used as an XML attribute value.
+
+    Args:
+        title (str): The title as found in the HTML document
+
+    Returns:
+        (str): The escaped title
+    """
+    title = plain_text(title)
+    return title.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace("\"", "&quot;")
+
+
+def minify_css(css : str) -> str:
+    """Minifies a CSS definition
+
+    Comments, whitespace around punctuation, and the last semicolon of each
+    rule are removed; other whitespace is collapsed. Strings and unquoted
+    URLs are kept.
+
+    Args:
+        css (str): The CSS definition
+
+    Returns:
+        (str): The minified CSS definition
+    """
+    css = CSS_COMMENT_PATTERN.sub(lambda match: match.group(1) or " ", css)
+    css = CSS_SPACE_PATTERN.sub(lambda match: match.group(1) or match.group(2) or match.group(3) or match.group(4) or " ", css)
+    return css.strip()
+
+
+def minify_html(html : str) -> str:
+    """Minifies a HTML page
+
+    Comments (but conditional ones) are removed, then whitespace is
+    collapsed to a single space or line break. The content of pre-,
+    textarea-, script-, and style-elements is kept.
+
+    Args:
+        html (str): The page
+
+    Returns:
+        (str): The minified page
+    """
+    def _space(match : re.Match) -> str:
+        if match.group(1) is not None:
+            return match.group(1)
+        return "\n" if "\n" in match.group(0) else " "
+    html = HTML_COMMENT_PATTERN.sub(lambda match: match.group(1) or "", html)
+    return HTML_SPACE_PATTERN.sub(_space, html)
+
+
+def optimize_png(data : bytes) -> bytes:
+    """Recompresses a PNG image losslessly
+
+    The image data is recompressed using the highest compression level and
+    stored in a single chunk; textual and time chunks are dropped.
+
+    Args:
+        data (bytes): The image
+
+    Returns:
+        (bytes): The optimized image, the given one if it could not be made smaller
+    """
+    if not data.startswith(PNG_SIGNATURE):
+        return data
+    chunks = []
+    image = []
+    pos = len(PNG_SIGNATURE)
+    try:
+        while pos<len(data):
+            length, kind = struct.unpack(">I4s", data[pos:pos+8])
+            body = data[pos+8:pos+8+length]
+            pos += length + 12
+            if kind==b"IDAT":
+                if len(image)==0:
+                    chunks.append((kind, None))
+                image.append(body)
+            elif kind not in PNG_DROPPED_CHUNKS:
+                chunks.append((kind, body))
+            if kind==b"IEND":
+                break
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9)
+        pixels = compressor.compress(zlib.decompress(b"".join(image))) + compressor.flush()
+    except (struct.error, zlib.error):
+        return data
+    optimized = [PNG_SIGNATURE]
+    for kind, body in chunks:
+        body = pixels if body is None else body
+        optimized.append(struct.pack(">I4s", len(body), kind) + body + struct.pack(">I", zlib.crc32(kind + body)))
+    optimized = b"".join(optimized)
+    return optimized if len(optimized)<len(data) else data
+
+
+def optimize_gif(data : bytes) -> bytes:
+    """Optimizes a GIF image losslessly
+
+    Comments, application extensions other than the ones that control
+    animations, and data after the trailer are dropped.
+
+    Args:
+        data (bytes): The image
+
+    Returns:
+        (bytes): The optimized image, the given one if it could not be made smaller
+    """
+    def _skip_blocks(pos : int) -> int:
+        while data[pos]!=0:
+            pos += data[pos] + 1
+        return pos + 1
+    if not data.startswith((b"GIF87a", b"GIF89a")):
+        return data
+    optimized = []
+    try:
+        pos = 13 + (3 << ((data[10] & 7) + 1) if data[10] & 0x80 else 0)
+        optimized.append(data[:pos])
+        while data[pos]!=0x3b:
+            start = pos
+            if data[pos]==0x2c:
+                pos += 10 + (3 << ((data[pos+9] & 7) + 1) if data[pos+9] & 0x80 else 0)
+                pos = _skip_blocks(pos + 1)
+            elif data[pos]==0x21:
+                pos = _skip_blocks(pos + 2)
+                if data[start+1]==0xfe or (data[start+1]==0xff and data[start+3:start+14] not in GIF_KEPT_APPLICATIONS):
+                    continue
+            else:
+                return data
+            optimized.append(data[start:pos])
+    except IndexError:
+        return data
+    optimized.append(b"\x3b")
+    optimized = b"".join(optimized)
+    return optimized if len(optimized)<len(data) else data
+
+
+def optimize_image(data : bytes, filename : str) -> bytes:
+    """Optimizes an image losslessly if its format is supported
+
+    Args:
+        data (bytes): The image
+        filename (str): The image's file name, used for determining its format
+
+    Returns:
+        (bytes): The optimized image, the given one if it could not be made smaller
+    """
+    extension = os.path.splitext(filename)[1].lower()
+    if extension==".png":
+        return optimize_png(data)
+    if extension==".gif":
+        return optimize_gif(data)
+    return data
+
+
+def cache_folder() -> str:
+    """Returns the folder db2qthelp stores cached data in
+
+    Returns:
+        (str): The cache folder
+    """
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "db2qthelp")
+
+
+def default_docbook_xsl() -> str:
+    """Returns the default location of the cached DocBook XSL stylesheets
+
+    The location may be set using the environment variable
+    DB2QTHELP_DOCBOOK_XSL.
+
+    Returns:
+        (str): The folder the DocBook XSL stylesheets are cached in
+    """
+    return os.environ.get("DB2QTHELP_DOCBOOK_XSL") or os.path.join(cache_folder(), "docbook-xsl")
+
+
+def default_page_cache() -> str:
+    """Returns the default location of the cache of processed pages
+
+    The location may be set using the environment variable
+    DB2QTHELP_PAGE_CACHE.
+
+    Returns:
+        (str): The folder the processed pages are cached in
+    """
+    return os.environ.get("DB2QTHELP_PAGE_CACHE") or os.path.join(cache_folder(), "pages")
+
+
+def docbook_xsl_catalog(docbook_xsl : str) -> str:
+    """Returns an XML catalog that resolves the DocBook XSL stylesheets
+    from the given local folder
+
+    The catalog is generated within the folder if it does not exist.
+
+    Args:
+        docbook_xsl (str): The folder the DocBook XSL stylesheets are cached in
+
+    Returns:
+        (str): The path to the catalog
+
+    Raises:
+        RuntimeError: If the stylesheets are not in the cache
+    """
+    if not os.path.isfile(os.path.join(docbook_xsl, "html", "chunk.xsl")):
+        raise RuntimeError(f"DocBook XSL cache miss: did not find the stylesheets in '{docbook_xsl}'; you may fetch them using the option --fetch-docbook-xsl")
+    catalog = os.path.join(docbook_xsl, CATALOG_NAME)
+    prefix = pathlib.Path(os.path.abspath(docbook_xsl)).as_uri() + "/"
+    content = CATALOG_TEMPLATE.replace("%uri%", DOCBOOK_XSL_URI).replace("%prefix%", prefix)
+    if not os.path.exists(catalog) or pathlib.Path(catalog).read_text(encoding="utf-8")!=content:
+        with open(catalog, "w", encoding="utf-8") as fdo:
+            fdo.write(content)
+    return catalog
+
+
+def fetch_docbook_xsl(docbook_xsl : str, url : str = DOCBOOK_XSL_URL, sha256 : str = None, unverified : bool = False) -> int:
+    """Downloads the DocBook XSL stylesheets into the given folder
+
+    The SHA-256 checksum of the downloaded archive is checked before
+    anything is extracted. If no checksum is known, nothing is downloaded
+    unless unverified downloads are explicitly allowed.
+
+    Args:
+        docbook_xsl (str): The folder to store the stylesheets in
+        url (str): The URL of the zipped DocBook XSL release
+        sha256 (str): The expected SHA-256 checksum of the archive as a hex string, None for DOCBOOK_XSL_SHA256
+        unverified (bool): If set, the archive is extracted even if no checksum is known
+
+    Returns:
+        (int): The number of extracted files
+
+    Raises:
+        RuntimeError: If no checksum is known and unverified downloads are not allowed, or if the archive does not match the expected checksum
+    """
+    sha256 = sha256 if sha256 is not None else DOCBOOK_XSL_SHA256
+    if sha256 is None and not unverified:
+        raise RuntimeError(f"no checksum is known for '{url}'; use the option --fetch-unverified to fetch it anyway")
+    with tempfile.TemporaryFile() as fdt:
+        sha = hashlib.sha256()
+        with urllib.request.urlopen(url) as response:
+            for chunk in iter(lambda: response.read(1<<16), b""):
+                sha.update(chunk)
+                fdt.write(chunk)
+        if sha256 is not None and sha.hexdigest()!=sha256.lower():
+            raise RuntimeError(f"the checksum of '{url}' does not match (expected {sha256.lower()}, got {sha.hexdigest()})")
+        fdt.seek(0)
+        num = 0
+        with zipfile.ZipFile(fdt) as archive:
+            for member in archive.infolist():
+                # strip the release folder, skip entries pointing outside the cache
+                parts = member.filename.replace("\\", "/").split("/")[1:]
+                if member.is_dir() or len(parts)==0 or ".." in parts or member.filename.startswith("/"):
+                    continue
+                dst = os.path.join(docbook_xsl, *parts)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                with archive.open(member) as fdi, open(dst, "wb") as fdo:
+                    shutil.copyfileobj(fdi, fdo)
+                num += 1
+    docbook_xsl_catalog(docbook_xsl)
+    return num
+
+
+def get_transform(stylesheet : str, docbook_xsl : str = None) -> "etree.XSLT":
+    """Returns the compiled XSLT transformation for the given stylesheet
+
+    Stylesheets are compiled once and kept for further builds run by the
+    same process.
+
+    If a DocBook XSL folder is given, imports of the DocBook XSL stylesheets
+    are resolved from this folder and network access is disabled.
+
+    Args:
+        stylesheet (str): The path to the stylesheet
+        docbook_xsl (str): The folder the DocBook XSL stylesheets are cached in
+
+    Returns:
+        (etree.XSLT): The compiled transformation
+
+    Raises:
+        RuntimeError: If lxml is not installed or if the stylesheet can not be compiled
+    """
+    if etree is None:
+        raise RuntimeError("the lxml XSLT backend needs lxml to be installed...")
+    key = (stylesheet, docbook_xsl)
+    if key not in _TRANSFORMS:
+        parser = etree.XMLParser(no_network=docbook_xsl is not None)
+        if docbook_xsl is not None:
+            class DocBookXSLResolver(etree.Resolver):
+                def resolve(self, url, pubid, context):
+                    if not url.startswith(DOCBOOK_XSL_URI):
+                        return None
+                    return self.resolve_filename(os.path.join(docbook_xsl, *url[len(DOCBOOK_XSL_URI):].split("/")), context)
+            parser.resolvers.add(DocBookXSLResolver())
+        try:
+            _TRANSFORMS[key] = etree.XSLT(etree.parse(stylesheet, parser))
+        except (etree.XMLSyntaxError, etree.XSLTError) as e:
+            raise RuntimeError(f"could not compile '{stylesheet}': {str(e)}")
+    return _TRANSFORMS[key]
+
+
+def document_keys(links : Dict[str, Dict[str, str]]) -> Dict[str, Tuple[int, ...]]:
+    """Computes the ordering keys of chunked pages from their navigation links
+
+    The document order is obtained by following the "next" links, starting
+    at pages whose predecessor is not among the pages (the title page);
+    pages that are not reached this way are appended in the order of their
+    names. The key of a page
+    is the key of its parent ("up" link) extended by the page's position
+    in the document, so that sorting by the keys yields the document order
+    and the length of a key is the page's level.
+
+    Args:
+        links (Dict[str, Dict[str, str]]): Maps page names to their "up", "prev", and "next" links
+
+    Returns:
+        (Dict[str, Tuple[int, ...]]): Maps page names to their ordering keys
+    """
+    order = {}
+    starts = [name for name in sorted(links) if links[name].get("prev", name) not in links]
+    for name in starts + sorted(links):
+        while name in links and name not in order:
+            order[name] = len(order)
+            name = links[name].get("next")
+    keys = {}
+    for name in order:
+        path = []
+        current = name
+        while current in links and current not in keys and current not in path:
+            path.append(current)
+            current = links[current].get("up")
+        key = keys.get(current, ())
+        for current in reversed(path):
+            key = key + (order[current],)
+            keys[current] = key
+    return keys
+
+
+def clone_file(src : str, dst : str) -> None:
+    """Creates a copy-on-write clone (reflink) of a file
+
+    Args:
+        src (str): The file to clone
+        dst (str): The clone to create
+
+    Raises:
+        OSError: If the file system does not support cloning files
+    """
+    if fcntl is None: # pragma: no cover
+        raise OSError("cloning files is not supported on this platform")
+    with open(src, "rb") as fdi, open(dst, "wb") as fdo:
+        try:
+            fcntl.ioctl(fdo.fileno(), FICLONE, fdi.fileno())
+        except OSError:
+            fdo.close()
+            os.remove(dst)
+            raise
+
+
+def stage_file(src : str, dst : str, mode : str = "copy") -> str:
+    """Puts a file into the destination folder
+
+    A file existing at the destination is replaced, never written through.
+    If a hard link or a clone cannot be created, e.g. because the source and
+    the destination are located on different file systems, the file is
+    copied.
+
+    Args:
+        src (str): The file to stage
+        dst (str): The destination path
+        mode (str): How to stage the file, one of "copy", "link", "clone"
+
+    Returns:
+        (str): The way the file was staged, one of "copy", "link", "clone"
+    """
+    if os.path.lexists(dst):
+        os.remove(dst)
+    if mode=="link":
+        try:
+            os.link(src, dst)
+            return "link"
+        except OSError:
+            pass
+    if mode in ["link", "clone"]:
+        try:
+            clone_file(src, dst)
+            return "clone"
+        except OSError:
+            pass
+    shutil.copy(src, dst)
+    return "copy"
+
+
+def timings_report(manuals : Dict[str, List[Dict[str, float]]]) -> Dict:
+    """Builds a report of the time spent in the stages of the given builds
+
+    Args:
+        manuals (Dict[str, List[Dict[str, float]]]): Maps the names of the manuals (application names or sections of a batch file) to the measured stages of their builds
+
+    Returns:
+        (Dict): The report, ready to be stored as JSON
+    """
+    report = { "db2qthelp": __version__, "manuals": {} }
+    for name, stages in manuals.items():
+        total = {}
+        for stage in stages:
+            for key, value in stage.items():
+                if key!="stage":
+                    total[key] = total.get(key, 0) + value
+        report["manuals"][name] = { "stages": stages, "total": total }
+    return report
+
+
+def page_terms(doc : str) -> Dict[str, List[int]]:
+    """Returns the words of a HTML page and their positions
+
+    The head of the document, style and script elements, and markup are
+    skipped. Words are case-folded.
+
+    Args:
+        doc (str): The HTML page
+
+    Returns:
+        (Dict[str, List[int]]): Maps words to the positions they occur at
+    """
+    body = doc.find("<body")
+    text = html.unescape(TAG_PATTERN.sub(" ", NON_TEXT_PATTERN.sub(" ", doc[max(body, 0):])))
+    terms = {}
+    for position, word in enumerate(WORD_PATTERN.findall(text.casefold())):
+        terms.setdefault(word, []).append(position)
+    return terms
+
+
+def page_keywords(doc : str, filename : str) -> List[Tuple[str, str]]:
+    """Returns the index terms and glossary entries of a HTML page
+
+    Index terms are read from the anchors the bundled stylesheets emit for
+    DocBook indexterm-elements; their primary, secondary, and tertiary terms
+    are joined by commas. Glossary entries are read from the terms of
+    glossaries and glossary lists.
+
+    Args:
+        doc (str): The HTML page
+        filename (str): The page's file name
+
+    Returns:
+        (List[Tuple[str, str]]): The keywords given as (HTML) name and reference, including the anchor if given
+    """
+    keywords = []
+    for tag in INDEXTERM_PATTERN.findall(doc):
+        attributes = { name: double or single for name, double, single in ATTRIBUTE_PATTERN.findall(tag) }
+        name = ", ".join(attributes[key] for key in ["data-primary", "data-secondary", "data-tertiary"] if attributes.get(key))
+        if name:
+            keywords.append((name, f"{filename}#{attributes['name']}" if attributes.get("name") else filename))
+    for anchor, term in GLOSSTERM_PATTERN.findall(doc):
+        keywords.append((" ".join(term.split()), f"{filename}#{anchor}" if anchor else filename))
+    return keywords
+
+
+def sorted_keywords(keywords : Set[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """Returns the given keywords in alphabetical order
+
+    The keywords are sorted case-insensitively by their text, then by their
+    (HTML) names and references, so that the order does not depend on the
+    order the pages were processed in.
+
+    Args:
+        keywords (Set[Tuple[str, str]]): The keywords given as (HTML) name and reference
+
+    Returns:
+        (List[Tuple[str, str]]): The sorted keywords
+    """
+    return sorted(keywords, key=lambda keyword: (plain_text(keyword[0]).casefold(), keyword[0], keyword[1]))
+
+
+def qcompress(data : bytes) -> bytes:
+    """Compresses data as done by Qt's qCompress
+
+    Args:
+        data (bytes): The data to compress
+
+    Returns:
+        (bytes): The uncompressed length (big endian) followed by the zlib stream
+    """
+    return struct.pack(">I", len(data)) + zlib.compress(data)
+
+
+def qt_string(text : str) -> bytes:
+    """Serializes a string as done by Qt's QDataStream
+
+    Args:
+        text (str): The string to serialize
+
+    Returns:
+        (bytes): The length in bytes (big endian) followed by the UTF-16 (big endian) encoded string
+    """
+    data = text.encode("utf-16-be")
+    return struct.pack(">I", len(data)) + data
+
+
+def qhp_project(qhp_template : str, app_name : str) -> Dict:
+    """Reads the settings of a QtHelp project from a template
+
+    Args:
+        qhp_template (str): The QtHelp project template
+        app_name (str): The name of the application
+
+    Returns:
+        (Dict): The namespace, the virtual folder, the filter attributes, the custom filters, and the file patterns of the (first) filter section
+    """
+    text = QHP_PLACEHOLDER_PATTERN.sub(lambda match: app_name if match.group(1)=="%appname%" else "", qhp_template)
+    root = xml.etree.ElementTree.fromstring(text)
+    section = root.find("filterSection")
+    return {
+        "namespace": root.findtext("namespace", "").strip(),
+        "virtual_folder": root.findtext("virtualFolder", "").strip(),
+        "filter_attributes": [e.text.strip() for e in section.findall("filterAttribute")] if section is not None else [],
+        "custom_filters": [(e.get("name"), [a.text.strip() for a in e.findall("filterAttribute")]) for e in root.findall("customFilter")],
+        "file_patterns": [e.text.strip() for e in section.find("files").findall("file")] if section is not None and section.find("files") is not None else []
+    }
+
+
+def write_qch(path : str, project : Dict, contents : List[Tuple[int, str, str]], keywords : List[Tuple[str, str]], files : List[Tuple[str, str, bytes]]) -> None:
+    """Writes a compressed help file (.qch) as generated by qhelpgenerator
+
+    The file is a SQLite database; all rows are inserted within a single
+    transaction using batched statements. The layout follows the one of
+    qhelpgenerator, but is not verified against its output (experimental).
+
+    Args:
+        path (str): The path of the file to write
+        project (Dict): The project settings (see qhp_project)
+        contents (List[Tuple[int, str, str]]): The table of contents, given as depth, reference, and title
+        keywords (List[Tuple[str, str]]): The keywords given as name and reference (with an optional anchor)
+        files (List[Tuple[str, str, bytes]]): The files given as name, title, and compressed data (see qcompress)
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    try:
+        connection.execute("PRAGMA synchronous=OFF")
+        connection.execute("PRAGMA journal_mode=OFF")
+        with connection:
+            for table in QCH_TABLES:
+                connection.execute(table)
+            connection.execute("INSERT INTO NamespaceTable VALUES(1, ?)", (project["namespace"],))
+            connection.execute("INSERT INTO FolderTable VALUES(1, ?, 1)", (project["virtual_folder"],))
+            attributes = sorted(set(project["filter_attributes"]) | set(a for _, attrs in project["custom_filters"] for a in attrs))
+            attribute_ids = { name: i+1 for i, name in enumerate(attributes) }
+            connection.executemany("INSERT INTO FilterAttributeTable VALUES(?, ?)", [(i, name) for name, i in attribute_ids.items()])
+            for i, (name, attrs) in enumerate(project["custom_filters"]):
+                connection.execute("INSERT INTO FilterNameTable VALUES(?, ?)", (i+1, name))
+                connection.executemany("INSERT INTO FilterTable VALUES(?, ?)", [(i+1, attribute_ids[a]) for a in attrs])
+            section_ids = [attribute_ids[a] for a in project["filter_attributes"]]
+            connection.executemany("INSERT INTO FileAttributeSetTable VALUES(1, ?)", [(a,) for a in section_ids])
+            # files
+            file_ids = { name: i+1 for i, (name, _, _) in enumerate(files) }
+            connection.executemany("INSERT INTO FileDataTable VALUES(?, ?)", ((file_ids[name], data) for name, _, data in files))
+            connection.executemany("INSERT INTO FileNameTable VALUES(1, ?, ?, ?)", ((name, file_ids[name], title) for name, title, _ in files))
+            connection.executemany("INSERT INTO FileFilterTable VALUES(?, ?)", ((a, i) for i in file_ids.values() for a in section_ids))
+            # keywords
+            rows = []
+            for name, ref in keywords:
+                filename, _, anchor = ref.partition("#")
+                filename = filename[2:] if filename.startswith("./") else filename
+                rows.append((len(rows)+1, name, None, 1, file_ids.get(filename, 0), anchor))
+            connection.executemany("INSERT INTO IndexTable VALUES(?, ?, ?, ?, ?, ?)", rows)
+            connection.executemany("INSERT INTO IndexFilterTable VALUES(?, ?)", ((a, row[0]) for row in rows for a in section_ids))
+            # table of contents
+            data = b"".join(struct.pack(">i", depth) + qt_string(ref) + qt_string(title) for depth, ref, title in contents)
+            connection.execute("INSERT INTO ContentsTable VALUES(1, 1, ?)", (data,))
+            connection.executemany("INSERT INTO ContentsFilterTable VALUES(?, 1)", [(a,) for a in section_ids])
+            connection.executemany("INSERT INTO MetaDataTable VALUES(?, ?)", [("qchVersion", "1.0"), ("CreationDate", datetime.datetime.now().isoformat(timespec="seconds"))])
+    finally:
+        connection.close()
+
+
+def write_qhc(path : str, project : Dict, qch_name : str) -> None:
+    """Writes a help collection file (.qhc) registering the given help file
+
+    Only the basic tables are written; Qt Assistant and QHelpEngine add the
+    remaining ones and index the registered help file on first use. The
+    layout is not verified against qhelpgenerator's output (experimental).
+
+    Args:
+        path (str): The path of the file to write
+        project (Dict): The project settings (see qhp_project)
+        qch_name (str): The path of the help file, relative to the collection file
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    connection = sqlite3.connect(path)
+    try:
+        with connection:
+            for table in QHC_TABLES:
+                connection.execute(table)
+            connection.execute("INSERT INTO NamespaceTable VALUES(1, ?, ?)", (project["namespace"], qch_name))
+            connection.execute("INSERT INTO FolderTable VALUES(1, 1, ?)", (project["virtual_folder"],))
+            attributes = sorted(set(project["filter_attributes"]) | set(a for _, attrs in project["custom_filters"] for a in attrs))
+            connection.executemany("INSERT INTO FilterAttributeTable VALUES(?, ?)", [(i+1, name) for i, name in enumerate(attributes)])
+            for i, (name, attrs) in enumerate(project["custom_filters"]):
+                connection.execute("INSERT INTO FilterNameTable VALUES(?, ?)", (i+1, name))
+                connection.executemany("INSERT INTO FilterTable VALUES(?, ?)", [(i+1, attributes.index(a)+1) for a in attrs])
+    finally:
+        connection.close()
+
+
+def run_tool(command : List[str]) -> ToolResult:
+    """Runs an external tool, capturing its output and measuring its duration
+
+    Args:
+        command (List[str]): The command to run
+
+    Returns:
+        (ToolResult): The result; the return code is None if the tool could not be found
+    """
+    start = time.perf_counter()
+    try:
+        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, errors="replace")
+        returncode, output = result.returncode, result.stdout
+    except (FileNotFoundError, PermissionError) as e:
+        returncode, output = None, str(e)
+    return ToolResult(command, returncode, output, time.perf_counter() - start)
+
+
+def content_digest(data : bytes) -> str:
+    """Returns the hash of the given content
+
+    Args:
+        data (bytes): The content to hash
+
+    Returns:
+        (str): The content's hash as a hex string
+    """
+    return hashlib.sha1(data).hexdigest()
+
+
+def code_digest() -> str:
+    """Returns the hash of db2qthelp's source and of its XSL templates
+
+    Processed pages are cached by it, so that changes of the code invalidate
+    the cache even if the version is not changed.
+
+    Returns:
+        (str): The hash of the source and the templates as a hex string
+    """
+    sha = hashlib.sha1()
+    for path in [__file__] + sorted(glob.glob(os.path.join(os.path.split(__file__)[0], "data", "*.xsl"))):
+        with open(path, "rb") as fdi:
+            sha.update(fdi.read())
+    return sha.hexdigest()
+
+
+def document_includes(source : str) -> List[str]:
+    """Returns the files a DocBook document includes, recursively
+
+    Included DocBook documents are searched for further XIncludes. Remote
+    references are skipped.
+
+    Args:
+        source (str): The DocBook document
+
+    Returns:
+        (List[str]): The paths of the included files
+    """
+    includes = set()
+    pending = [source]
+    while len(pending)!=0:
+        path = pending.pop()
+        try:
+            with open(path, encoding="utf-8") as fdi:
+                doc = fdi.read()
+        except (OSError, UnicodeDecodeError):
+            continue
+        for href in XINCLUDE_PATTERN.findall(doc):
+            if "://" in href:
+                continue
+            include = os.path.normpath(os.path.join(os.path.split(path)[0], href.split("#")[0]))
+            if include not in includes:
+                includes.add(include)
+                if include.endswith(".xml"):
+                    pending.append(include)
+    return sorted(includes)
+
+
+def chunk_complete(path : str) -> bool:
+    """Returns whether a page written by an XSLT processor is complete
+
+    A page is regarded as being complete if it ends with the closing
+    html-element.
+
+    Args:
+        path (str): The page to check
+
+    Returns:
+        (bool): Whether the page is complete
+    """
+    try:
+        with open(path, "rb") as fdi:
+            fdi.seek(0, os.SEEK_END)
+            fdi.seek(max(0, fdi.tell()-64))
+            return fdi.read().rstrip().lower().endswith(b"</html>")
+    except OSError:
+        return False
+
+
+def file_states(paths : List[str]) -> Dict[str, Tuple[int, int]]:
+    """Returns the sizes and modification times of the given files
+
+    Args:
+        paths (List[str]): The files to check
+
+    Returns:
+        (Dict[str, Tuple[int, int]]): Maps the paths to the files' sizes and modification times (in ns), None for missing files
+    """
+    states = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            states[path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            states[path] = None
+    return states
+
+
+def file_digest(path : str) -> str:
+    """Returns the hash of the given file's content
+
+    Args:
+        path (str): The path to the file to hash
+
+    Returns:
+        (str): The file content's hash as a hex string
+    """
+    sha = hashlib.sha1()
+    with open(path, "rb") as fdi:
+        for chunk in iter(lambda: fdi.read(READ_CHUNK_SIZE), b""):
+            sha.update(chunk)
+    return sha.hexdigest()
+
+
 class Db2QtHelp:
-    def __init__(self, qt_path : str, xsltproc_path : str, css_definition : str, qhp_template : str):
+    def __init__(self, qt_path : str, xsltproc_path : str, css_definition : str, qhp_template : str, jobs : int = 1, qt_help : str = "all", xslt_backend : str = "xsltproc", docbook_xsl : str = None, assets : str = "copy", profile : bool = False, qt_help_backend : str = "qhelpgenerator", search_index : bool = False, pipeline : bool = False, stylesheet : str = "inline", minify_css : bool = False, optimize : bool = False, page_cache : str = None):
         """Contructor
 
         Args:
@@ -101,313 +1513,1643 @@ class Db2QtHelp:
             xsltproc_path (str): Path to the xsltproc binary
             css_definition (str): CSS definition to use
             qhp_template (str): Template for the .qhp file
+            jobs (int): Number of parallel jobs used for processing chunked HTML pages and for generating Qt Help files
+            qt_help (str): The Qt Help files to generate, one of "all", "qch", "qhc", "none"
+            xslt_backend (str): The XSLT processor to use, one of "xsltproc", "lxml"
+            docbook_xsl (str): The folder the DocBook XSL stylesheets are cached in, None for the default location
+            assets (str): How referenced images are put into the destination folder, one of "copy", "link", "clone"
+            profile (bool): If set, the Python build stages are profiled using cProfile (see the attribute profile)
+            qt_help_backend (str): The way Qt Help files are generated, one of "qhelpgenerator", "native"
+            search_index (bool): If set, a full-text search index is written next to the Qt Help files (see SearchIndex)
+            pipeline (bool): If set, pages are processed while the XSLT processor writes them, written in the background, and referenced files are staged as soon as they are known (see Pipeline)
+            stylesheet (str): How the CSS definition is put into the pages, one of "inline" (embedded into each page), "external" (written once and referenced)
+            minify_css (bool): If set, the CSS definition is minified
+            optimize (bool): If set, the pages are minified and PNG and GIF images are optimized losslessly
+            page_cache (str): The folder processed chunked HTML pages are cached in across builds, None for not caching them (see PageCache)
         """
         self._qt_path = qt_path
         self._xsltproc_path = xsltproc_path
-        self._css_definition = css_definition if css_definition is not None else CSS_DEFINITION
-        self._css_definition = "\n<style>\n" + self._css_definition + "</style>\n"
+        self._stylesheet_mode = stylesheet
+        self._minify_css = minify_css
+        self.set_css_definition(css_definition)
+        self.set_qhp_template(qhp_template)
+        self._jobs = jobs
+        self._qt_help = qt_help
+        self._xslt_backend = xslt_backend
+        self._docbook_xsl = docbook_xsl
+        self._assets_mode = assets
+        self._qt_help_backend = qt_help_backend
+        self._search_index = search_index
+        self._pipelined = pipeline
+        self._pipeline = None
+        self._optimize = optimize
+        self._page_cache = PageCache(page_cache) if page_cache is not None else None
+        self._cache_settings = ""
+        self._code_digest = code_digest() if page_cache is not None else ""
+        self._sink = None
+        self.tool_results = []
+        self.timings = []
+        self.profile = cProfile.Profile() if profile else None
+        self._bytes_read = 0
+        self._bytes_written = 0
+        self._previous = {}
+        self._outputs = {}
+        self._assets = {}
+        self._asset_sources = {}
+        self._asset_names = {}
+        self._optimized = {}
+        self._file_data = {}
+        self._page_terms = {}
+        self._keywords = set()
+        self.unresolved = []
+
+
+    def __getstate__(self) -> Dict:
+        """Returns the state to pass to worker processes, without the pipeline
+        and the profiler
+
+        Returns:
+            (Dict): The converter's attributes
+        """
+        state = dict(self.__dict__)
+        state["_pipeline"] = None
+        state["profile"] = None
+        return state
+
+
+    def set_css_definition(self, css_definition : str) -> None:
+        """Sets the CSS definition used by the pages
+
+        The definition is either embedded into the pages or written into an
+        own stylesheet the pages link to.
+
+        Args:
+            css_definition (str): CSS definition to use, None for the default one
+        """
+        css = css_definition if css_definition is not None else CSS_DEFINITION
+        if self._minify_css:
+            css = minify_css(css)
+        if self._stylesheet_mode=="external":
+            self._stylesheet = css
+            self._css_definition = f'\n<link rel="stylesheet" type="text/css" href="{STYLESHEET_NAME}"/>\n'
+        else:
+            self._stylesheet = None
+            self._css_definition = "\n<style>\n" + css + "</style>\n"
+
+
+    def set_qhp_template(self, qhp_template : str) -> None:
+        """Sets the template for the .qhp file
+
+        The template is split at its placeholders once.
+
+        Args:
+            qhp_template (str): Template for the .qhp file, None for the default one
+        """
         self._qhp_template = qhp_template if qhp_template is not None else QHP_TEMPLATE
+        self._qhp_parts = QHP_PLACEHOLDER_PATTERN.split(self._qhp_template)
+
+
+    @contextlib.contextmanager
+    def _stage(self, name : str):
+        """Measures a build stage
+
+        The wall time, the CPU time (including the one of finished child
+        processes), and the number of bytes read and written are recorded in
+        the attribute timings. The yielded record may be extended by the
+        number of processed pages and assets.
+
+        Args:
+            name (str): The name of the stage
+        """
+        record = { "stage": name, "wall": 0., "cpu": 0., "bytes_read": 0, "bytes_written": 0, "pages": 0, "assets": 0 }
+        bytes_read = self._bytes_read
+        bytes_written = self._bytes_written
+        cpu = sum(os.times()[:4])
+        wall = time.perf_counter()
+        if self.profile is not None:
+            self.profile.enable()
+        try:
+            yield record
+        finally:
+            if self.profile is not None:
+                self.profile.disable()
+            record["wall"] = time.perf_counter() - wall
+            record["cpu"] = sum(os.times()[:4]) - cpu
+            record["bytes_read"] = self._bytes_read - bytes_read
+            record["bytes_written"] = self._bytes_written - bytes_written
+            self.timings.append(record)
+
+
+    def _load_manifest(self, dst_folder : str, settings : str) -> None:
+        """Loads the manifest of a previous build from the destination folder
+
+        If no manifest exists or if the previous build used different settings,
+        the destination folder is cleared and everything is built from scratch.
+        The manifest is removed until the current build has finished.
+
+        Args:
+            dst_folder (str): The destination folder (where the documentation is built)
+            settings (str): The hash of the current build settings
+        """
+        path = os.path.join(dst_folder, MANIFEST_NAME)
+        manifest = None
+        try:
+            with open(path, encoding="utf-8") as fdi:
+                manifest = json.load(fdi)
+        except (OSError, ValueError):
+            manifest = None
+        if not isinstance(manifest, dict) or manifest.get("settings")!=settings:
+            shutil.rmtree(dst_folder, ignore_errors=True)
+            manifest = {}
+        else:
+            os.remove(path)
+        os.makedirs(dst_folder, exist_ok=True)
+        self._start_build(manifest)
+
+
+    def _start_build(self, previous : Dict) -> None:
+        """Resets the state collected by a build
+
+        Args:
+            previous (Dict): The manifest of the previous build, empty if everything is built from scratch
+        """
+        self._previous = previous
+        self._outputs = {}
+        self._asset_names = {}
+        self._assets = {}
+        self._asset_sources = {}
+        self._optimized = {}
+        self._file_data = {}
+        self._page_terms = {}
+        self._keywords = set()
+        self.unresolved = []
+
+
+    def _save_manifest(self, dst_folder : str, settings : str) -> None:
+        """Removes outputs of the previous build that are no longer generated
+        and writes the manifest of the current build
+
+        Args:
+            dst_folder (str): The destination folder (where the documentation is built)
+            settings (str): The hash of the current build settings
+        """
+        stale = set(self._previous.get("outputs", {})) | set(self._previous.get("assets", {}))
+        stale -= set(self._outputs) | set(self._assets)
+        for filename in stale:
+            path = os.path.join(dst_folder, filename)
+            if os.path.isfile(path):
+                os.remove(path)
+        manifest = {
+            "db2qthelp": __version__,
+            "settings": settings,
+            "outputs": self._outputs,
+            "assets": self._assets,
+            "asset_sources": self._asset_sources,
+            "optimized": self._optimized
+        }
+        with open(os.path.join(dst_folder, MANIFEST_NAME), "w", encoding="utf-8") as fdo:
+            json.dump(manifest, fdo, indent=1, sort_keys=True)
+
+
+    def _write_output(self, dst_folder : str, filename : str, content : Union[str, bytes, List[bytes]]) -> str:
+        """Writes a generated file into the destination folder
+
+        The file is only written if its content differs from the one
+        recorded by the previous build or if it does not exist. If the Qt
+        Help files are generated natively, the compressed content is kept.
+        While a pipeline is running, the file is written in the background.
+        Content given as parts is hashed and written part by part, without
+        being joined. While converting in memory, the encoded content is
+        passed to the sink instead (see convert).
+
+        Args:
+            dst_folder (str): The destination folder
+            filename (str): The name of the file to write
+            content (Union[str, bytes, List[bytes]]): The content to write, written as binary data if given as bytes or as a list of binary parts
+
+        Returns:
+            (str): The hash of the content
+        """
+        if self._sink is not None:
+            data = b"".join(content) if isinstance(content, list) else content if isinstance(content, bytes) else content.encode("utf-8")
+            self._sink(filename, data)
+            return content_digest(data)
+        if isinstance(content, list):
+            sha = hashlib.sha1()
+            for part in content:
+                sha.update(part)
+            digest = sha.hexdigest()
+            size = sum(len(part) for part in content)
+            if self._qt_help_backend=="native":
+                self._file_data[filename] = qcompress(b"".join(content))
+        else:
+            data = content if isinstance(content, bytes) else content.encode("utf-8")
+            digest = content_digest(data)
+            size = len(data)
+            if self._qt_help_backend=="native":
+                self._file_data[filename] = qcompress(data)
+        path = os.path.join(dst_folder, filename)
+        if self._previous.get("outputs", {}).get(filename)!=digest or not os.path.exists(path):
+            if self._pipeline is not None:
+                self._pipeline.write(path, content)
+            elif isinstance(content, list):
+                with open(path, "wb") as fdo:
+                    fdo.writelines(content)
+            elif isinstance(content, bytes):
+                with open(path, "wb") as fdo:
+                    fdo.write(content)
+            else:
+                with open(path, "w", encoding="utf-8") as fdo:
+                    fdo.write(content)
+            self._bytes_written += size
+        return digest
+
+
+    def _stream_output(self, dst_folder : str, filename : str, writer : Callable[[TextIO], None]) -> str:
+        """Writes a generated file into the destination folder by streaming
+        it from the given writer
+
+        The content is written into a temporary file which replaces the
+        destination file only if the content differs from the one recorded
+        by the previous build or if the destination file does not exist.
+
+        Args:
+            dst_folder (str): The destination folder
+            filename (str): The name of the file to write
+            writer (Callable[[TextIO], None]): The function that writes the content to the given file
+
+        Returns:
+            (str): The hash of the content
+        """
+        path = os.path.join(dst_folder, filename)
+        with open(path + ".tmp", "w", encoding="utf-8") as fdo:
+            hashing = HashingWriter(fdo)
+            writer(hashing)
+        digest = hashing.hexdigest()
+        if self._previous.get("outputs", {}).get(filename)!=digest or not os.path.exists(path):
+            os.replace(path + ".tmp", path)
+            self._bytes_written += os.path.getsize(path)
+        else:
+            os.remove(path + ".tmp")
+        return digest
 
 
-    def _get_id(self, html : str) -> str:
+    def _get_id(self, html : Union[str, bytes]) -> str:
         """Return the docbook ID of the current section.
 
         The value of the first a-element's name attribute is assumed to be the docbook ID.
 
         Args:
-            html (str): The HTML snippet to get the next docbook ID from
+            html (Union[str, bytes]): The HTML snippet to get the next docbook ID from, optionally encoded
 
         Returns:
             (str): The next ID found in the snippet
         """
-        db_id = html[html.find("<a name=\"")+9:]
-        db_id = db_id[:db_id.find("\"")]
-        return db_id
+        if isinstance(html, bytes):
+            db_id = html[html.find(b"<a name=\"")+9:]
+            return db_id[:db_id.find(b"\"")].decode("utf-8")
+        db_id = html[html.find("<a name=\"")+9:]
+        db_id = db_id[:db_id.find("\"")]
+        return db_id
+
+
+    def _get_name(self, html : Union[str, bytes]) -> str:
+        """Return the name of the current section.
+
+        Args:
+            html (Union[str, bytes]): The HTML snippet to get the next name from, optionally encoded
+
+        Returns:
+            (str): The next name found in the snippet
+        """
+        if isinstance(html, bytes):
+            # only the name is decoded
+            name = html[html.find(b"</a>")+4:]
+            end = name.find(b"</h")
+            name = name[:end].decode("utf-8") if end>=0 else name.decode("utf-8")[:-1]
+        else:
+            name = html[html.find("</a>")+4:]
+            name = name[:name.find("</h")]
+        name = name.replace("\"", "'")
+        name = name.strip()
+        return name
+
+
+    def _get_title(self, html : str) -> str:
+        """Return the name of the current section.
+
+        Args:
+            html (str): The HTML snippet to get the next name from
+
+        Returns:
+            (str): The next name found in the snippet
+        """
+        name = html[html.find("<title>")+7:]
+        name = name[:name.find("</title>")]
+        name = name.replace("\"", "'")
+        name = name.strip()
+        return name
+
+
+    def patch_links(self, doc : str, app_name : str, files : Set[str]) -> str:
+        """Extracts references to images; patches links to point to main document folder
+
+        The document is scanned once; each src-attribute is rewritten in place
+        and the referenced file is stored in the given container. Text outside
+        of src-attributes is kept as-is. Files are referenced by their names
+        unless they were renamed due to a name collision.
+
+        Args:
+            doc (str): The HTML document to process
+            app_name (str): The application name
+            files (Set[str]): The container to store links into
+
+        Returns:
+            (str): The changed document
+        """
+        def _patch(match : re.Match) -> str:
+            src = match.group(2)
+            files.add(src)
+            name = self._asset_names.get(src) or os.path.split(src)[1]
+            return f"{match.group(1)}qthelp://{app_name}/doc/{name}\""
+        return SRC_PATTERN.sub(_patch, doc)
+
+
+    def _write_section(self, html : bytes, dst_folder : str, pages : List[Tuple[str, str, Tuple[int, ...]]], trims : int, key : Tuple[int, ...], transformer : PageTransformer) -> None:
+        """Writes the given section's own content as a HTML page.
+
+        The id and the name of the section are retrieved, first, and the page
+        is appended to the list of pages.
+
+        The content is then trimmed by the closing div-elements of the
+        sections that end with it, embedded into the page's head and foot,
+        and written from its encoded parts. The content is only decoded if
+        it is indexed, minified, or contains keywords.
+
+        Args:
+            html (bytes): The (encoded) content of the DocBook section without its sub-sections, with rewritten links
+            dst_folder (str): The folder to write the section into
+            pages (List[Tuple[str, str, Tuple[int, ...]]]): The list of HTML sections to fill
+            trims (int): The number of (nested) sections that end with this content
+            key (Tuple[int, ...]): The section's ordering key
+            transformer (PageTransformer): The transformer of the document's sections
+        """
+        db_id = self._get_id(html)
+        name = self._get_name(html)
+        pages.append([f"{db_id}.html", name, key])
+        for _ in range(trims):
+            html = html[:html.rfind(b"</div>")]
+        if html.rfind(b"</div>")>=len(html)-6:
+            html = html[:html.rfind(b"</div>")]
+        # write the document part as document
+        text = None
+        if self._search_index or self._optimize or any(marker in html for marker in KEYWORD_MARKERS):
+            text = html.decode("utf-8")
+            self._keywords.update(page_keywords(text, f"{db_id}.html"))
+        if self._search_index:
+            self._page_terms[f"{db_id}.html"] = page_terms(transformer.page(text))
+        content = minify_html(transformer.page(text)) if self._optimize else transformer.page_parts(html)
+        self._outputs[f"{db_id}.html"] = self._write_output(dst_folder, f"{db_id}.html", content)
+
+
+    def _split_single(self, source : Union[str, bytes]) -> Iterator[Tuple[bytes, int, int]]:
+        """Splits a single (not chunked) HTML document generated by docbook into sections
+
+        The document is memory-mapped and split along the chapter, appendix,
+        and '&lt;div class="sect&lt;INDENT&gt;"&gt;' elements without being
+        decoded. Only the content of the current section is copied out of the
+        mapping; it is yielded as soon as the section's first sub-section
+        starts or as soon as the section ends. Processed parts of the mapping
+        are released regularly, so that they do not count as resident memory.
+        A document given as its content is split the same way.
+
+        Args:
+            source (Union[str, bytes]): The HTML document to split, given as path or as its (encoded) content
+
+        Yields:
+            (Tuple[bytes, int, int]): The section's own (encoded) content, the number of (nested) sections that end with it, and the number of open sections
+        """
+        depth = 1 # number of open sections, the part before the first chapter is the first one
+        with contextlib.ExitStack() as stack:
+            if isinstance(source, bytes):
+                data = source
+            else:
+                fdi = stack.enter_context(open(source, "rb"))
+                # empty files cannot be mapped
+                data = stack.enter_context(mmap.mmap(fdi.fileno(), 0, access=mmap.ACCESS_READ)) if os.fstat(fdi.fileno()).st_size!=0 else b""
+            release = isinstance(data, mmap.mmap) and hasattr(mmap, "MADV_DONTNEED")
+            start = 0 # the begin of the innermost open section's content
+            released = 0 # the end of the released part of the mapping
+            for m in SECTION_BYTES_PATTERN.finditer(data):
+                if release and start-released>=MAPPING_RELEASE_SIZE:
+                    end = start - start % mmap.PAGESIZE
+                    data.madvise(mmap.MADV_DONTNEED, released, end-released)
+                    released = end
+                if m.group(1) is None:
+                    # chapter or appendix; ends all open sections
+                    yield data[start:m.start()], depth-1, depth
+                    start = m.end()
+                    depth = 1
+                    continue
+                level = int(m.group(1))
+                if level<1 or level>depth:
+                    # not a sub-section of the innermost section, kept as content
+                    continue
+                yield data[start:m.start()], depth-level, depth
+                start = m.end()
+                depth = level + 1
+            yield data[start:], depth-1, depth
+
+
+    def _scan_single(self, source : Union[str, bytes]) -> Tuple[Dict[str, str], Set[str]]:
+        """Returns the pages the anchors of a single HTML document end up in
+        and the files the document references
+
+        The document is split once without writing or decoding anything; the
+        anchors of each section are assigned to the section's page.
+
+        Args:
+            source (Union[str, bytes]): The HTML document to scan, given as path or as its (encoded) content
+
+        Returns:
+            (Tuple[Dict[str, str], Set[str]]): Maps the anchors (names of a-elements and IDs) to the file names of their pages, and the referenced files (images)
+        """
+        anchors = {}
+        files = set()
+        self._bytes_read += len(source) if isinstance(source, bytes) else os.path.getsize(source)
+        for html, _, _ in self._split_single(source):
+            page = f"{self._get_id(html)}.html"
+            for anchor in ANCHOR_NAME_BYTES_PATTERN.findall(html):
+                anchors.setdefault(anchor.decode("utf-8"), page)
+            files.update(m.group(2).decode("utf-8") for m in SRC_BYTES_PATTERN.finditer(html))
+        return anchors, files
+
+
+    def _process_single(self, source : Union[str, bytes], dst_folder : str, pages : List[Tuple[str, str, Tuple[int, ...]]], files : Set[str], app_name : str, anchors : Dict[str, str] = None) -> None:
+        """Processes a single (not chunked) HTML document generated by docbook
+
+        The document is split into sections (see _split_single) and each
+        section is written as soon as it is complete. The sections are kept
+        encoded; their links are rewritten without decoding them. Links to anchors are
+        resolved using the pages the anchors end up in, collected by a scan
+        of the document before (see _scan_single) unless given; unresolved
+        ones are stored in the attribute unresolved.
+
+        Each section's ordering key consists of the positions of its open
+        ancestors and its own position in the document.
+
+        Args:
+            source (Union[str, bytes]): The HTML document to process, given as path or as its (encoded) content
+            dst_folder (str): The folder to write the section into
+            pages (List[Tuple[str, str, Tuple[int, ...]]]): The list of HTML sections to fill
+            files (Set[str]): The set of referenced files (images) to fill
+            app_name (str): The application name
+            anchors (Dict[str, str]): Maps the anchors to the file names of their pages, None for scanning the document
+        """
+        ancestors = [] # the positions of the open sections
+        if anchors is None:
+            anchors, _ = self._scan_single(source)
+        transformer = PageTransformer(app_name, self._css_definition, self._asset_names, anchors)
+        self._bytes_read += len(source) if isinstance(source, bytes) else os.path.getsize(source)
+        for html, trims, depth in self._split_single(source):
+            if b"\r" in html:
+                # as if read in text mode
+                html = html.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+            section_files = set()
+            html = transformer.rewrite_links_bytes(html, section_files)
+            files.update(section_files)
+            self._prestage(section_files)
+            del ancestors[depth-1:]
+            ancestors.append(len(pages))
+            self._write_section(html, dst_folder, pages, trims, tuple(ancestors), transformer)
+        self.unresolved = sorted(transformer.unresolved)
+
+
+    def _get_docbook_xsl(self) -> str:
+        """Returns the folder the DocBook XSL stylesheets are cached in
+
+        If the stylesheets are not cached at the default location but the
+        environment variable XML_CATALOG_FILES is set, None is returned and
+        the stylesheets are resolved using the user's catalogs.
+
+        Returns:
+            (str): The folder the DocBook XSL stylesheets are cached in
+
+        Raises:
+            RuntimeError: If the stylesheets are not in the cache
+        """
+        docbook_xsl = self._docbook_xsl if self._docbook_xsl is not None else default_docbook_xsl()
+        try:
+            docbook_xsl_catalog(docbook_xsl)
+        except RuntimeError:
+            if self._docbook_xsl is None and os.environ.get("XML_CATALOG_FILES"):
+                return None
+            raise
+        return docbook_xsl
+
+
+    def _generate_html(self, source : str, folder : str) -> int:
+        """Generates a chunked HTML document from the source docbook document
+
+        The DocBook XSL stylesheets are resolved from the local cache without
+        accessing the network.
+
+        Args:
+            source (str): The XML DocBook document to process
+            folder (str): A (temporary) folder to store the xsltproc output to
+        """
+        shutil.rmtree(folder, ignore_errors=True)
+        if self._xslt_backend=="lxml":
+            return self._generate_html_lxml(source, folder)
+        xsltproc = shutil.which(os.path.join(self._xsltproc_path, 'xsltproc'))
+        if xsltproc is None:
+            raise RuntimeError("could not invoke xsltproc...")
+        docbook_xsl = self._get_docbook_xsl()
+        env = None
+        options = []
+        if docbook_xsl is not None:
+            env = dict(os.environ)
+            env["XML_CATALOG_FILES"] = docbook_xsl_catalog(docbook_xsl)
+            options = ["--nonet"]
+        try:
+            result = subprocess.run([xsltproc, *options,
+                "--stringparam", "base.dir", folder,
+                CHUNK_XSL_PATH, source], check = True, env = env)
+        except subprocess.CalledProcessError:
+            raise RuntimeError("could not invoke xsltproc...")
+        except FileNotFoundError:
+            raise RuntimeError("could not invoke xsltproc...")
+        if isinstance(result, subprocess.CompletedProcess):
+            ret = result.returncode
+        else:
+            ret = 3
+        return ret
+
+
+    def _generate_html_lxml(self, source : str, folder : str) -> int:
+        """Generates a chunked HTML document from the source docbook document
+        using libxslt in-process (via lxml)
+
+        The stylesheet is compiled only once per process. The chunks are
+        written by libxslt itself, as done by xsltproc.
+
+        Args:
+            source (str): The XML DocBook document to process
+            folder (str): A (temporary) folder to store the chunks to
+        """
+        transform = get_transform(CHUNK_XSL_PATH, self._get_docbook_xsl())
+        os.makedirs(folder, exist_ok=True)
+        try:
+            transform(etree.parse(source), **{"base.dir": etree.XSLT.strparam(folder)})
+        except (etree.XMLSyntaxError, etree.XSLTError) as e:
+            raise RuntimeError(f"could not transform '{source}': {str(e)}")
+        return 0
+
+
+    def _process_page(self, file : str, app_name : str, dst_folder : str) -> PageResult:
+        """Processes a single HTML document generated by chunking docbook
+
+        The images referenced by the page are patched, the CSS definition is
+        embedded, and the page is written into the destination folder. The
+        page's navigation links are collected from its head.
+
+        If a page cache is used, a page with the same content that was
+        processed using the same settings before is taken from the cache
+        without being parsed; processed pages are added to the cache.
+
+        Args:
+            file (str): The HTML document to process
+            app_name (str): The application name
+            dst_folder (str): The destination folder
+
+        Returns:
+            (PageResult): The page's file name, title, referenced files, hash, navigation links, the number of bytes read and written, the compressed content if kept, the words if indexed, and the index terms
+        """
+        with open(file, "rb") as fd:
+            data = fd.read()
+        return self._process_page_content(os.path.split(file)[1], data, app_name, dst_folder)
+
+
+    def _process_page_content(self, filename : str, data : bytes, app_name : str, dst_folder : str) -> PageResult:
+        """Processes the content of a single HTML document generated by chunking docbook
+
+        See _process_page.
+
+        Args:
+            filename (str): The page's file name
+            data (bytes): The page's (encoded) content
+            app_name (str): The application name
+            dst_folder (str): The destination folder
+
+        Returns:
+            (PageResult): The page's file name, title, referenced files, hash, navigation links, the number of bytes read and written, the compressed content if kept, the words if indexed, and the index terms
+        """
+        files = set()
+        bytes_written = self._bytes_written
+        key = None
+        if self._page_cache is not None:
+            key = content_digest(f"{self._cache_settings}\0{filename}\0".encode("utf-8") + data)
+            cached = self._page_cache.get(key)
+            if cached is not None:
+                metadata, content = cached
+                digest = self._write_output(dst_folder, filename, content)
+                return PageResult(filename, metadata["title"], set(metadata["files"]), digest, metadata["links"], len(data), self._bytes_written - bytes_written,
+                    self._file_data.get(filename), metadata["terms"], [tuple(keyword) for keyword in metadata["keywords"]])
+        html = data.decode("utf-8")
+        if "\r" in html:
+            # as if read in text mode
+            html = html.replace("\r\n", "\n").replace("\r", "\n")
+        html = self.patch_links(html, app_name, files)
+        if html.find('content="text/html; charset=">')>=0:
+            html = html.replace('content="text/html; charset=">', 'content="text/html; charset=UTF-8">')
+        title_end = html.find("</title>") + 8
+        html = html[:title_end] + self._css_definition + html[title_end:]
+        title = self._get_title(html)
+        links = dict(HEAD_LINK_PATTERN.findall(html[:html.find("</head>")]))
+        terms = page_terms(html) if self._search_index else None
+        keywords = page_keywords(html, filename)
+        content = (minify_html(html) if self._optimize else html).encode("utf-8")
+        digest = self._write_output(dst_folder, filename, content)
+        if key is not None:
+            self._page_cache.put(key, { "title": title, "files": sorted(files), "links": links, "terms": terms, "keywords": keywords }, content)
+        return PageResult(filename, title, files, digest, links, len(data), self._bytes_written - bytes_written, self._file_data.get(filename), terms, keywords)
+
+
+    def _completed_chunks(self, folder : str, producer : concurrent.futures.Future) -> Iterator[str]:
+        """Yields the pages written by a running XSLT processor
+
+        A page is yielded as soon as it is complete and did not change since
+        the previous check. Once the processor has finished, the remaining
+        pages and the ones that changed after being yielded are yielded.
+
+        Args:
+            folder (str): The folder the XSLT processor writes the pages into
+            producer (concurrent.futures.Future): The running XSLT processor
+
+        Yields:
+            (str): The paths of the pages
+        """
+        polled = {}
+        yielded = {}
+        while True:
+            finished = producer.done()
+            for file in sorted(glob.glob(os.path.join(folder, "*.html"))):
+                if os.path.split(file)[1]=="index.html" or (not finished and file in yielded):
+                    continue
+                state = file_states([file])[file]
+                if state is None or yielded.get(file)==state:
+                    continue
+                if finished or (polled.get(file)==state and chunk_complete(file)):
+                    yielded[file] = state
+                    yield file
+                polled[file] = state
+            if finished:
+                producer.result()
+                return
+            time.sleep(CHUNK_POLL_INTERVAL)
+
+
+    def _process_chunked(self, folder : str, pages : List[Tuple[str, str, Tuple[int, ...]]], files : Set[str], app_name : str, dst_folder, producer : concurrent.futures.Future = None, base_path : str = None) -> None:
+        """Processes a the set of HTML documents generated by chunking docbook
+
+        If more than one job is set, the pages are processed by a pool of
+        worker processes. The results are merged in the order of the file
+        names, so that the output equals the one of a serial run. The pages'
+        ordering keys are derived from their navigation links. Pages that
+        reference files renamed due to a name collision are processed once
+        more (see _rename_assets).
+
+        If the XSLT processor that writes the pages is given, pages are
+        processed as soon as they are complete (see _process_completed). If a
+        page cache is used, it is trimmed to its size afterwards.
+
+        Args:
+            folder (str): A (temporary) folder to store the xsltproc output to
+            pages (List[Tuple[str, str, Tuple[int, ...]]]): The list of HTML sections to fill
+            files (Set[str]): The set of referenced files (images) to fill
+            app_name (str): The application name
+            producer (concurrent.futures.Future): The running XSLT processor, None if it has finished
+            base_path (str): The folder the references are relative to, None for the folder of the pages
+        """
+        self._set_cache_settings(app_name)
+        # collect entries
+        if producer is not None:
+            sources = self._completed_chunks(folder, producer)
+        else:
+            sources = sorted(glob.glob(os.path.join(folder, "*.html")))
+            sources = [file for file in sources if os.path.split(file)[1]!="index.html"]
+        results = []
+        if self._jobs>1 and (producer is not None or len(sources)>1):
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self._jobs) as executor:
+                if producer is not None:
+                    mapped = self._process_completed(executor, sources, app_name, dst_folder)
+                else:
+                    chunksize = max(1, len(sources) // (self._jobs * 4))
+                    mapped = executor.map(self._process_page, sources, itertools.repeat(app_name), itertools.repeat(dst_folder), chunksize=chunksize)
+                for result in mapped:
+                    self._prestage(result.files)
+                    results.append(result)
+            # pages written by the workers are not counted, yet
+            self._bytes_written += sum(result.bytes_written for result in results)
+        else:
+            for file in sources:
+                results.append(self._process_page(file, app_name, dst_folder))
+                self._prestage(results[-1].files)
+        if producer is not None:
+            # the last result of a page that was processed more than once counts
+            results = sorted({ result.filename: result for result in results }.values(), key=lambda result: result.filename)
+        def reprocess(filename : str) -> PageResult:
+            self._set_cache_settings(app_name)
+            return self._process_page(os.path.join(folder, filename), app_name, dst_folder)
+        results = self._rename_assets(results, base_path if base_path is not None else folder, reprocess)
+        self._merge_pages(results, pages, files)
+        if self._page_cache is not None:
+            self._page_cache.evict()
 
 
-    def _get_name(self, html : str) -> str:
-        """Return the name of the current section.
+    def _process_completed(self, executor : concurrent.futures.Executor, sources : Iterator[str], app_name : str, dst_folder : str) -> Iterator[PageResult]:
+        """Processes the pages written by a running XSLT processor using a pool of workers
+
+        Pages are submitted as they are yielded, with at most twice as many
+        pages being processed as there are jobs, and their results are
+        yielded as soon as they are available. A page yielded again while it
+        is still being processed is submitted again once the running job has
+        finished, so that its last result reflects its final content.
 
         Args:
-            html (str): The HTML snippet to get the next name from
+            executor (concurrent.futures.Executor): The pool of workers
+            sources (Iterator[str]): The paths of the completed pages
+            app_name (str): The application name
+            dst_folder (str): The destination folder
 
-        Returns:
-            (str): The next name found in the snippet
+        Yields:
+            (PageResult): The results of processing the pages in the order they are available
         """
-        name = html[html.find("</a>")+4:]
-        name = name[:name.find("</h")]
-        name = name.replace("\"", "'")
-        name = name.strip()
-        return name
+        running = {}
+        again = set()
+        def submit(file : str) -> None:
+            running[executor.submit(self._process_page, file, app_name, dst_folder)] = file
+        def collect(timeout : float) -> List[PageResult]:
+            done, _ = concurrent.futures.wait(running, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED)
+            results = []
+            for future in done:
+                file = running.pop(future)
+                results.append(future.result())
+                if file in again:
+                    again.discard(file)
+                    submit(file)
+            return results
+        for file in sources:
+            yield from collect(0)
+            while len(running)>=2*self._jobs:
+                yield from collect(None)
+            if file in running.values():
+                again.add(file)
+            else:
+                submit(file)
+        while len(running)!=0:
+            yield from collect(None)
 
 
-    def _get_title(self, html : str) -> str:
-        """Return the name of the current section.
+    def _set_cache_settings(self, app_name : str) -> None:
+        """Computes the hash of the settings processed pages are cached by
 
         Args:
-            html (str): The HTML snippet to get the next name from
-
-        Returns:
-            (str): The next name found in the snippet
+            app_name (str): The application name
         """
-        name = html[html.find("<title>")+7:]
-        name = name[:name.find("</title>")]
-        name = name.replace("\"", "'")
-        name = name.strip()
-        return name
+        if self._page_cache is not None:
+            settings = [self._code_digest, app_name, self._css_definition, self._asset_names, self._optimize, self._search_index]
+            self._cache_settings = content_digest(json.dumps(settings, sort_keys=True).encode("utf-8"))
 
 
-    def patch_links(self, doc : str, app_name : str, files : Set[str]) -> str:
-        """Extracts references to images; patches links to point to main document folder
+    def _rename_assets(self, results : List[PageResult], base_path : str, reprocess : Callable[[str], PageResult], resolve_asset : Callable[[str], bytes] = None) -> List[PageResult]:
+        """Renames referenced files that share a name and processes the pages
+        that reference renamed files once more
 
         Args:
-            doc (str): The HTML document to process
-            app_name (str): The application name
-            files (Set[str]): The container to store links into
+            results (List[PageResult]): The results of processing the pages
+            base_path (str): The folder the references are relative to
+            reprocess (Callable[[str], PageResult]): Processes the page with the given file name again
+            resolve_asset (Callable[[str], bytes]): Returns the content of a referenced file, None for reading the files from the base path
 
         Returns:
-            (str): The changed document
+            (List[PageResult]): The results, including the ones of the processed pages
         """
-        srcs = re.findall(r'src\s*=\s*"(.+?)"', doc)
-        seen = set()
-        for src in srcs:
-            filename = os.path.split(src)[1]
-            if filename in seen:
-                continue
-            seen.add(filename)
-            nsrc = f"qthelp://{app_name}/doc/{filename}"
-            doc = doc.replace(src, nsrc)
-            files.add(src)
-        return doc
+        names = self._resolve_asset_names(set().union(*(result.files for result in results)), base_path, resolve_asset)
+        renamed = set(file for file, name in names.items() if name!=os.path.split(file)[1])
+        if len(renamed)==0:
+            return results
+        self._asset_names = names
+        merged = []
+        for result in results:
+            if len(result.files & renamed)!=0:
+                # the first run of the page counts as read
+                self._bytes_read += result.bytes_read
+                result = reprocess(result.filename)
+                self._prestage(result.files)
+            merged.append(result)
+        return merged
 
 
-    def _write_sections_recursive(self, html : str, dst_folder : str, pages : List[Tuple[str, str]], level : int) -> None:
-        """Writes the given section and it's sub-sections recursively.
+    def _merge_pages(self, results : List[PageResult], pages : List[Tuple[str, str, Tuple[int, ...]]], files : Set[str]) -> None:
+        """Collects the results of processing the pages of chunked HTML
 
-        The id and the name of the section are retrieved, first.
+        The pages' ordering keys are derived from their navigation links.
 
-        Then, the toc HTML file is extended and the reference to this section is
-        appended to the returned toc. Keywords are extended by the section's name.
+        Args:
+            results (List[PageResult]): The results of processing the pages, ordered by their file names
+            pages (List[Tuple[str, str, Tuple[int, ...]]]): The list of HTML sections to fill
+            files (Set[str]): The set of referenced files (images) to fill
+        """
+        keys = document_keys({ result.filename: result.links for result in results })
+        for result in results:
+            pages.append([result.filename, result.title, keys[result.filename]])
+            files.update(result.files)
+            self._outputs[result.filename] = result.digest
+            self._bytes_read += result.bytes_read
+            if result.data is not None:
+                self._file_data[result.filename] = result.data
+            if result.terms is not None:
+                self._page_terms[result.filename] = result.terms
+            self._keywords.update(result.keywords)
 
-        The section is then split along the
-        '&lt;div class="sect&lt;INDENT&gt;"&gt;' elements which are processed
-        recursively.
 
-        The (recursively) collected keywords and toc are returned.
+    def _prestage(self, files : Set[str]) -> None:
+        """Starts staging the given referenced files if a pipeline is running
 
         Args:
-            html (str): The (string) content of the DocBook book section or appendix
-            dst_folder (str): The folder to write the section into
-            pages (List[Tuple[str, str]]): The list of HTML sections to fill
-            level (int): intendation level
+            files (Set[str]): The referenced files
         """
-        db_id = self._get_id(html)
-        name = self._get_name(html)
-        pages.append([f"{db_id}.html", name])
-        subs = html.split(f"<div class=\"sect{level}\">")
-        if subs[0].rfind("</div>")>=len(subs[0])-6:
-            subs[0] = subs[0][:subs[0].rfind("</div>")]
-        # patch links (convert links to anchors, to the proper links to split pages)
-        subs[0] = re.sub(r'<a href="#([^"]*)">([^<]*)</a>', r'<a href="\1.html">\2</a>', subs[0])
-        subs[0] = re.sub(r'<a class="ulink" href="#([^"]*)">([^<]*)</a>', r'<a class="ulink" href="\1.html">\2</a>', subs[0])
-        # write the document part as document
-        subs[0] = '<html><head><meta http-equiv="Content-Type" content="text/html; charset=UTF-8"/>' + self._css_definition + "</head><body>" + subs[0] + "</body></html>"
-        with open(dst_folder + f"/{db_id}.html", "w", encoding="utf-8") as fdo:
-            fdo.write(subs[0])
-        if len(subs)>1:
-            for i,sub in enumerate(subs):
-                if i==0:
-                    continue
-                sub = sub[:sub.rfind("</div>")]
-                self._write_sections_recursive(sub, dst_folder, pages, level+1)
+        if self._pipeline is None:
+            return
+        for file in files:
+            self._pipeline.stage(file, self._asset_names.get(file) or os.path.split(file)[1])
 
 
-    def _process_single(self, source : str, dst_folder : str, pages : List[Tuple[str, str]], files : Set[str], app_name : str) -> None:
-        """Processes a single (not chunked) HTML document generated by docbook
+    def _asset_digest(self, src : str) -> Tuple[str, int]:
+        """Returns the hash of a referenced file
+
+        The hash stored in the manifest of the previous build is reused if
+        the file's size and modification time did not change.
 
         Args:
-            source (str): The HTML document to process
-            dst_folder (str): The folder to write the section into
-            pages (List[Tuple[str, str]]): The list of HTML sections to fill
-            files (Set[str]): The set of referenced files (images) to fill
-            app_name (str): The application name
+            src (str): The path to the referenced file
+
+        Returns:
+            (Tuple[str, int]): The file content's hash as a hex string and the number of bytes read for computing it
         """
-        # read doc
-        with open(source, encoding="utf-8") as fdi:
-            doc = fdi.read()
-        doc = self.patch_links(doc, app_name, files)
-        # process document
-        chapters = doc.split("<div class=\"chapter\">")
-        appendices = chapters[-1].split('<div class="appendix">')
-        chapters = chapters[:-1]
-        chapters.extend(appendices)
-        for c in chapters:
-            self._write_sections_recursive(c, dst_folder, pages, 1)
+        if src in self._asset_sources:
+            return self._asset_sources[src][2], 0
+        stat = os.stat(src)
+        previous = self._previous.get("asset_sources", {}).get(src)
+        if previous is not None and previous[:2]==[stat.st_size, stat.st_mtime_ns]:
+            digest, bytes_read = previous[2], 0
+        else:
+            digest, bytes_read = file_digest(src), stat.st_size
+        self._asset_sources[src] = [stat.st_size, stat.st_mtime_ns, digest]
+        return digest, bytes_read
 
 
-    def _generate_html(self, source : str, folder : str) -> int:
-        """Generates a chunked HTML document from the source docbook document
+    def _resolve_asset_names(self, files : Set[str], base_path : str, resolve_asset : Callable[[str], bytes] = None) -> Dict[str, str]:
+        """Determines the names of the referenced files in the destination folder
+
+        Files are named as their sources. If different files share a name,
+        the first one (in order of their paths) keeps it while the others are
+        renamed by appending a part of their hash.
 
         Args:
-            source (str): The XML DocBook document to process
-            folder (str): A (temporary) folder to store the xsltproc output to
+            files (Set[str]): The referenced files
+            base_path (str): The folder the references are relative to
+            resolve_asset (Callable[[str], bytes]): Returns the content of a referenced file, None for reading the files from the base path
+
+        Returns:
+            (Dict[str, str]): Maps references to the names of the files in the destination folder
         """
-        shutil.rmtree(folder, ignore_errors=True)
-        chunk_xsl_path = os.path.join(os.path.split(__file__)[0], "data", "chunk_html.xsl")
-        try:
-            result = subprocess.run([os.path.join(self._xsltproc_path, 'xsltproc'),
-                "--stringparam", "base.dir", folder,
-                chunk_xsl_path, source], check = True)
-        except subprocess.CalledProcessError:
-            raise RuntimeError("could not invoke xsltproc...")
-        except FileNotFoundError:
-            raise RuntimeError("could not invoke xsltproc...")
-        if isinstance(result, subprocess.CompletedProcess):
-            ret = result.returncode
-        else:
-            ret = 3
-        return ret
+        groups = {}
+        for file in sorted(files):
+            groups.setdefault(os.path.split(file)[1], []).append(file)
+        names = {}
+        for filename, group in groups.items():
+            if len(set(os.path.normpath(os.path.join(base_path, file)) for file in group))<2:
+                names.update({ file: filename for file in group })
+                continue
+            stem, ext = os.path.splitext(filename)
+            digests = []
+            for file in group:
+                if resolve_asset is not None:
+                    data = resolve_asset(file) or b""
+                    digest, bytes_read = content_digest(data), len(data)
+                else:
+                    digest, bytes_read = self._asset_digest(os.path.join(base_path, file))
+                self._bytes_read += bytes_read
+                if digest not in digests:
+                    digests.append(digest)
+                names[file] = filename if digest==digests[0] else f"{stem}-{digest[:8]}{ext}"
+        return names
 
 
-    def _process_chunked(self, folder : str, pages : List[Tuple[str, str]], files : Set[str], app_name : str, dst_folder) -> None:
-        """Processes a the set of HTML documents generated by chunking docbook
+    def _stage_asset(self, src : str, filename : str, dst_folder : str) -> Tuple[str, int, int]:
+        """Puts a referenced file into the destination folder
+
+        The file is not copied again if it is unchanged since the previous
+        build. Depending on the settings, it is hard linked or cloned instead
+        of being copied. If optimizing, PNG and GIF images are written
+        optimized instead; the optimized sizes are recorded by the images'
+        hashes, so that unchanged images are not optimized again.
 
         Args:
-            folder (str): A (temporary) folder to store the xsltproc output to
-            pages (List[Tuple[str, str]]): The list of HTML sections to fill
-            files (Set[str]): The set of referenced files (images) to fill
-            app_name (str): The application name
+            src (str): The path to the referenced file
+            filename (str): The file's name in the destination folder
+            dst_folder (str): The destination folder
+
+        Returns:
+            (Tuple[str, int, int]): The file's hash and the numbers of bytes read and written
         """
-        # collect entries
-        for file in glob.glob(os.path.join(folder, "*.html")):
-            _, filename = os.path.split(file)
-            if filename=="index.html":
-                continue
-            with open(file, encoding="utf-8") as fd:
-                html = fd.read()
-            html = self.patch_links(html, app_name, files)
-            if html.find('content="text/html; charset=">')>=0:
-                html = html.replace('content="text/html; charset=">', 'content="text/html; charset=UTF-8">')
-            title_end = html.find("</title>") + 8
-            html = html[:title_end] + self._css_definition + html[title_end:]
-            title = self._get_title(html)
-            pages.append([filename, title])
-            _, filename = os.path.split(file)
-            with open(os.path.join(dst_folder, filename), "w", encoding="utf-8") as fd:
-                fd.write(html)
-
-
-    def _copy_files(self, files : Set[str], source : str, dst_folder : str) -> None:
+        dst = os.path.join(dst_folder, filename)
+        digest, bytes_read = self._asset_digest(src)
+        size = self._asset_sources[src][0]
+        optimize = self._optimize and os.path.splitext(filename)[1].lower() in OPTIMIZED_IMAGES
+        if optimize:
+            size = self._previous.get("optimized", {}).get(digest, size)
+        if self._previous.get("assets", {}).get(filename)==digest and os.path.isfile(dst) and os.path.getsize(dst)==size:
+            if optimize:
+                self._optimized[digest] = size
+            return digest, bytes_read, 0
+        if optimize:
+            with open(src, "rb") as fdi:
+                data = fdi.read()
+            optimized = optimize_image(data, filename)
+            self._optimized[digest] = len(optimized)
+            if len(optimized)<len(data):
+                # the destination may be a hard link to the source
+                if os.path.lexists(dst):
+                    os.remove(dst)
+                with open(dst, "wb") as fdo:
+                    fdo.write(optimized)
+                return digest, bytes_read + len(data), len(optimized)
+            bytes_read += len(data)
+        if stage_file(src, dst, self._assets_mode)=="copy":
+            return digest, bytes_read + size, size
+        return digest, bytes_read, 0
+
+
+    def _copy_files(self, files : Set[str], source : str, dst_folder : str, staged : Dict[str, Tuple[str, Tuple[str, int, int]]] = None) -> None:
         """Copies referenced files into the destination folder
 
+        Files that are unchanged since the previous build are not copied again;
+        their hashes are only recomputed if their size or modification time
+        changed. Depending on the settings, files are hard linked or cloned
+        instead of being copied. If more than one job is set, the files are
+        copied in parallel. Files staged in advance by a pipeline are only
+        staged again if their name is used by another file.
+
         Args:
             files (Set[str]): The files to compy
             source (str): The origin folder
             dst_folder (str): The destination folder
+            staged (Dict[str, Tuple[str, Tuple[str, int, int]]]): The files staged in advance (see Pipeline.close)
         """
         base_path = source if os.path.isdir(source) else os.path.split(source)[0]
-        for file in files:
-            _, filename = os.path.split(file)
-            shutil.copy(os.path.join(base_path, file), f"{dst_folder}/{filename}")
+        staged = staged if staged is not None else {}
+        sources = {}
+        for file in sorted(files):
+            filename = self._asset_names.get(file) or os.path.split(file)[1]
+            sources.setdefault(filename, os.path.join(base_path, file))
+        def stage(filename : str) -> Tuple[str, int, int]:
+            if filename in staged and staged[filename][0]==sources[filename]:
+                return staged[filename][1]
+            return self._stage_asset(sources[filename], filename, dst_folder)
+        if self._jobs>1 and len(sources)>1:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=self._jobs) as executor:
+                results = list(executor.map(stage, sources))
+        else:
+            results = [stage(filename) for filename in sources]
+        for filename, (digest, bytes_read, bytes_written) in zip(sources, results):
+            self._assets[filename] = digest
+            self._bytes_read += bytes_read
+            self._bytes_written += bytes_written
+        # files staged in advance under a name used by another file
+        for filename, (src, (_, bytes_read, bytes_written)) in staged.items():
+            if sources.get(filename)!=src:
+                self._bytes_read += bytes_read
+                self._bytes_written += bytes_written
 
 
-    def build_toc_sections(self, pages : List[Tuple[str, str, List[int]]]) -> str:
-        """Generates a hierarchical list of pages to be embedded in the toc-section
+    def write_toc_sections(self, fdo : TextIO, pages : List[Tuple[str, str, List[int]]]) -> None:
+        """Writes a hierarchical list of pages to be embedded in the toc-section
         of the qhp-file.
 
         Args:
+            fdo (TextIO): The file to write to
             pages (List[Tuple[str, str, List[int]]]): The sorted list of pages
-
-        Returns:
-            (str): The pages formatted as toc-sections
         """
-        toc = ""
         level = 1
         for ie,e in enumerate(pages):
             filename = e[0]
-            title = e[1]
+            title = xml_text(e[1])
             nlevel = len(e[2])
             while ie!=0 and nlevel<=level:
-                indent = " "*(level*4+8)
-                toc += indent + "</section>\n"
+                fdo.write(" "*(level*4+8) + "</section>\n")
                 level -= 1
             level = nlevel
-            indent = " "*(level*4+8)
-            toc += indent + f"<section title=\"{title}\" ref=\"{filename}\">\n"
+            fdo.write(" "*(level*4+8) + f"<section title=\"{title}\" ref=\"{filename}\">\n")
         while level>0:
-            indent = " "*(level*4+8)
-            toc += indent + "</section>\n"
+            fdo.write(" "*(level*4+8) + "</section>\n")
             level -= 1
-        return toc
+
+
+    def build_toc_sections(self, pages : List[Tuple[str, str, List[int]]]) -> str:
+        """Generates a hierarchical list of pages to be embedded in the toc-section
+        of the qhp-file.
+
+        Args:
+            pages (List[Tuple[str, str, List[int]]]): The sorted list of pages
+
+        Returns:
+            (str): The pages formatted as toc-sections
+        """
+        fdo = io.StringIO()
+        self.write_toc_sections(fdo, pages)
+        return fdo.getvalue()
+
+
+    def write_keywords(self, fdo : TextIO, pages : List[Tuple[str, str, List[int]]], keywords : List[Tuple[str, str]] = ()) -> None:
+        """Writes the keywords to be embedded in the keywords-section of the qhp-file.
+
+        The pages' titles are written first, followed by the given index terms.
+
+        Args:
+            fdo (TextIO): The file to write to
+            pages (List[Tuple[str, str, List[int]]]): The sorted list of pages
+            keywords (List[Tuple[str, str]]): The sorted index terms given as (HTML) name and reference
+        """
+        entries = itertools.chain(((page[1], page[0]) for page in pages), keywords)
+        for ie,(name, ref) in enumerate(entries):
+            if ie!=0:
+                fdo.write("\n")
+            fdo.write(" "*12 + f"<keyword name=\"{xml_text(name)}\" ref=\"./{ref}\"/>")
+
+
+    def write_qhp(self, fdo : TextIO, pages : List[Tuple[str, str, List[int]]], app_name : str, keywords : List[Tuple[str, str]] = ()) -> None:
+        """Writes the QtHelp project by filling the template's placeholders
+
+        Args:
+            fdo (TextIO): The file to write to
+            pages (List[Tuple[str, str, List[int]]]): The sorted list of pages
+            app_name (str): The name of the application
+            keywords (List[Tuple[str, str]]): The sorted index terms given as (HTML) name and reference
+        """
+        parts = self._qhp_parts
+        if self._stylesheet is not None and not any(fnmatch.fnmatch(STYLESHEET_NAME, pattern) for pattern in qhp_project(self._qhp_template, app_name)["file_patterns"]):
+            # list the stylesheet within the (first) files-section
+            parts = list(parts)
+            for i, part in enumerate(parts):
+                if "</files>" in part:
+                    parts[i] = part.replace("</files>", f"    <file>{STYLESHEET_NAME}</file>\n        </files>", 1)
+                    break
+        for part in parts:
+            if part=="%toc%":
+                self.write_toc_sections(fdo, pages)
+            elif part=="%keywords%":
+                self.write_keywords(fdo, pages, keywords)
+            elif part=="%appname%":
+                fdo.write(app_name)
+            else:
+                fdo.write(part)
+
+
+    def _qt_help_commands(self, dst_folder : str, app_name : str) -> List[List[str]]:
+        """Returns the qhelpgenerator invocations needed for the chosen Qt Help files
+
+        The collection project lists the help project to generate, so a single
+        invocation builds both, the .qch and the .qhc file.
+
+        Args:
+            dst_folder (str): The destination folder (where the documentation is built)
+            app_name (str): The name of the application
+
+        Returns:
+            (List[List[str]]): The commands to run one after the other
+        """
+        qhelpgenerator = os.path.join(self._qt_path, "qhelpgenerator")
+        path = os.path.join(dst_folder, app_name)
+        if self._qt_help=="qch":
+            return [[qhelpgenerator, path + ".qhp", "-o", path + ".qch"]]
+        if self._qt_help in ["all", "qhc"]:
+            return [[qhelpgenerator, path + ".qhcp", "-o", path + ".qhc"]]
+        return []
+
+
+    def _qt_help_outputs(self, dst_folder : str, app_name : str) -> List[str]:
+        """Returns the paths of the Qt Help files generated for the chosen mode
+
+        Args:
+            dst_folder (str): The destination folder (where the documentation is built)
+            app_name (str): The name of the application
+
+        Returns:
+            (List[str]): The paths of the generated files
+        """
+        path = os.path.join(dst_folder, app_name)
+        extensions = { "all": [".qch", ".qhc"], "qch": [".qch"], "qhc": [".qhc"] }.get(self._qt_help, [])
+        return [path + extension for extension in extensions]
+
+
+    def generate_qt_help(self, projects : List[Tuple[str, str]]) -> List[ToolResult]:
+        """Runs qhelpgenerator for the given projects
+
+        The invocations for different projects are run concurrently using the
+        set number of jobs. A project's own invocations run one after the other.
+        A build passes its own project only; the manuals of a batch run their
+        invocations concurrently as they are built by parallel worker processes.
+
+        Args:
+            projects (List[Tuple[str, str]]): The projects given as pairs of destination folder and application name
+
+        Returns:
+            (List[ToolResult]): The results of all invocations in the order of the projects
+
+        Raises:
+            RuntimeError: If qhelpgenerator could not be invoked or reported an error
+        """
+        def run_project(project : Tuple[str, str]) -> List[ToolResult]:
+            return [run_tool(command) for command in self._qt_help_commands(*project)]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, self._jobs)) as executor:
+            results = [result for project_results in executor.map(run_project, projects) for result in project_results]
+        for result in results:
+            if result.returncode is None:
+                raise RuntimeError(f"could not invoke qhelpgenerator for '{result.command[1]}': {result.output}")
+            if result.returncode!=0:
+                raise RuntimeError(f"qhelpgenerator failed with ret={result.returncode} for '{result.command[1]}':\n{result.output.strip()}")
+        return results
+
+
+    def write_qt_help(self, dst_folder : str, app_name : str, pages : List[Tuple[str, str, Tuple[int, ...]]], keywords : List[Tuple[str, str]] = ()) -> None:
+        """Writes the chosen Qt Help files directly, without qhelpgenerator
+
+        The table of contents and the keywords are built from the given pages,
+        the given index terms are added to the keywords.
+        The compressed pages are taken from memory; only the images are read
+        from the destination folder. The namespace, the virtual folder, the
+        filter attributes, and the file patterns are taken from the QtHelp
+        project template.
+
+        Args:
+            dst_folder (str): The destination folder (where the documentation is built)
+            app_name (str): The name of the application
+            pages (List[Tuple[str, str, Tuple[int, ...]]]): The sorted list of pages
+            keywords (List[Tuple[str, str]]): The sorted index terms given as (HTML) name and reference
+        """
+        project = qhp_project(self._qhp_template, app_name)
+        path = os.path.join(dst_folder, app_name)
+        if self._qt_help in ["all", "qch"]:
+            titles = { page[0]: plain_text(page[1]) for page in pages }
+            patterns = project["file_patterns"] + ([STYLESHEET_NAME] if self._stylesheet is not None else [])
+            files = []
+            for filename in sorted(set(self._file_data) | set(self._assets)):
+                if not any(fnmatch.fnmatch(filename, pattern) for pattern in patterns):
+                    continue
+                data = self._file_data.get(filename)
+                if data is None:
+                    with open(os.path.join(dst_folder, filename), "rb") as fdi:
+                        data = fdi.read()
+                    self._bytes_read += len(data)
+                    data = qcompress(data)
+                files.append((filename, titles.get(filename, ""), data))
+            contents = [(len(page[2])-1, page[0], plain_text(page[1])) for page in pages]
+            entries = [(plain_text(page[1]), page[0]) for page in pages] + [(plain_text(name), ref) for name, ref in keywords]
+            write_qch(path + ".qch", project, contents, entries, files)
+        if self._qt_help in ["all", "qhc"]:
+            write_qhc(path + ".qhc", project, app_name + ".qch")
 
 
     def process(self, source : str, dst_folder : str, app_name : str) -> None:
         """Performs the conversion
 
+        A manifest of the build is stored in the destination folder. When
+        building into the same folder again using the same settings, only
+        changed pages and images are written, files that are no longer
+        generated are removed, and the Qt Help generation is skipped if
+        nothing has changed.
+
+        The wall time, the CPU time, the bytes read and written, and the
+        numbers of pages and assets of the single build stages are stored
+        in the attribute timings.
+
         Args:
             source (str): The input file or folder
             dst_folder (str): The destination folder (where the documentation is built)
             app_name (str): The name of the application
         """
-        # clear output folder
-        shutil.rmtree(dst_folder, ignore_errors=True)
-        os.makedirs(dst_folder, exist_ok=True)
+        self.timings = []
+        # reuse or clear output folder
+        with self._stage("prepare"):
+            settings = content_digest("\0".join([__version__, app_name, self._css_definition, self._qhp_template, self._assets_mode, self._qt_help_backend, "optimize" if self._optimize else ""]).encode("utf-8"))
+            self._load_manifest(dst_folder, settings)
         # process
-        pages = []
-        files = set()
-        if os.path.isdir(source):
-            print(f"Processing chunked HTML output from '{source}'")
-            self._process_chunked(source, pages, files, app_name, dst_folder)
-        elif os.path.isfile(source):
-            if source.endswith(".html"):
-                print(f"Processing single HTML output from '{source}'")
-                self._process_single(source, dst_folder, pages, files, app_name)
-            elif source.endswith(".xml"):
-                print(f"Processing docboook '{source}'")
-                tmp_dir = "_tmp_db2qthelp_dir"
-                os.makedirs(tmp_dir, exist_ok=True)
-                print("... generating chunked HTML")
-                ret = self._generate_html(source, tmp_dir)
-                if ret!=0:
-                    raise ValueError(f"xsltproc failed with ret={ret}")
-                print("... processing chunked HTML")
-                self._process_chunked(tmp_dir, pages, files, app_name, dst_folder)
-                shutil.rmtree(tmp_dir, ignore_errors=True)
+        base_path = source if os.path.isdir(source) else os.path.split(source)[0]
+        tmp_dir = None
+        xslt = None
+        producer = None
+        staged = None
+        try:
+            if os.path.isdir(source):
+                print(f"Processing chunked HTML output from '{source}'")
+                folder = source
+            elif os.path.isfile(source):
+                if source.endswith(".html"):
+                    print(f"Processing single HTML output from '{source}'")
+                    folder = None
+                elif source.endswith(".xml"):
+                    print(f"Processing docboook '{source}'")
+                    tmp_dir = tempfile.mkdtemp(prefix="db2qthelp_")
+                    print("... generating chunked HTML")
+                    if self._pipelined:
+                        # the pages are processed while the XSLT processor writes them
+                        xslt = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+                        producer = xslt.submit(self._generate_html, source, tmp_dir)
+                    else:
+                        with self._stage("xslt"):
+                            ret = self._generate_html(source, tmp_dir)
+                            self._bytes_read += os.path.getsize(source)
+                            self._bytes_written += sum(os.path.getsize(file) for file in glob.glob(os.path.join(tmp_dir, "*.html")))
+                        if ret!=0:
+                            raise ValueError(f"xsltproc failed with ret={ret}")
+                    print("... processing chunked HTML")
+                    folder = tmp_dir
+                else:
+                    raise ValueError(f"unsupported file extension of '{source}'")
             else:
-                raise ValueError(f"unsupported file extension of '{source}'")
-        else:
-            raise ValueError(f"unknown file '{source}'")
+                raise ValueError(f"unknown file '{source}'")
+            if self._pipelined:
+                self._pipeline = Pipeline(lambda src, filename: self._stage_asset(src, filename, dst_folder), base_path, self._jobs)
+            with self._stage("pages") as stage:
+                pages = []
+                files = set()
+                if folder is not None:
+                    self._process_chunked(folder, pages, files, app_name, dst_folder, producer, base_path)
+                else:
+                    # name the referenced files before writing any page
+                    anchors, references = self._scan_single(source)
+                    self._asset_names = self._resolve_asset_names(references, base_path)
+                    self._process_single(source, dst_folder, pages, files, app_name, anchors)
+                if self._pipeline is not None:
+                    pipeline, self._pipeline = self._pipeline, None
+                    staged = pipeline.close()
+                if len(self.unresolved)!=0:
+                    print(f"db2qthelp: warning: unresolved links to {', '.join(self.unresolved)} in '{source}'", file=sys.stderr)
+                if producer is not None:
+                    ret = producer.result()
+                    self._bytes_read += os.path.getsize(source)
+                    self._bytes_written += sum(os.path.getsize(file) for file in glob.glob(os.path.join(tmp_dir, "*.html")))
+                    if ret!=0:
+                        raise ValueError(f"xsltproc failed with ret={ret}")
+                stage["pages"] = len(pages)
+        finally:
+            if self._pipeline is not None:
+                pipeline, self._pipeline = self._pipeline, None
+                with contextlib.suppress(OSError):
+                    pipeline.close()
+            if xslt is not None:
+                xslt.shutdown(wait=True)
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
         # copy images etc.
-        self._copy_files(files, source, dst_folder)
-        # sort pages
-        # https://stackoverflow.com/questions/14861843/sorting-chapters-numbers-like-1-2-1-or-1-4-2-4
-        def expand_chapter(ch, depth):
-            ch = ch + [0,] * (depth - len(ch))
-            return ch
-        max_depth = 0
-        for page in pages:
-            if page[1][0]=='A':
-                chapter = [ord(page[1].split()[1][0]) + 1000]
-            else:
-                chapter = [int(x) for x in page[1].split()[0].split(".")[:-1]]
-            if len(chapter)==0:
-                chapter = [0]
-            page.append(chapter)
-            max_depth = max(len(chapter), max_depth)
-        pages.sort(key = lambda x: expand_chapter(x[2], max_depth))
-        #
-        toc = self.build_toc_sections(pages)
-        keywords = "\n".join(" "*12 + f"<keyword name=\"{page[1]}\" ref=\"./{page[0]}\"/>" for page in pages)
-        # read template, write extended by collected data
-        path = f"{dst_folder}/{app_name}"
-        with open(path + ".qhp", "w", encoding="utf-8") as fdo:
-            fdo.write(self._qhp_template.replace("%toc%", toc).replace("%keywords%", keywords).replace("%appname%", app_name))
-        # generate qhcp
-        with open(path + ".qhcp", "w", encoding="utf-8") as fdo:
-            fdo.write(QCHP.replace("%appname%", app_name))
+        with self._stage("assets") as stage:
+            if self._stylesheet is not None:
+                self._outputs[STYLESHEET_NAME] = self._write_output(dst_folder, STYLESHEET_NAME, self._stylesheet)
+            self._copy_files(files, source, dst_folder, staged)
+            stage["assets"] = len(self._assets)
+        with self._stage("toc"):
+            # sort pages by their ordering keys
+            pages.sort(key = lambda page: page[2])
+            keywords = sorted_keywords(self._keywords)
+            #
+            # write template extended by collected data
+            self._outputs[f"{app_name}.qhp"] = self._stream_output(dst_folder, f"{app_name}.qhp", lambda fdo: self.write_qhp(fdo, pages, app_name, keywords))
+            # generate qhcp
+            qhcp = QCHP if self._qt_help!="qhc" else re.sub(r"\s*<generate>.*</generate>", "", QCHP, flags=re.DOTALL)
+            self._outputs[f"{app_name}.qhcp"] = self._write_output(dst_folder, f"{app_name}.qhcp", qhcp.replace("%appname%", app_name))
+        # build the full-text search index
+        if self._search_index:
+            with self._stage("search"):
+                index = SearchIndex.build([(page[0], plain_text(page[1])) for page in pages], self._page_terms)
+                self._outputs[f"{app_name}{SEARCH_INDEX_SUFFIX}"] = self._write_output(dst_folder, f"{app_name}{SEARCH_INDEX_SUFFIX}", index.to_bytes())
         # generate QtHelp
-        os.system(f"{os.path.join(self._qt_path, 'qhelpgenerator')} {path}.qhp -o {path}.qch")
-        os.system(f"{os.path.join(self._qt_path, 'qhelpgenerator')} {path}.qhcp -o {path}.qhc")
+        with self._stage("qt_help"):
+            if self._qt_help=="qhc" and not os.path.isfile(os.path.join(dst_folder, f"{app_name}.qch")):
+                # the collection registers the help file without generating it
+                raise RuntimeError(f"the Qt Help collection registers '{os.path.join(dst_folder, app_name)}.qch', which does not exist; generate it using --qt-help qch or all")
+            unchanged = self._outputs==self._previous.get("outputs") and self._assets==self._previous.get("assets")
+            if unchanged and all(os.path.exists(path) for path in self._qt_help_outputs(dst_folder, app_name)):
+                self.tool_results = []
+                if self._qt_help!="none":
+                    print("... Qt Help files are up to date")
+            elif self._qt_help_backend=="native":
+                self.tool_results = []
+                self.write_qt_help(dst_folder, app_name, pages, keywords)
+            else:
+                self.tool_results = self.generate_qt_help([(dst_folder, app_name)])
+                self._bytes_written += sum(os.path.getsize(path) for path in self._qt_help_outputs(dst_folder, app_name) if os.path.exists(path))
+        with self._stage("manifest"):
+            self._save_manifest(dst_folder, settings)
+
+
+    def convert(self, documents : Union[str, bytes, Iterable[Tuple[str, Union[str, bytes]]]], app_name : str, resolve_asset : Callable[[str], bytes] = None, sink : Callable[[str, bytes], None] = None) -> HelpBundle:
+        """Performs the conversion in memory
+
+        A single HTML document is given as its content, chunked HTML as pairs
+        of file name and content (index.html is skipped). The content of the
+        referenced images is obtained from the given resolver using the
+        references found in the pages; images it does not return are listed
+        as missing.
+
+        Nothing is read from or written to the file system: neither a
+        manifest nor the page cache is used, and no Qt Help files are
+        generated. If a sink is given, each generated file is passed to it
+        as soon as it is complete, e.g. for writing or serving it; pages of
+        chunked HTML that reference images renamed due to a name collision
+        are passed again.
+
+        The conversion uses an own copy of the converter's state, so that
+        the method may be called by several threads at once; the stages of
+        the last finished conversion are stored in the attribute timings.
+        If a profiler is set, it is shared by the concurrent calls.
+
+        Args:
+            documents (Union[str, bytes, Iterable[Tuple[str, Union[str, bytes]]]]): The single HTML document or the pages of chunked HTML given as file name and content, optionally encoded
+            app_name (str): The name of the application
+            resolve_asset (Callable[[str], bytes]): Returns the content of a referenced file or None if it is not available, None for not including any images
+            sink (Callable[[str, bytes], None]): Receives the name and the encoded content of each generated file
+
+        Returns:
+            (HelpBundle): The pages in order of the table of contents, the other generated files (stylesheet, images, and search index), the QtHelp project, the sorted pages given as file name, (HTML) title, and ordering key, the keywords given as (HTML) name and reference, the unresolved links, and the missing images
+        """
+        converter = copy.copy(self)
+        converter._page_cache = None
+        bundle = converter._convert(documents, app_name, resolve_asset, sink)
+        self.timings = converter.timings
+        return bundle
+
+
+    def _convert(self, documents : Union[str, bytes, Iterable[Tuple[str, Union[str, bytes]]]], app_name : str, resolve_asset : Callable[[str], bytes] = None, sink : Callable[[str, bytes], None] = None) -> HelpBundle:
+        """Performs the conversion in memory using this converter's state
+
+        See convert.
+
+        Args:
+            documents (Union[str, bytes, Iterable[Tuple[str, Union[str, bytes]]]]): The single HTML document or the pages of chunked HTML given as file name and content, optionally encoded
+            app_name (str): The name of the application
+            resolve_asset (Callable[[str], bytes]): Returns the content of a referenced file or None if it is not available, None for not including any images
+            sink (Callable[[str, bytes], None]): Receives the name and the encoded content of each generated file
+
+        Returns:
+            (HelpBundle): The generated files and the collected data (see convert)
+        """
+        if resolve_asset is None:
+            # images are not read from the file system
+            resolve_asset = lambda reference: None
+        outputs = {}
+        def collect(filename : str, data : bytes) -> None:
+            outputs[filename] = data
+            if sink is not None:
+                sink(filename, data)
+        self.timings = []
+        self._start_build({})
+        self._sink = collect
+        try:
+            with self._stage("pages") as stage:
+                pages = []
+                files = set()
+                if isinstance(documents, (str, bytes)):
+                    document = documents.encode("utf-8") if isinstance(documents, str) else documents
+                    anchors, references = self._scan_single(document)
+                    self._asset_names = self._resolve_asset_names(references, "", resolve_asset)
+                    self._process_single(document, "", pages, files, app_name, anchors)
+                else:
+                    chunks = dict(sorted(((filename, content.encode("utf-8") if isinstance(content, str) else content) for filename, content in documents if filename!="index.html"), key=lambda chunk: chunk[0]))
+                    results = [self._process_page_content(filename, content, app_name, "") for filename, content in chunks.items()]
+                    results = self._rename_assets(results, "", lambda filename: self._process_page_content(filename, chunks[filename], app_name, ""), resolve_asset)
+                    self._merge_pages(results, pages, files)
+                stage["pages"] = len(pages)
+            with self._stage("assets") as stage:
+                if self._stylesheet is not None:
+                    self._outputs[STYLESHEET_NAME] = self._write_output("", STYLESHEET_NAME, self._stylesheet)
+                missing = []
+                for file in sorted(files):
+                    filename = self._asset_names.get(file) or os.path.split(file)[1]
+                    if filename in self._assets:
+                        continue
+                    data = resolve_asset(file)
+                    if data is None:
+                        missing.append(file)
+                        continue
+                    self._bytes_read += len(data)
+                    if self._optimize:
+                        data = optimize_image(data, filename)
+                    self._assets[filename] = self._write_output("", filename, data)
+                stage["assets"] = len(self._assets)
+            with self._stage("toc"):
+                pages.sort(key = lambda page: page[2])
+                keywords = sorted_keywords(self._keywords)
+                fdo = io.StringIO()
+                self.write_qhp(fdo, pages, app_name, keywords)
+                qhp = fdo.getvalue()
+                self._outputs[f"{app_name}.qhp"] = self._write_output("", f"{app_name}.qhp", qhp)
+            if self._search_index:
+                with self._stage("search"):
+                    index = SearchIndex.build([(page[0], plain_text(page[1])) for page in pages], self._page_terms)
+                    self._outputs[f"{app_name}{SEARCH_INDEX_SUFFIX}"] = self._write_output("", f"{app_name}{SEARCH_INDEX_SUFFIX}", index.to_bytes())
+        finally:
+            self._sink = None
+        names = set(page[0] for page in pages) | { f"{app_name}.qhp" }
+        return HelpBundle({ page[0]: outputs[page[0]] for page in pages },
+            { filename: data for filename, data in outputs.items() if filename not in names },
+            qhp, [(page[0], page[1], page[2]) for page in pages],
+            [(page[1], page[0]) for page in pages] + keywords, list(self.unresolved), missing)
+
+
+    def process_batch(self, manuals : List[Tuple[str, str, str]]) -> List[Tuple[str, str, float, List[Dict[str, float]]]]:
+        """Builds several manuals
+
+        The manuals are built in parallel by a pool of worker processes if
+        more than one job is set; the pages of each manual are then processed
+        one after the other. Each manual uses an own temporary folder. A
+        failing manual does not stop the others. Manuals built by worker
+        processes are not profiled.
+
+        Args:
+            manuals (List[Tuple[str, str, str]]): The manuals to build, given as input, destination folder, and application name
+
+        Returns:
+            (List[Tuple[str, str, float, List[Dict[str, float]]]]): Per manual the application name, the error message (None on success), the duration in seconds, and the measured build stages
+        """
+        if self._jobs>1 and len(manuals)>1:
+            converter = copy.copy(self)
+            converter._jobs = 1
+            converter.profile = None
+            with concurrent.futures.ProcessPoolExecutor(max_workers=self._jobs) as executor:
+                results = list(executor.map(_process_manual, itertools.repeat(converter), manuals))
+        else:
+            results = [_process_manual(self, manual) for manual in manuals]
+        return [(manual[2], error, duration, timings) for manual, (error, duration, timings) in zip(manuals, results)]
+
+
+    def watched_files(self, source : str) -> List[str]:
+        """Returns the files a build of the given input depends on
+
+        These are the input itself (the pages of chunked HTML), the files
+        included by a DocBook document, and the images referenced by the last
+        build.
+
+        Args:
+            source (str): The input file or folder
+
+        Returns:
+            (List[str]): The paths of the files
+        """
+        if os.path.isdir(source):
+            files = sorted(glob.glob(os.path.join(source, "*.html")))
+        else:
+            files = [source]
+            if source.endswith(".xml"):
+                files.extend(document_includes(source))
+        return files + sorted(self._asset_sources)
+
+
+    def watch(self, source : str, dst_folder : str, app_name : str, css_file : str = None, qhp_template_file : str = None,
+            interval : float = WATCH_INTERVAL, debounce : float = WATCH_DEBOUNCE, stop : threading.Event = None) -> int:
+        """Builds the documentation and rebuilds it whenever its inputs change
+
+        The input, the files it includes, the images it references, the CSS
+        definition file, and the QtHelp project template are polled. A rebuild
+        starts once they did not change for the debounce time, so that bursts
+        of changes result in a single build. The builds are incremental, so
+        only changed pages and the QtHelp project are written. The CSS
+        definition and the template are only read again if they changed.
+        Errors are reported without stopping to watch.
+
+        Args:
+            source (str): The input file or folder
+            dst_folder (str): The destination folder (where the documentation is built)
+            app_name (str): The name of the application
+            css_file (str): The CSS definition file, None if the default one is used
+            qhp_template_file (str): The QtHelp project template file, None if the default one is used
+            interval (float): The time between checks in seconds
+            debounce (float): The time the inputs must stay unchanged before rebuilding in seconds
+            stop (threading.Event): Stops watching when set; watching stops on a keyboard interrupt, too
+
+        Returns:
+            (int): The number of rebuilds
+        """
+        stop = stop if stop is not None else threading.Event()
+        settings_files = [path for path in [css_file, qhp_template_file] if path is not None]
+        def build() -> Dict[str, Tuple[int, int]]:
+            # inputs changing during the build are detected afterwards
+            states = file_states(self.watched_files(source) + settings_files)
+            try:
+                self.process(source, dst_folder, app_name)
+            except Exception as e:
+                print(f"db2qthelp: error: {str(e)}", file=sys.stderr)
+            paths = self.watched_files(source) + settings_files
+            states.update(file_states([path for path in paths if path not in states]))
+            return { path: states[path] for path in paths }
+        builds = 0
+        try:
+            states = build()
+            print(f"Watching for changes of '{source}'...")
+            while not stop.wait(interval):
+                current = file_states(self.watched_files(source) + settings_files)
+                if current==states:
+                    continue
+                # wait until the changes are finished
+                settled = time.monotonic()
+                while not stop.wait(min(interval, debounce)):
+                    latest = file_states(self.watched_files(source) + settings_files)
+                    if latest!=current:
+                        current = latest
+                        settled = time.monotonic()
+                    elif time.monotonic() - settled>=debounce:
+                        break
+                if stop.is_set():
+                    break
+                changed = [path for path in sorted(set(states) | set(current)) if states.get(path)!=current.get(path)]
+                print(f"... rebuilding after changes of {', '.join(os.path.split(path)[1] for path in changed)}")
+                try:
+                    if css_file in changed:
+                        with open(css_file, encoding="utf-8") as fdi:
+                            self.set_css_definition(fdi.read())
+                    if qhp_template_file in changed:
+                        with open(qhp_template_file, encoding="utf-8") as fdi:
+                            self.set_qhp_template(fdi.read())
+                except OSError as e:
+                    print(f"db2qthelp: error: {str(e)}", file=sys.stderr)
+                states = build()
+                builds += 1
+        except KeyboardInterrupt: # pragma: no cover
+            pass
+        return builds
+
+
+def _process_manual(converter : Db2QtHelp, manual : Tuple[str, str, str]) -> Tuple[str, float, List[Dict[str, float]]]:
+    """Builds a single manual of a batch
+
+    Args:
+        converter (Db2QtHelp): The converter to use
+        manual (Tuple[str, str, str]): The input, the destination folder, and the application name
+
+    Returns:
+        (Tuple[str, float, List[Dict[str, float]]]): The error message (None on success), the duration in seconds, and the measured build stages
+    """
+    start = time.perf_counter()
+    error = None
+    try:
+        converter.process(*manual)
+    except Exception as e:
+        error = str(e)
+    return error, time.perf_counter() - start, converter.timings
+
+
+def read_batch(filename : str) -> Dict[str, Tuple[str, str, str]]:
+    """Reads the list of manuals to build from a batch file
+
+    The batch file is a configuration file with one section per manual.
+    Each section must define the input; the destination folder and the
+    application name default to the section's name. Relative paths are
+    resolved against the folder of the batch file.
+
+    Args:
+        filename (str): The batch file to read
+
+    Returns:
+        (Dict[str, Tuple[str, str, str]]): Maps the sections' names to the manuals given as input, destination folder, and application name
+    """
+    batch = configparser.ConfigParser()
+    batch.read([filename], encoding="utf-8")
+    base_path = os.path.dirname(filename)
+    manuals = {}
+    for section in batch.sections():
+        entry = batch[section]
+        source = entry.get("input")
+        source = os.path.join(base_path, source) if source is not None else None
+        manuals[section] = (source, os.path.join(base_path, entry.get("destination", section)), entry.get("appname", section))
+    return manuals
+
+
+def check_input(source : str) -> str:
+    """Checks whether the given input can be processed
+
+    Args:
+        source (str): The input file or folder
+
+    Returns:
+        (str): The error message, None if the input is valid
+    """
+    if not os.path.isdir(source) and (not source.endswith(".html") and not source.endswith(".xml")):
+        return f"unrecognized input extension '{os.path.splitext(source)[1]}'"
+    if not os.path.exists(source):
+        return f"did not find input '{source}'"
+    return None
 
 
 def main(arguments : List[str] = None) -> int:
@@ -436,14 +3178,33 @@ def main(arguments : List[str] = None) -> int:
         description="a DocBook book to QtHelp project converter",
         epilog='(c) Daniel Krajzewicz 2022-2025')
     parser.add_argument("-i", "--input", dest="input", default=None, help="Defines the DocBook HTML document to parse")
+    parser.add_argument("-b", "--batch", dest="batch", default=None, help="Defines a batch file listing several manuals to build")
     parser.add_argument("-d", "--destination", dest="destination", default="qtdoc", help="Sets the output folder")
     parser.add_argument("-a", "--appname", dest="appname", default="na", help="Sets the name of the application")
     parser.add_argument("--css-definition", dest="css_definition", default=None, help="Defines the CSS definition file to use")
+    parser.add_argument("--stylesheet", dest="stylesheet", choices=STYLESHEET_MODES, default="inline", help="Selects whether the CSS definition is embedded into the pages or written into a stylesheet")
+    parser.add_argument("--minify-css", dest="minify_css", action="store_true", default=False, help="If set, the CSS definition is minified")
     parser.add_argument("--generate-css-definition", dest="generate_css_definition", action="store_true", default=False, help="If set, a CSS definition file is generated")
     parser.add_argument("--qhp-template", dest="qhp_template", default=None, help="Defines the QtHelp project (.qhp) template to use")
     parser.add_argument("--generate-qhp-template", dest="generate_qhp_template", action="store_true", default=False, help="If set, a QtHelp project (.qhp) template is generated")
     parser.add_argument("-Q", "--qt-path", dest="qt_path", default="", help="Sets the path to the Qt binaries")
     parser.add_argument("-X", "--xslt-path", dest="xslt_path", default="", help="Sets the path to xsltproc")
+    parser.add_argument("--xslt-backend", dest="xslt_backend", choices=XSLT_BACKENDS, default="xsltproc", help="Selects the XSLT processor used for converting DocBook documents")
+    parser.add_argument("--docbook-xsl", dest="docbook_xsl", default=None, help="Sets the folder the DocBook XSL stylesheets are cached in")
+    parser.add_argument("--fetch-docbook-xsl", dest="fetch_docbook_xsl", action="store_true", default=False, help="If set, the DocBook XSL stylesheets are downloaded into the cache")
+    parser.add_argument("--fetch-unverified", dest="fetch_unverified", action="store_true", default=False, help="If set, the DocBook XSL stylesheets are fetched even if the archive's checksum is not known")
+    parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=1, help="Sets the number of parallel jobs used for processing chunked HTML")
+    parser.add_argument("--assets", dest="assets", choices=ASSET_MODES, default="copy", help="Selects how referenced images are put into the destination folder")
+    parser.add_argument("--qt-help", dest="qt_help", choices=QT_HELP_MODES, default="all", help="Selects the Qt Help files to generate")
+    parser.add_argument("--qt-help-backend", dest="qt_help_backend", choices=QT_HELP_BACKENDS, default="qhelpgenerator", help="Selects how Qt Help files are generated; the native backend is experimental")
+    parser.add_argument("--optimize", dest="optimize", action="store_true", default=False, help="If set, the pages are minified and PNG and GIF images are optimized losslessly")
+    parser.add_argument("--search-index", dest="search_index", action="store_true", default=False, help="If set, a full-text search index is written next to the Qt Help files")
+    parser.add_argument("--pipeline", dest="pipeline", action="store_true", default=False, help="If set, XSLT, page processing, writing, and staging images overlap")
+    parser.add_argument("--cache-dir", dest="cache_dir", default=None, help="Sets the folder processed pages are cached in across builds")
+    parser.add_argument("--no-cache", dest="no_cache", action="store_true", default=False, help="If set, processed pages are not cached across builds")
+    parser.add_argument("--watch", dest="watch", action="store_true", default=False, help="If set, the documentation is rebuilt whenever its inputs change")
+    parser.add_argument("--timings", dest="timings", default=None, help="Writes a JSON report of the time spent in the build stages into the named file")
+    parser.add_argument("--profile", dest="profile", default=None, help="Writes a cProfile dump of the Python build stages into the named file")
     parser.add_argument('--version', action='version', version='%(prog)s 0.4.0')
     parser.set_defaults(**defaults)
     args = parser.parse_args(remaining_argv)
@@ -461,14 +3222,48 @@ def main(arguments : List[str] = None) -> int:
             fdo.write(QHP_TEMPLATE)
         print (f"Written qhp template to '{template_name}'")
         sys.exit(0)
+    # - fetch the DocBook XSL stylesheets and quit, if wished
+    if args.fetch_docbook_xsl:
+        docbook_xsl = args.docbook_xsl if args.docbook_xsl is not None else default_docbook_xsl()
+        try:
+            num = fetch_docbook_xsl(docbook_xsl, unverified=args.fetch_unverified)
+        except Exception as e:
+            print(f"db2qthelp: error: could not fetch the DocBook XSL stylesheets: {str(e)}", file=sys.stderr)
+            raise SystemExit(2)
+        print (f"Fetched {num} DocBook XSL files into '{docbook_xsl}'")
+        sys.exit(0)
     # check
     errors = []
-    if args.input is None:
+    manuals = None
+    if args.batch is not None:
+        if not os.path.exists(args.batch):
+            errors.append(f"did not find batch file '{args.batch}'")
+        else:
+            manuals = read_batch(args.batch)
+            if len(manuals)==0:
+                errors.append(f"batch file '{args.batch}' does not list any manual")
+            for name, (source, destination, app_name) in manuals.items():
+                error = check_input(source) if source is not None else f"no input given for manual '{name}' in batch file '{args.batch}'"
+                if error is not None:
+                    errors.append(error)
+            destinations = [os.path.abspath(manual[1]) for manual in manuals.values()]
+            if len(set(destinations))!=len(destinations):
+                errors.append(f"manuals in batch file '{args.batch}' share a destination folder")
+        for option, value, default in [("--input", args.input, None), ("--destination", args.destination, "qtdoc"), ("--appname", args.appname, "na")]:
+            if value!=default:
+                # the batch file defines them per manual
+                errors.append(f"the option {option} cannot be used together with --batch")
+        if args.watch:
+            errors.append("the option --watch cannot be used together with --batch")
+        if args.profile is not None and args.jobs>1:
+            # manuals built by worker processes are not profiled
+            errors.append("the option --profile cannot be used together with --batch and more than one job")
+    elif args.input is None:
         errors.append("no input file given (use -i <HTML_DOCBOOK>)...")
-    elif not os.path.isdir(args.input) and (not args.input.endswith(".html") and not args.input.endswith(".xml")):
-        errors.append(f"unrecognized input extension '{os.path.splitext(args.input)[1]}'")
-    elif not os.path.exists(args.input):
-        errors.append(f"did not find input '{args.input}'")
+    else:
+        error = check_input(args.input)
+        if error is not None:
+            errors.append(error)
     if args.qhp_template is not None and not os.path.exists(args.qhp_template):
         errors.append(f"did not find QtHelp project (.qhp) template file '{args.qhp_template}'; you may generate one using the option --generate-qhp-template")
     if args.css_definition is not None and not os.path.exists(args.css_definition):
@@ -488,12 +3283,36 @@ def main(arguments : List[str] = None) -> int:
             css_definition = fdi.read()
     # process
     ret = 0
-    db2qthelp = Db2QtHelp(args.qt_path, args.xslt_path, css_definition, qhp_template)
-    try:
-        db2qthelp.process(args.input, args.destination, args.appname)
-    except Exception as e:
-        print(f"db2qthelp: error: {str(e)}", file=sys.stderr)
-        ret = 2
+    db2qthelp = Db2QtHelp(args.qt_path, args.xslt_path, css_definition, qhp_template, jobs=args.jobs, qt_help=args.qt_help,
+        xslt_backend=args.xslt_backend, docbook_xsl=args.docbook_xsl, assets=args.assets, profile=args.profile is not None,
+        qt_help_backend=args.qt_help_backend, search_index=args.search_index, pipeline=args.pipeline, stylesheet=args.stylesheet,
+        minify_css=args.minify_css, optimize=args.optimize, page_cache=None if args.no_cache else (args.cache_dir or default_page_cache()))
+    if manuals is not None:
+        results = db2qthelp.process_batch(list(manuals.values()))
+        print("Summary:")
+        for name, (_, error, duration, _) in zip(manuals, results):
+            if error is None:
+                print(f" {name}: ok ({datetime.timedelta(seconds=duration)})")
+            else:
+                print(f" {name}: failed ({datetime.timedelta(seconds=duration)}): {error}")
+                ret = 2
+        timings = { name: result[3] for name, result in zip(manuals, results) }
+    elif args.watch:
+        db2qthelp.watch(args.input, args.destination, args.appname, args.css_definition, args.qhp_template)
+        timings = { args.appname: db2qthelp.timings }
+    else:
+        try:
+            db2qthelp.process(args.input, args.destination, args.appname)
+        except Exception as e:
+            print(f"db2qthelp: error: {str(e)}", file=sys.stderr)
+            ret = 2
+        timings = { args.appname: db2qthelp.timings }
+    # - write the timings report and the profile, if wished
+    if args.timings is not None:
+        with open(args.timings, "w", encoding="utf-8") as fdo:
+            json.dump(timings_report(timings), fdo, indent=1)
+    if args.profile is not None:
+        db2qthelp.profile.dump_stats(args.profile)
     return ret
 
 
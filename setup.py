@@ -65,6 +65,9 @@ setuptools.setup(
         "Topic :: Text Processing :: Filters",
         "Topic :: Utilities"
     ],
+    extras_require={
+        'lxml': ['lxml'],
+    },
     python_requires='>=3, <4',
 )
 
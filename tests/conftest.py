@@ -0,0 +1,46 @@
+from __future__ import print_function
+"""db2qthelp - test configuration.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import pytest
+
+
+# --- fixtures ------------------------------------------------------
+@pytest.fixture(autouse=True)
+def page_cache(tmp_path_factory, monkeypatch):
+    """Keeps the page cache of builds started by tests out of the user's cache folder"""
+    folder = tmp_path_factory.mktemp("page_cache")
+    monkeypatch.setenv("DB2QTHELP_PAGE_CACHE", str(folder))
+    return folder
+
+
+@pytest.fixture(autouse=True)
+def qhelpgenerator(tmp_path_factory, monkeypatch):
+    """Puts a fake qhelpgenerator that only writes its output file onto the PATH, so that tests do not depend on an installed Qt"""
+    folder = tmp_path_factory.mktemp("qt")
+    script = folder / "qhelpgenerator"
+    script.write_text(f"""#!{sys.executable}
+import sys
+open(sys.argv[sys.argv.index("-o")+1], "wb").close()
+""")
+    os.chmod(script, 0o755)
+    monkeypatch.setenv("PATH", str(folder) + os.pathsep + os.environ.get("PATH", ""))
+    return folder
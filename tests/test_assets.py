@@ -0,0 +1,116 @@
+from __future__ import print_function
+"""db2qthelp - asset staging tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import tread, bread
+
+
+
+# --- helper functions ----------------------------------------------
+def prepare(tmp_path):
+    """Writes a document referencing two different images of the same name"""
+    html = ['<html><body><div class="book"><h1><a name="book"></a>Book</h1>',
+        '<div class="chapter"><h1><a name="c1"></a>1. c1</h1><img src="a/img.gif"/></div>',
+        '<div class="chapter"><h1><a name="c2"></a>2. c2</h1><img src="b/img.gif"/><img src="a/img.gif"/></div>',
+        '</div></body></html>\n']
+    (tmp_path / "doc.html").write_text("".join(html), encoding="utf-8")
+    for folder, content in [("a", b"GIF-a"), ("b", b"GIF-b")]:
+        os.makedirs(tmp_path / folder)
+        (tmp_path / folder / "img.gif").write_bytes(content)
+
+
+# --- test functions ------------------------------------------------
+def test_assets__collision(tmp_path):
+    """Different images sharing a name are renamed and the links are patched"""
+    prepare(tmp_path)
+    conv = db2qthelp.Db2QtHelp("", "", "", None, qt_help="none")
+    conv.process(str(tmp_path / "doc.html"), str(tmp_path / "out"), "tst")
+    renamed = "img-" + db2qthelp.content_digest(b"GIF-b")[:8] + ".gif"
+    assert bread(tmp_path / "out" / "img.gif") == b"GIF-a"
+    assert bread(tmp_path / "out" / renamed) == b"GIF-b"
+    assert tread(tmp_path / "out" / "c1.html").find('src="qthelp://tst/doc/img.gif"')>=0
+    assert tread(tmp_path / "out" / "c2.html").find(f'<img src="qthelp://tst/doc/{renamed}"/><img src="qthelp://tst/doc/img.gif"/>')>=0
+    # the images are named before the pages are written, so each page is written once
+    stages = { stage["stage"]: stage for stage in conv.timings }
+    assert stages["pages"]["bytes_written"] == sum(os.path.getsize(tmp_path / "out" / page) for page in ["book.html", "c1.html", "c2.html"])
+
+
+def test_assets__collision_chunked(tmp_path, monkeypatch):
+    """Only the pages of chunked HTML that reference renamed images are processed again"""
+    prepare(tmp_path)
+    os.makedirs(tmp_path / "pages")
+    for name, image in [("p1", "a/img.gif"), ("p2", "b/img.gif"), ("p3", None)]:
+        img = f'<img src="../{image}"/>' if image is not None else ""
+        (tmp_path / "pages" / f"{name}.html").write_text(f"<html><head><title>{name}</title></head><body>{img}</body></html>\n", encoding="utf-8")
+    processed = []
+    process_page = db2qthelp.Db2QtHelp._process_page
+    def record(self, file, app_name, dst_folder):
+        processed.append(os.path.split(file)[1])
+        return process_page(self, file, app_name, dst_folder)
+    monkeypatch.setattr(db2qthelp.Db2QtHelp, "_process_page", record)
+    conv = db2qthelp.Db2QtHelp("", "", "", None, qt_help="none")
+    conv.process(str(tmp_path / "pages"), str(tmp_path / "out"), "tst")
+    assert processed == ["p1.html", "p2.html", "p3.html", "p2.html"]
+    renamed = "img-" + db2qthelp.content_digest(b"GIF-b")[:8] + ".gif"
+    assert bread(tmp_path / "out" / renamed) == b"GIF-b"
+    assert tread(tmp_path / "out" / "p2.html").find(f'<img src="qthelp://tst/doc/{renamed}"/>')>=0
+    stages = { stage["stage"]: stage for stage in conv.timings }
+    sizes = { page: os.path.getsize(tmp_path / "out" / page) for page in ["p1.html", "p2.html", "p3.html"] }
+    # p2 was written referencing the image's original name before
+    assert stages["pages"]["bytes_written"] == sum(sizes.values()) + sizes["p2.html"] - len(renamed) + len("img.gif")
+
+
+def test_assets__link(tmp_path):
+    """Images are hard linked if wished"""
+    prepare(tmp_path)
+    conv = db2qthelp.Db2QtHelp("", "", "", None, qt_help="none", assets="link", jobs=2)
+    conv.process(str(tmp_path / "doc.html"), str(tmp_path / "out"), "tst")
+    assert os.path.samefile(tmp_path / "a" / "img.gif", tmp_path / "out" / "img.gif")
+
+
+def test_assets__unchanged(tmp_path, monkeypatch):
+    """Unchanged images are neither hashed nor copied again"""
+    prepare(tmp_path)
+    conv = db2qthelp.Db2QtHelp("", "", "", None, qt_help="none")
+    conv.process(str(tmp_path / "doc.html"), str(tmp_path / "out"), "tst")
+    inode = os.stat(tmp_path / "out" / "img.gif").st_ino
+    hashed = []
+    digest = db2qthelp.file_digest
+    monkeypatch.setattr(db2qthelp, "file_digest", lambda path: hashed.append(path) or digest(path))
+    conv.process(str(tmp_path / "doc.html"), str(tmp_path / "out"), "tst")
+    assert [path for path in hashed if path.endswith(".gif")] == []
+    assert os.stat(tmp_path / "out" / "img.gif").st_ino == inode
+    (tmp_path / "a" / "img.gif").write_bytes(b"GIF-a, changed")
+    conv.process(str(tmp_path / "doc.html"), str(tmp_path / "out"), "tst")
+    assert bread(tmp_path / "out" / "img.gif") == b"GIF-a, changed"
+
+
+def test_assets__stage_file(tmp_path):
+    """Files are copied if they cannot be cloned; existing files are replaced, not written through"""
+    (tmp_path / "src").write_bytes(b"content")
+    os.link(tmp_path / "src", tmp_path / "dst")
+    assert db2qthelp.stage_file(str(tmp_path / "src"), str(tmp_path / "dst"), "clone") in ["clone", "copy"]
+    assert not os.path.samefile(tmp_path / "src", tmp_path / "dst")
+    assert bread(tmp_path / "dst") == b"content"
+    assert db2qthelp.stage_file(str(tmp_path / "src"), str(tmp_path / "dst"), "copy") == "copy"
+    assert bread(tmp_path / "dst") == b"content"
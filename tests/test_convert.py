@@ -0,0 +1,127 @@
+from __future__ import print_function
+"""db2qthelp - in-memory conversion tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import glob
+import time
+import concurrent.futures
+from pathlib import Path
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import copy_files, bread, TEST_PATH
+
+
+# --- helper functions ----------------------------------------------
+def resolve_asset(reference):
+    """Returns the test images referenced as 'images/<NAME>'"""
+    path = os.path.join(TEST_PATH, os.path.split(reference)[1])
+    return bread(Path(path)) if os.path.exists(path) else None
+
+
+# --- test functions ------------------------------------------------
+def test_convert__single(tmp_path, monkeypatch):
+    """Converts a single HTML document without touching the file system"""
+    monkeypatch.chdir(tmp_path)
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    bundle = conv.convert(bread(Path(TEST_PATH) / "tstdoc2.html"), "tst2", resolve_asset)
+    assert list(bundle.pages) == ["user.html", "doc2-chp1.html"]
+    for filename, content in bundle.pages.items():
+        assert content == bread(Path(TEST_PATH) / "tstdoc2_single_html" / filename)
+    assert sorted(bundle.files) == ["img1.gif", "img2.gif"]
+    assert bundle.files["img1.gif"] == bread(Path(TEST_PATH) / "img1.gif")
+    assert bundle.qhp == (Path(TEST_PATH) / "tstdoc2_single_html" / "tst2.qhp").read_text(encoding="utf-8")
+    assert bundle.toc == [("user.html", "Documentation", (0,)), ("doc2-chp1.html", "1.\xa0chp1title", (1,))]
+    assert bundle.keywords == [("Documentation", "user.html"), ("1.\xa0chp1title", "doc2-chp1.html")]
+    assert bundle.unresolved == [] and bundle.missing == []
+    assert [stage["stage"] for stage in conv.timings] == ["pages", "assets", "toc"]
+    assert os.listdir(tmp_path) == []
+
+
+def test_convert__chunked(tmp_path):
+    """Converting chunked HTML given as pages equals processing the folder"""
+    os.makedirs(tmp_path / "tstdoc1_chunked_html")
+    copy_files(tmp_path, ["tstdoc1_chunked_html/*.html"])
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", stylesheet="external")
+    conv.process(str(tmp_path / "tstdoc1_chunked_html"), str(tmp_path / "out"), "tst1")
+    files = sorted(glob.glob(str(tmp_path / "tstdoc1_chunked_html" / "*.html")), reverse=True)
+    bundle = conv.convert(((os.path.split(file)[1], bread(Path(file)).decode("utf-8")) for file in files), "tst1")
+    assert "index.html" not in bundle.pages
+    assert len(bundle.pages) == 10
+    for filename, content in bundle.pages.items():
+        assert content == bread(tmp_path / "out" / filename)
+    assert list(bundle.files) == [db2qthelp.STYLESHEET_NAME]
+    assert bundle.files[db2qthelp.STYLESHEET_NAME] == bread(tmp_path / "out" / db2qthelp.STYLESHEET_NAME)
+    assert bundle.qhp == (tmp_path / "out" / "tst1.qhp").read_text(encoding="utf-8")
+    assert [page[0] for page in bundle.toc] == list(bundle.pages)
+
+
+def test_convert__sink():
+    """Passes the generated files to the sink; images that are not resolved are reported"""
+    received = []
+    conv = db2qthelp.Db2QtHelp("", "", None, None, search_index=True)
+    doc = (Path(TEST_PATH) / "tstdoc2.html").read_text(encoding="utf-8")
+    bundle = conv.convert(doc, "tst2", sink=lambda filename, data: received.append((filename, data)))
+    assert [filename for filename, _ in received] == ["user.html", "doc2-chp1.html", "tst2.qhp", "tst2" + db2qthelp.SEARCH_INDEX_SUFFIX]
+    assert dict(received) == { **bundle.pages, **bundle.files, "tst2.qhp": bundle.qhp.encode("utf-8") }
+    assert bundle.missing == ["images/img1.gif", "images/img2.gif"]
+    assert b'src="qthelp://tst2/doc/img1.gif"' in bundle.pages["doc2-chp1.html"]
+
+
+def test_convert__renamed_assets():
+    """Images sharing a name are renamed by their content as obtained from the resolver"""
+    doc = '<html><body><div class="book"><h1><a name="book"></a>Book</h1><img src="a/img.gif"><img src="b/img.gif"></div></body></html>'
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    bundle = conv.convert(doc, "tst", lambda reference: reference.encode("utf-8"))
+    renamed = f"img-{db2qthelp.content_digest(b'b/img.gif')[:8]}.gif"
+    assert bundle.files == { "img.gif": b"a/img.gif", renamed: b"b/img.gif" }
+    assert f'<img src="qthelp://tst/doc/img.gif"><img src="qthelp://tst/doc/{renamed}">'.encode("utf-8") in bundle.pages["book.html"]
+
+
+def test_convert__colliding_assets_without_resolver(tmp_path, monkeypatch):
+    """Images sharing a name are reported as missing without accessing the file system if no resolver is given"""
+    monkeypatch.chdir(tmp_path)
+    os.makedirs(tmp_path / "a")
+    (tmp_path / "a" / "x.png").write_bytes(b"a")
+    doc = '<html><body><div class="book"><h1><a name="book"></a>Book</h1><img src="a/x.png"><img src="b/x.png"></div></body></html>'
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    bundle = conv.convert(doc, "tst")
+    assert bundle.missing == ["a/x.png", "b/x.png"]
+    assert bundle.files == {}
+    assert b'<img src="qthelp://tst/doc/x.png"><img src="qthelp://tst/doc/x.png">' in bundle.pages["book.html"]
+    # the document is scanned for anchors before being split, nothing else is read
+    assert conv.timings[0]["bytes_read"] == 2 * len(doc)
+
+
+def test_convert__concurrent():
+    """Conversions running concurrently in several threads do not interfere"""
+    def slow_resolve_asset(reference):
+        time.sleep(0.01)
+        return resolve_asset(reference)
+    docs = [(bread(Path(TEST_PATH) / "tstdoc2.html"), "tst2"),
+        ('<html><body><div class="book"><h1><a name="book"></a>Book</h1><p><a href="#nope">x</a><img src="images/img1.gif"><img src="b/img3.gif"></p></div></body></html>', "tst")]
+    conv = db2qthelp.Db2QtHelp("", "", None, None, search_index=True)
+    expected = [conv.convert(doc, app_name, slow_resolve_asset) for doc, app_name in docs]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [(i % 2, executor.submit(conv.convert, docs[i % 2][0], docs[i % 2][1], slow_resolve_asset)) for i in range(16)]
+        for i, future in futures:
+            assert future.result() == expected[i]
+    assert expected[1].unresolved == ["nope"] and expected[1].missing == ["b/img3.gif"]
+    assert list(expected[1].pages) == ["book.html"]
@@ -0,0 +1,180 @@
+from __future__ import print_function
+"""db2qthelp - DocBook XSL cache tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import json
+import zipfile
+import hashlib
+import db2qthelp
+from util import copy_files
+
+
+
+# --- helper functions ----------------------------------------------
+def write_xsltproc(path):
+    """Writes a fake xsltproc that logs its call and writes a single chunk"""
+    os.makedirs(path, exist_ok=True)
+    script = path / "xsltproc"
+    script.write_text(f"""#!{sys.executable}
+import sys, os, json
+with open({repr(str(path / "log.json"))}, "w") as fd:
+    json.dump({{"args": sys.argv[1:], "catalog": os.environ.get("XML_CATALOG_FILES")}}, fd)
+folder = sys.argv[sys.argv.index("base.dir")+1]
+os.makedirs(folder, exist_ok=True)
+with open(os.path.join(folder, "doc1-chp1.html"), "w") as fd:
+    fd.write("<html><head><title>1. chp1title</title></head><body></body></html>")
+""")
+    os.chmod(script, 0o755)
+
+
+def write_docbook_xsl(path):
+    """Writes a (dummy) DocBook XSL tree"""
+    os.makedirs(path / "html")
+    (path / "html" / "chunk.xsl").write_text("<xsl/>", encoding="utf-8")
+
+
+# --- test functions ------------------------------------------------
+def test_docbook_xsl__cached(capsys, tmp_path, monkeypatch):
+    """Resolves the DocBook XSL stylesheets from the cache without accessing the network"""
+    write_xsltproc(tmp_path / "bin")
+    write_docbook_xsl(tmp_path / "xsl")
+    copy_files(tmp_path, ["tstdoc1.xml"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.xml"), "-d", str(tmp_path / "out"), "-X", str(tmp_path / "bin"), "--docbook-xsl", str(tmp_path / "xsl")])
+    assert ret==0
+    log = json.loads((tmp_path / "bin" / "log.json").read_text())
+    assert log["args"][0]=="--nonet"
+    assert log["catalog"]==str(tmp_path / "xsl" / db2qthelp.CATALOG_NAME)
+    catalog = (tmp_path / "xsl" / db2qthelp.CATALOG_NAME).read_text(encoding="utf-8")
+    assert f'rewritePrefix="{(tmp_path / "xsl").as_uri()}/"' in catalog
+    assert f'uriStartString="{db2qthelp.DOCBOOK_XSL_URI}"' in catalog
+    assert (tmp_path / "out" / "doc1-chp1.html").exists()
+
+
+def test_docbook_xsl__default_location(capsys, tmp_path, monkeypatch):
+    """Uses the cache at the location given by the environment"""
+    write_xsltproc(tmp_path / "bin")
+    write_docbook_xsl(tmp_path / "xsl")
+    monkeypatch.setenv("DB2QTHELP_DOCBOOK_XSL", str(tmp_path / "xsl"))
+    copy_files(tmp_path, ["tstdoc1.xml"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.xml"), "-d", str(tmp_path / "out"), "-X", str(tmp_path / "bin")])
+    assert ret==0
+    log = json.loads((tmp_path / "bin" / "log.json").read_text())
+    assert log["catalog"]==str(tmp_path / "xsl" / db2qthelp.CATALOG_NAME)
+
+
+def test_docbook_xsl__cache_miss(capsys, tmp_path, monkeypatch):
+    """Reports a cache miss instead of accessing the network"""
+    write_xsltproc(tmp_path / "bin")
+    monkeypatch.delenv("XML_CATALOG_FILES", raising=False)
+    copy_files(tmp_path, ["tstdoc1.xml"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.xml"), "-d", str(tmp_path / "out"), "-X", str(tmp_path / "bin"), "--docbook-xsl", str(tmp_path / "xsl")])
+    assert ret==2
+    captured = capsys.readouterr()
+    assert captured.err == f"db2qthelp: error: DocBook XSL cache miss: did not find the stylesheets in '{str(tmp_path / 'xsl')}'; you may fetch them using the option --fetch-docbook-xsl\n"
+    assert not (tmp_path / "bin" / "log.json").exists()
+
+
+def test_docbook_xsl__user_catalog(capsys, tmp_path, monkeypatch):
+    """Falls back to the user's catalogs if the default cache is empty"""
+    write_xsltproc(tmp_path / "bin")
+    monkeypatch.setenv("DB2QTHELP_DOCBOOK_XSL", str(tmp_path / "xsl"))
+    monkeypatch.setenv("XML_CATALOG_FILES", "my-catalog.xml")
+    copy_files(tmp_path, ["tstdoc1.xml"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.xml"), "-d", str(tmp_path / "out"), "-X", str(tmp_path / "bin")])
+    assert ret==0
+    log = json.loads((tmp_path / "bin" / "log.json").read_text())
+    assert "--nonet" not in log["args"]
+    assert log["catalog"]=="my-catalog.xml"
+
+
+def test_docbook_xsl__fetch(capsys, tmp_path):
+    """Extracts a DocBook XSL release into the cache"""
+    with zipfile.ZipFile(tmp_path / "docbook-xsl.zip", "w") as archive:
+        archive.writestr("docbook-xsl-1.79.2/html/chunk.xsl", "<xsl/>")
+        archive.writestr("docbook-xsl-1.79.2/common/common.xsl", "<xsl/>")
+        archive.writestr("docbook-xsl-1.79.2/../evil.xsl", "<xsl/>")
+    num = db2qthelp.fetch_docbook_xsl(str(tmp_path / "xsl"), (tmp_path / "docbook-xsl.zip").as_uri(), unverified=True)
+    assert num==2
+    assert (tmp_path / "xsl" / "html" / "chunk.xsl").exists()
+    assert (tmp_path / "xsl" / "common" / "common.xsl").exists()
+    assert (tmp_path / "xsl" / db2qthelp.CATALOG_NAME).exists()
+    assert not (tmp_path / "evil.xsl").exists()
+
+
+def test_docbook_xsl__fetch_checksum(capsys, tmp_path):
+    """Checks the checksum of the archive before extracting it"""
+    with zipfile.ZipFile(tmp_path / "docbook-xsl.zip", "w") as archive:
+        archive.writestr("docbook-xsl-1.79.2/html/chunk.xsl", "<xsl/>")
+    url = (tmp_path / "docbook-xsl.zip").as_uri()
+    sha256 = hashlib.sha256((tmp_path / "docbook-xsl.zip").read_bytes()).hexdigest()
+    try:
+        db2qthelp.fetch_docbook_xsl(str(tmp_path / "xsl"), url, "0" * 64)
+        assert False # pragma: no cover
+    except RuntimeError as e:
+        assert str(e) == f"the checksum of '{url}' does not match (expected {'0' * 64}, got {sha256})"
+    assert not (tmp_path / "xsl").exists()
+    assert db2qthelp.fetch_docbook_xsl(str(tmp_path / "xsl"), url, sha256.upper())==1
+    assert (tmp_path / "xsl" / "html" / "chunk.xsl").exists()
+
+
+def test_docbook_xsl__fetch_checksum_default(capsys, tmp_path, monkeypatch):
+    """Checks the archive against the default checksum"""
+    with zipfile.ZipFile(tmp_path / "docbook-xsl.zip", "w") as archive:
+        archive.writestr("docbook-xsl-1.79.2/html/chunk.xsl", "<xsl/>")
+    url = (tmp_path / "docbook-xsl.zip").as_uri()
+    sha256 = hashlib.sha256((tmp_path / "docbook-xsl.zip").read_bytes()).hexdigest()
+    monkeypatch.setattr(db2qthelp, "DOCBOOK_XSL_SHA256", "0" * 64)
+    try:
+        db2qthelp.fetch_docbook_xsl(str(tmp_path / "xsl"), url, unverified=True)
+        assert False # pragma: no cover
+    except RuntimeError as e:
+        assert str(e) == f"the checksum of '{url}' does not match (expected {'0' * 64}, got {sha256})"
+    assert not (tmp_path / "xsl").exists()
+
+
+def test_docbook_xsl__fetch_unknown_checksum(capsys, tmp_path, monkeypatch):
+    """Refuses to fetch an archive with an unknown checksum unless allowed"""
+    with zipfile.ZipFile(tmp_path / "docbook-xsl.zip", "w") as archive:
+        archive.writestr("docbook-xsl-1.79.2/html/chunk.xsl", "<xsl/>")
+    url = (tmp_path / "docbook-xsl.zip").as_uri()
+    monkeypatch.setattr(db2qthelp, "DOCBOOK_XSL_SHA256", None)
+    try:
+        db2qthelp.fetch_docbook_xsl(str(tmp_path / "xsl"), url)
+        assert False # pragma: no cover
+    except RuntimeError as e:
+        assert str(e) == f"no checksum is known for '{url}'; use the option --fetch-unverified to fetch it anyway"
+    assert not (tmp_path / "xsl").exists()
+    assert db2qthelp.fetch_docbook_xsl(str(tmp_path / "xsl"), url, unverified=True)==1
+    assert (tmp_path / "xsl" / "html" / "chunk.xsl").exists()
+
+
+def test_main__fetch_unknown_checksum(capsys, tmp_path, monkeypatch):
+    """Reports fetching stylesheets with an unknown checksum"""
+    monkeypatch.setattr(db2qthelp, "DOCBOOK_XSL_SHA256", None)
+    try:
+        db2qthelp.main(["--fetch-docbook-xsl", "--docbook-xsl", str(tmp_path / "xsl")])
+        assert False # pragma: no cover
+    except SystemExit as e:
+        assert e.code==2
+    captured = capsys.readouterr()
+    assert captured.err == f"db2qthelp: error: could not fetch the DocBook XSL stylesheets: no checksum is known for '{db2qthelp.DOCBOOK_XSL_URL}'; use the option --fetch-unverified to fetch it anyway\n"
+    assert not (tmp_path / "xsl").exists()
@@ -0,0 +1,71 @@
+from __future__ import print_function
+"""db2qthelp - incremental build tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import copy_files
+
+
+
+# --- test functions ------------------------------------------------
+def test_incremental__unchanged(capsys, tmp_path):
+    """Rebuilding unchanged input does not rewrite files and skips the Qt Help generation"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    dst_folder = tmp_path / "out"
+    args = ["-i", str(tmp_path / "tstdoc1.html"), "-a", "tst1", "--destination", str(dst_folder)]
+    assert db2qthelp.main(args)==0
+    assert (dst_folder / db2qthelp.MANIFEST_NAME).exists()
+    (dst_folder / "tst1.qch").write_text("qch")
+    (dst_folder / "tst1.qhc").write_text("qhc")
+    for file in os.listdir(dst_folder):
+        os.utime(dst_folder / file, ns=(1000000000, 1000000000))
+    capsys.readouterr()
+    assert db2qthelp.main(args)==0
+    captured = capsys.readouterr()
+    assert captured.out.endswith("... Qt Help files are up to date\n")
+    for file in os.listdir(dst_folder):
+        if file!=db2qthelp.MANIFEST_NAME:
+            assert os.stat(dst_folder / file).st_mtime_ns==1000000000
+
+
+def test_incremental__changed(capsys, tmp_path):
+    """Rebuilding changed input rewrites changed pages only and removes stale pages"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    dst_folder = tmp_path / "out"
+    args = ["-i", str(tmp_path / "tstdoc1.html"), "-a", "tst1", "--destination", str(dst_folder)]
+    assert db2qthelp.main(args)==0
+    (dst_folder / "tst1.qch").write_text("qch")
+    (dst_folder / "tst1.qhc").write_text("qhc")
+    for file in os.listdir(dst_folder):
+        os.utime(dst_folder / file, ns=(1000000000, 1000000000))
+    doc = (tmp_path / "tstdoc1.html").read_text(encoding="utf-8")
+    doc = doc.replace("chp1blurb.", "chp1blurb changed.").replace("doc1-chp3-sect3", "doc1-chp3-sect4")
+    (tmp_path / "tstdoc1.html").write_text(doc, encoding="utf-8")
+    capsys.readouterr()
+    assert db2qthelp.main(args)==0
+    captured = capsys.readouterr()
+    assert "up to date" not in captured.out
+    assert "chp1blurb changed." in (dst_folder / "doc1-chp1.html").read_text(encoding="utf-8")
+    assert not (dst_folder / "doc1-chp3-sect3.html").exists()
+    assert (dst_folder / "doc1-chp3-sect4.html").exists()
+    assert os.stat(dst_folder / "doc1-chp1.html").st_mtime_ns!=1000000000
+    assert os.stat(dst_folder / "doc1-chp2.html").st_mtime_ns==1000000000
@@ -0,0 +1,87 @@
+from __future__ import print_function
+"""db2qthelp - keyword index tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import sqlite3
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+
+
+# --- helper functions ----------------------------------------------
+DOCUMENT = """<html><body><div class="book"><h1><a name="book"></a>Book</h1>
+<div class="chapter"><h1><a name="c1"></a>1. Zebras </h1>
+<p>Text<a class="indexterm" name="id1" data-primary="zebra" data-secondary="stripes"></a> and
+<a class="indexterm" name="id2" data-primary="Apple &amp; pear"></a>.</p>
+<p>Again<a class="indexterm" name="id1" data-primary="zebra" data-secondary="stripes"></a>.</p>
+</div>
+<div class="chapter"><h1><a name="c2"></a>2. Glossary </h1>
+<dl><dt><a name="g1"></a><span class="glossterm">Banana
+ <code>split</code></span></dt><dd><p>A dessert.</p></dd>
+<dt><span class="glossterm">cherry</span></dt><dd><p>A fruit.</p></dd></dl>
+<p><a class="indexterm" name="id3" data-primary='say "a"' data-secondary="b" data-tertiary="c"></a></p>
+</div>
+</div></body></html>
+"""
+
+KEYWORDS = """            <keyword name="Book" ref="./book.html"/>
+            <keyword name="1. Zebras" ref="./c1.html"/>
+            <keyword name="2. Glossary" ref="./c2.html"/>
+            <keyword name="Apple &amp; pear" ref="./c1.html#id2"/>
+            <keyword name="Banana split" ref="./c2.html#g1"/>
+            <keyword name="cherry" ref="./c2.html"/>
+            <keyword name="say &quot;a&quot;, b, c" ref="./c2.html#id3"/>
+            <keyword name="zebra, stripes" ref="./c1.html#id1"/>
+"""
+
+
+# --- test functions ------------------------------------------------
+def test_keywords__page_keywords():
+    """Collects index terms and glossary entries of a page"""
+    assert db2qthelp.page_keywords(DOCUMENT, "p.html") == [
+        ("zebra, stripes", "p.html#id1"), ("Apple &amp; pear", "p.html#id2"), ("zebra, stripes", "p.html#id1"),
+        ('say "a", b, c', "p.html#id3"), ("Banana <code>split</code>", "p.html#g1"), ("cherry", "p.html")]
+
+
+def test_keywords__sorted_keywords():
+    """Sorts keywords case-insensitively"""
+    keywords = { ("b", "x.html#1"), ("A", "x.html#2"), ("a", "x.html#3"), ("<i>C</i>", "x.html") }
+    assert db2qthelp.sorted_keywords(keywords) == [("A", "x.html#2"), ("a", "x.html#3"), ("b", "x.html#1"), ("<i>C</i>", "x.html")]
+
+
+def test_keywords__qhp(capsys, tmp_path):
+    """Adds the deduplicated and sorted index terms to the keywords of the QtHelp project"""
+    (tmp_path / "doc.html").write_text(DOCUMENT, encoding="utf-8")
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none")
+    conv.process(str(tmp_path / "doc.html"), str(tmp_path / "out"), "tst")
+    qhp = (tmp_path / "out" / "tst.qhp").read_text(encoding="utf-8")
+    assert qhp[qhp.find("<keywords>")+11:qhp.find("</keywords>")-8] == KEYWORDS
+
+
+def test_keywords__native(capsys, tmp_path):
+    """Writes the index terms into the index table of the .qch file"""
+    (tmp_path / "doc.html").write_text(DOCUMENT, encoding="utf-8")
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="qch", qt_help_backend="native")
+    conv.process(str(tmp_path / "doc.html"), str(tmp_path / "out"), "tst")
+    connection = sqlite3.connect(str(tmp_path / "out" / "tst.qch"))
+    rows = connection.execute("SELECT IndexTable.Name, FileNameTable.Name, IndexTable.Anchor FROM IndexTable JOIN FileNameTable ON IndexTable.FileId=FileNameTable.FileId ORDER BY IndexTable.Id").fetchall()
+    connection.close()
+    assert rows[3:] == [("Apple & pear", "c1.html", "id2"), ("Banana split", "c2.html", "g1"), ("cherry", "c2.html", ""),
+        ('say "a", b, c', "c2.html", "id3"), ("zebra, stripes", "c1.html", "id1")]
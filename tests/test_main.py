@@ -63,10 +63,18 @@ def test_main_help(capsys):
         assert type(e)==type(SystemExit())
         assert e.code==0
     captured = capsys.readouterr()
-    assert pname(captured.out) == """usage: db2qthelp [-h] [-c FILE] [-i INPUT] [-d DESTINATION] [-a APPNAME]
-                 [--css-definition CSS_DEFINITION] [--generate-css-definition]
-                 [--qhp-template QHP_TEMPLATE] [--generate-qhp-template]
-                 [-Q QT_PATH] [-X XSLT_PATH] [--version]
+    assert pname(captured.out) == """usage: db2qthelp [-h] [-c FILE] [-i INPUT] [-b BATCH] [-d DESTINATION]
+                 [-a APPNAME] [--css-definition CSS_DEFINITION]
+                 [--stylesheet {inline,external}] [--minify-css]
+                 [--generate-css-definition] [--qhp-template QHP_TEMPLATE]
+                 [--generate-qhp-template] [-Q QT_PATH] [-X XSLT_PATH]
+                 [--xslt-backend {xsltproc,lxml}] [--docbook-xsl DOCBOOK_XSL]
+                 [--fetch-docbook-xsl] [--fetch-unverified] [-j JOBS]
+                 [--assets {copy,link,clone}] [--qt-help {all,qch,qhc,none}]
+                 [--qt-help-backend {qhelpgenerator,native}] [--optimize]
+                 [--search-index] [--pipeline] [--cache-dir CACHE_DIR]
+                 [--no-cache] [--watch] [--timings TIMINGS]
+                 [--profile PROFILE] [--version]
 
 a DocBook book to QtHelp project converter
 
@@ -76,12 +84,18 @@ options:
                         Reads the named configuration file
   -i INPUT, --input INPUT
                         Defines the DocBook HTML document to parse
+  -b BATCH, --batch BATCH
+                        Defines a batch file listing several manuals to build
   -d DESTINATION, --destination DESTINATION
                         Sets the output folder
   -a APPNAME, --appname APPNAME
                         Sets the name of the application
   --css-definition CSS_DEFINITION
                         Defines the CSS definition file to use
+  --stylesheet {inline,external}
+                        Selects whether the CSS definition is embedded into
+                        the pages or written into a stylesheet
+  --minify-css          If set, the CSS definition is minified
   --generate-css-definition
                         If set, a CSS definition file is generated
   --qhp-template QHP_TEMPLATE
@@ -92,6 +106,42 @@ options:
                         Sets the path to the Qt binaries
   -X XSLT_PATH, --xslt-path XSLT_PATH
                         Sets the path to xsltproc
+  --xslt-backend {xsltproc,lxml}
+                        Selects the XSLT processor used for converting DocBook
+                        documents
+  --docbook-xsl DOCBOOK_XSL
+                        Sets the folder the DocBook XSL stylesheets are cached
+                        in
+  --fetch-docbook-xsl   If set, the DocBook XSL stylesheets are downloaded
+                        into the cache
+  --fetch-unverified    If set, the DocBook XSL stylesheets are fetched even
+                        if the archive's checksum is not known
+  -j JOBS, --jobs JOBS  Sets the number of parallel jobs used for processing
+                        chunked HTML
+  --assets {copy,link,clone}
+                        Selects how referenced images are put into the
+                        destination folder
+  --qt-help {all,qch,qhc,none}
+                        Selects the Qt Help files to generate
+  --qt-help-backend {qhelpgenerator,native}
+                        Selects how Qt Help files are generated; the native
+                        backend is experimental
+  --optimize            If set, the pages are minified and PNG and GIF images
+                        are optimized losslessly
+  --search-index        If set, a full-text search index is written next to
+                        the Qt Help files
+  --pipeline            If set, XSLT, page processing, writing, and staging
+                        images overlap
+  --cache-dir CACHE_DIR
+                        Sets the folder processed pages are cached in across
+                        builds
+  --no-cache            If set, processed pages are not cached across builds
+  --watch               If set, the documentation is rebuilt whenever its
+                        inputs change
+  --timings TIMINGS     Writes a JSON report of the time spent in the build
+                        stages into the named file
+  --profile PROFILE     Writes a cProfile dump of the Python build stages into
+                        the named file
   --version             show program's version number and exit
 
 (c) Daniel Krajzewicz 2022-2025
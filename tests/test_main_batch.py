@@ -0,0 +1,164 @@
+from __future__ import print_function
+"""db2qthelp - batch mode tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2024, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import json
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import pdirtimename, copy_files, compare_files
+
+
+# --- helper functions ----------------------------------------------
+def write_batch(tmp_path, entries):
+    """Writes a batch file listing the given manuals"""
+    batch = tmp_path / "batch.cfg"
+    with open(batch, "w", encoding="utf-8") as fdo:
+        for name, options in entries.items():
+            fdo.write(f"[{name}]\n")
+            for key, value in options.items():
+                fdo.write(f"{key}={value}\n")
+    return str(batch)
+
+
+def prepare(tmp_path):
+    os.makedirs(tmp_path / "images")
+    copy_files(tmp_path, ["tstdoc1.html", "tstdoc2.html"])
+    copy_files(tmp_path / "images", ["img1.gif", "img2.gif"])
+    return write_batch(tmp_path, {
+        "tst1": { "input": str(tmp_path / "tstdoc1.html"), "destination": str(tmp_path / "tstdoc1_single_html") },
+        "tst2": { "input": str(tmp_path / "tstdoc2.html"), "destination": str(tmp_path / "tstdoc2_single_html") }
+    })
+
+
+# --- test functions ------------------------------------------------
+def test_main_batch__serial(capsys, tmp_path):
+    """Builds two manuals one after the other"""
+    batch = prepare(tmp_path)
+    ret = db2qthelp.main(["--batch", batch])
+    assert ret==0
+    captured = capsys.readouterr()
+    assert pdirtimename(captured.out, tmp_path) == """Processing single HTML output from '<DIR>/tstdoc1.html'
+Processing single HTML output from '<DIR>/tstdoc2.html'
+Summary:
+ tst1: ok (<DUR>)
+ tst2: ok (<DUR>)
+"""
+    assert captured.err == ""
+    assert compare_files(tmp_path, "tstdoc1_single_html", ".html")==(11, 0)
+    assert compare_files(tmp_path, "tstdoc1_single_html", ".qhp")==(1, 0)
+    assert compare_files(tmp_path, "tstdoc2_single_html", ".html")==(2, 0)
+    assert compare_files(tmp_path, "tstdoc2_single_html", ".qhp")==(1, 0)
+    assert compare_files(tmp_path, "tstdoc2_single_html", ".gif")==(2, 0)
+
+
+def test_main_batch__parallel(capsys, tmp_path):
+    """Builds two manuals in parallel"""
+    batch = prepare(tmp_path)
+    ret = db2qthelp.main(["--batch", batch, "--jobs", "2"])
+    assert ret==0
+    captured = capsys.readouterr()
+    assert pdirtimename(captured.out, tmp_path).endswith("""Summary:
+ tst1: ok (<DUR>)
+ tst2: ok (<DUR>)
+""")
+    assert compare_files(tmp_path, "tstdoc1_single_html", ".html")==(11, 0)
+    assert compare_files(tmp_path, "tstdoc2_single_html", ".html")==(2, 0)
+    assert compare_files(tmp_path, "tstdoc2_single_html", ".gif")==(2, 0)
+
+
+def test_main_batch__failure(capsys, tmp_path):
+    """A failing manual is reported in the summary and does not stop the others"""
+    copy_files(tmp_path, ["tstdoc1.html", "tstdoc1.xml"])
+    batch = write_batch(tmp_path, {
+        "tst0": { "input": str(tmp_path / "tstdoc1.xml"), "destination": str(tmp_path / "out0") },
+        "tst1": { "input": str(tmp_path / "tstdoc1.html"), "destination": str(tmp_path / "tstdoc1_single_html") }
+    })
+    ret = db2qthelp.main(["--batch", batch, "-X", str(tmp_path / "nonexisting")])
+    assert ret==2
+    captured = capsys.readouterr()
+    assert pdirtimename(captured.out, tmp_path).endswith("""Summary:
+ tst0: failed (<DUR>): could not invoke xsltproc...
+ tst1: ok (<DUR>)
+""")
+    assert compare_files(tmp_path, "tstdoc1_single_html", ".html")==(11, 0)
+
+
+def test_main_batch__errors(capsys, tmp_path):
+    """Reports errors in the batch file"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    batch = write_batch(tmp_path, {
+        "tst0": { "destination": str(tmp_path / "out") },
+        "tst1": { "input": str(tmp_path / "tstdoc1.html"), "destination": str(tmp_path / "out") },
+        "tst2": { "input": str(tmp_path / "foo.html") }
+    })
+    try:
+        db2qthelp.main(["--batch", batch])
+        assert False # pragma: no cover
+    except SystemExit as e:
+        assert e.code==2
+    captured = capsys.readouterr()
+    assert pdirtimename(captured.err, tmp_path) == """db2qthelp: error: no input given for manual 'tst0' in batch file '<DIR>/batch.cfg'
+db2qthelp: error: did not find input '<DIR>/foo.html'
+db2qthelp: error: manuals in batch file '<DIR>/batch.cfg' share a destination folder
+"""
+
+
+def test_main_batch__single_options(capsys, tmp_path):
+    """Rejects the options of a single build when building a batch"""
+    batch = prepare(tmp_path)
+    try:
+        db2qthelp.main(["--batch", batch, "-i", str(tmp_path / "tstdoc1.html"), "-d", str(tmp_path / "out"), "-a", "tst"])
+        assert False # pragma: no cover
+    except SystemExit as e:
+        assert e.code==2
+    captured = capsys.readouterr()
+    assert captured.err == """db2qthelp: error: the option --input cannot be used together with --batch
+db2qthelp: error: the option --destination cannot be used together with --batch
+db2qthelp: error: the option --appname cannot be used together with --batch
+"""
+    assert not (tmp_path / "out").exists()
+
+
+def test_main_batch__relative_paths(capsys, tmp_path, monkeypatch):
+    """Relative paths are resolved against the batch file's folder; the timings are reported per section"""
+    os.makedirs(tmp_path / "docs" / "images")
+    copy_files(tmp_path / "docs", ["tstdoc2.html"])
+    copy_files(tmp_path / "docs" / "images", ["img1.gif", "img2.gif"])
+    batch = write_batch(tmp_path / "docs", {
+        "first": { "input": "tstdoc2.html", "destination": "out/first", "appname": "tst2" },
+        "second": { "input": "tstdoc2.html", "appname": "tst2" }
+    })
+    os.makedirs(tmp_path / "elsewhere")
+    monkeypatch.chdir(tmp_path / "elsewhere")
+    ret = db2qthelp.main(["--batch", batch, "--qt-help", "none", "--timings", str(tmp_path / "timings.json")])
+    assert ret==0
+    captured = capsys.readouterr()
+    assert pdirtimename(captured.out, tmp_path).endswith("""Summary:
+ first: ok (<DUR>)
+ second: ok (<DUR>)
+""")
+    assert (tmp_path / "docs" / "out" / "first" / "tst2.qhp").exists()
+    assert (tmp_path / "docs" / "second" / "tst2.qhp").exists()
+    assert (tmp_path / "docs" / "second" / "img1.gif").exists()
+    assert os.listdir(tmp_path / "elsewhere") == []
+    with open(tmp_path / "timings.json", encoding="utf-8") as fdi:
+        report = json.load(fdi)
+    assert list(report["manuals"]) == ["first", "second"]
@@ -23,7 +23,7 @@ import os
 import shutil
 sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
 import db2qthelp
-from util import pdirtimename, copy_files, compare_files, TEST_PATH
+from util import pdirtimename, copy_files, compare_files, bread, TEST_PATH
 
 
 # --- test functions ------------------------------------------------
@@ -43,3 +43,20 @@ def test_main_proc_chunked_html__1(capsys, tmp_path):
     assert captured.err == ""
 
 
+
+
+def test_main_proc_chunked_html__jobs(capsys, tmp_path):
+    """Processes chunked HTML using parallel jobs; the output equals the one of a serial run"""
+    os.makedirs(tmp_path / "tstdoc1_chunked_html", exist_ok=True)
+    copy_files(tmp_path, ["tstdoc1_chunked_html/*.html"])
+    serial_folder = str(tmp_path / "serial")
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1_chunked_html"), "-a", "tst1", "--destination", serial_folder])
+    assert ret==0
+    parallel_folder = str(tmp_path / "parallel")
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1_chunked_html"), "-a", "tst1", "--destination", parallel_folder, "--jobs", "4"])
+    assert ret==0
+    assert sorted(os.listdir(serial_folder)) == sorted(os.listdir(parallel_folder))
+    for file in os.listdir(serial_folder):
+        assert bread(tmp_path / "serial" / file) == bread(tmp_path / "parallel" / file)
+    captured = capsys.readouterr()
+    assert captured.err == ""
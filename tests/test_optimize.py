@@ -0,0 +1,125 @@
+from __future__ import print_function
+"""db2qthelp - output optimization tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import json
+import struct
+import zlib
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import copy_files
+
+
+# --- helper functions ----------------------------------------------
+def png_chunk(kind, body):
+    return struct.pack(">I4s", len(body), kind) + body + struct.pack(">I", zlib.crc32(kind + body))
+
+
+def png_chunks(data):
+    chunks = []
+    pos = 8
+    while pos<len(data):
+        length, kind = struct.unpack(">I4s", data[pos:pos+8])
+        chunks.append((kind, data[pos+8:pos+8+length]))
+        pos += length + 12
+    return chunks
+
+
+def prepare(tmp_path):
+    os.makedirs(tmp_path / "images")
+    copy_files(tmp_path, ["tstdoc2.html"])
+    copy_files(tmp_path / "images", ["img1.gif", "img2.gif"])
+
+
+# --- test functions ------------------------------------------------
+def test_optimize__minify_html():
+    """Removes comments and collapses whitespace outside pre-elements"""
+    assert db2qthelp.minify_html("""<html>
+  <!-- comment -->
+  <body><p>a   b</p>  <pre class="programlisting">x
+   y</pre><!--[if IE]>z<![endif]--></body>
+</html>""") == """<html>
+<body><p>a b</p> <pre class="programlisting">x
+   y</pre><!--[if IE]>z<![endif]--></body>
+</html>"""
+
+
+def test_optimize__png():
+    """Recompresses the image data into a single chunk and drops textual chunks"""
+    pixels = b"".join(b"\0" + bytes(range(64)) * 3 for _ in range(64))
+    compressed = zlib.compress(pixels, 0)
+    ihdr = struct.pack(">IIBBBBB", 64, 64, 8, 2, 0, 0, 0)
+    data = db2qthelp.PNG_SIGNATURE + png_chunk(b"IHDR", ihdr) + png_chunk(b"tEXt", b"Software\0test") \
+        + png_chunk(b"IDAT", compressed[:100]) + png_chunk(b"IDAT", compressed[100:]) + png_chunk(b"IEND", b"")
+    optimized = db2qthelp.optimize_png(data)
+    assert len(optimized) < len(data)
+    chunks = png_chunks(optimized)
+    assert [kind for kind, _ in chunks] == [b"IHDR", b"IDAT", b"IEND"]
+    assert zlib.decompress(chunks[1][1]) == pixels
+    assert db2qthelp.optimize_png(optimized) == optimized
+    assert db2qthelp.optimize_png(data[:60]) == data[:60]
+    assert db2qthelp.optimize_png(b"no png") == b"no png"
+
+
+def test_optimize__gif(tmp_path):
+    """Drops comments and foreign application extensions, keeping the animation control"""
+    with open(os.path.join(os.path.split(__file__)[0], "img1.gif"), "rb") as fdi:
+        data = fdi.read()
+    assert b"Created with GIMP" in data
+    optimized = db2qthelp.optimize_gif(data)
+    assert optimized == data.replace(b"!\xfe\x11Created with GIMP\x00", b"")
+    looping = b"!\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00"
+    foreign = b"!\xff\x0bXMP DataXMP\x02ab\x00"
+    pos = data.find(b"!\xfe")
+    assert db2qthelp.optimize_gif(data[:pos] + looping + foreign + data[pos:] + b"junk") == optimized[:pos] + looping + optimized[pos:]
+    assert db2qthelp.optimize_gif(data[:40]) == data[:40]
+    assert db2qthelp.optimize_image(data, "x.GIF") == optimized
+    assert db2qthelp.optimize_image(data, "x.jpg") == data
+
+
+def test_optimize__process(capsys, tmp_path):
+    """Writes minified pages and optimized images; unchanged images are not optimized again"""
+    prepare(tmp_path)
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", optimize=True)
+    conv.process(str(tmp_path / "tstdoc2.html"), str(tmp_path / "out"), "tst2")
+    assert (tmp_path / "out" / "img1.gif").read_bytes() == db2qthelp.optimize_gif((tmp_path / "images" / "img1.gif").read_bytes())
+    page = (tmp_path / "out" / "doc2-chp1.html").read_text(encoding="utf-8")
+    assert page == db2qthelp.minify_html(page)
+    assert "\n\n" not in page
+    with open(tmp_path / "out" / db2qthelp.MANIFEST_NAME, encoding="utf-8") as fdi:
+        assert list(json.load(fdi)["optimized"].values()) == [124, 124]
+    os.utime(tmp_path / "out" / "img1.gif", ns=(1000000000, 1000000000))
+    conv.process(str(tmp_path / "tstdoc2.html"), str(tmp_path / "out"), "tst2")
+    assert os.stat(tmp_path / "out" / "img1.gif").st_mtime_ns == 1000000000
+    stages = { stage["stage"]: stage for stage in conv.timings }
+    assert stages["assets"]["bytes_written"] == 0
+
+
+def test_optimize__linked(capsys, tmp_path):
+    """Optimized images do not replace the contents of hard linked sources"""
+    prepare(tmp_path)
+    original = (tmp_path / "images" / "img1.gif").read_bytes()
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", assets="link")
+    conv.process(str(tmp_path / "tstdoc2.html"), str(tmp_path / "out"), "tst2")
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", assets="link", optimize=True)
+    conv.process(str(tmp_path / "tstdoc2.html"), str(tmp_path / "out"), "tst2")
+    assert (tmp_path / "images" / "img1.gif").read_bytes() == original
+    assert len((tmp_path / "out" / "img1.gif").read_bytes()) == 124
@@ -0,0 +1,128 @@
+from __future__ import print_function
+"""db2qthelp - page cache tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import glob
+import shutil
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import copy_files
+
+
+# --- helper functions ----------------------------------------------
+def prepare(tmp_path):
+    os.makedirs(tmp_path / "tstdoc1_chunked_html", exist_ok=True)
+    copy_files(tmp_path, ["tstdoc1_chunked_html/*.html"])
+    return str(tmp_path / "tstdoc1_chunked_html")
+
+
+def read_pages(folder):
+    return { os.path.split(file)[1]: open(file, "rb").read() for file in glob.glob(os.path.join(folder, "*.html")) }
+
+
+def entries(folder):
+    return sorted(glob.glob(os.path.join(folder, "*", "*")))
+
+
+# --- test functions ------------------------------------------------
+def test_page_cache__get_put(tmp_path):
+    """Stores and returns entries; invalid entries are misses"""
+    cache = db2qthelp.PageCache(str(tmp_path / "cache"))
+    assert cache.get("abcdef") is None
+    cache.put("abcdef", { "title": "T", "files": ["a.png"] }, b"<html>\xc3\xa4</html>")
+    assert cache.get("abcdef") == ({ "title": "T", "files": ["a.png"] }, b"<html>\xc3\xa4</html>")
+    assert entries(str(tmp_path / "cache")) == [str(tmp_path / "cache" / "ab" / "abcdef")]
+    (tmp_path / "cache" / "ab" / "abcdef").write_bytes(b"\x00\x00\x00\x10{")
+    assert cache.get("abcdef") is None
+    (tmp_path / "cache" / "ab" / "abcdef").write_bytes(b"\x00")
+    assert cache.get("abcdef") is None
+
+
+def test_page_cache__evict(tmp_path):
+    """Removes the least recently used entries once the cache exceeds its size"""
+    cache = db2qthelp.PageCache(str(tmp_path / "cache"), 250)
+    for i, key in enumerate(["aa1", "bb2"]):
+        cache.put(key, {}, b"x" * 90)
+        os.utime(tmp_path / "cache" / key[:2] / key, ns=(1000000000 * (i+1), 1000000000 * (i+1)))
+    assert cache.evict() == 0
+    # using an entry makes it the most recently used one
+    assert cache.get("aa1") is not None
+    cache.put("cc3", {}, b"x" * 90)
+    assert cache.evict() == 1
+    assert [os.path.split(path)[1] for path in entries(str(tmp_path / "cache"))] == ["aa1", "cc3"]
+
+
+def test_page_cache__process(capsys, tmp_path):
+    """Pages processed before are taken from the cache without being parsed"""
+    source = prepare(tmp_path)
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", page_cache=str(tmp_path / "cache"))
+    conv.process(source, str(tmp_path / "out1"), "tst1")
+    assert len(entries(str(tmp_path / "cache"))) == 10
+    expected = read_pages(str(tmp_path / "out1"))
+    conv.process(source, str(tmp_path / "out2"), "tst1")
+    assert read_pages(str(tmp_path / "out2")) == expected
+    assert (tmp_path / "out2" / "tst1.qhp").read_text(encoding="utf-8") == (tmp_path / "out1" / "tst1.qhp").read_text(encoding="utf-8")
+    # a cache hit uses the stored content as it is
+    cache = db2qthelp.PageCache(str(tmp_path / "cache"))
+    for path in entries(str(tmp_path / "cache")):
+        metadata, content = cache.get(os.path.split(path)[1])
+        cache.put(os.path.split(path)[1], metadata, content.replace(b"</body>", b"<!-- cached --></body>"))
+    conv.process(source, str(tmp_path / "out3"), "tst1")
+    assert all(content.endswith(b"<!-- cached --></body></html>\n") for content in read_pages(str(tmp_path / "out3")).values())
+
+
+def test_page_cache__settings(capsys, tmp_path):
+    """Pages processed using other settings or changed pages are not taken from the cache"""
+    source = prepare(tmp_path)
+    db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", page_cache=str(tmp_path / "cache")).process(source, str(tmp_path / "out1"), "tst1")
+    db2qthelp.Db2QtHelp("", "", "p { color: red; }\n", None, qt_help="none", page_cache=str(tmp_path / "cache")).process(source, str(tmp_path / "out2"), "tst1")
+    assert "p { color: red; }" in (tmp_path / "out2" / "doc1-chp1.html").read_text(encoding="utf-8")
+    db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", page_cache=str(tmp_path / "cache")).process(source, str(tmp_path / "out3"), "tst2")
+    assert len(entries(str(tmp_path / "cache"))) == 30
+    page = tmp_path / "tstdoc1_chunked_html" / "doc1-chp1.html"
+    page.write_text(page.read_text(encoding="utf-8").replace("chp1blurb.", "chp1blurb changed."), encoding="utf-8")
+    db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", page_cache=str(tmp_path / "cache")).process(source, str(tmp_path / "out4"), "tst1")
+    assert "chp1blurb changed." in (tmp_path / "out4" / "doc1-chp1.html").read_text(encoding="utf-8")
+    assert len(entries(str(tmp_path / "cache"))) == 31
+
+
+def test_page_cache__code(capsys, tmp_path, monkeypatch):
+    """Pages processed by a changed db2qthelp are not taken from the cache"""
+    source = prepare(tmp_path)
+    db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", page_cache=str(tmp_path / "cache")).process(source, str(tmp_path / "out1"), "tst1")
+    assert len(entries(str(tmp_path / "cache"))) == 10
+    assert db2qthelp.code_digest() == db2qthelp.code_digest()
+    monkeypatch.setattr(db2qthelp, "code_digest", lambda: "0" * 40)
+    db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", page_cache=str(tmp_path / "cache")).process(source, str(tmp_path / "out2"), "tst1")
+    assert len(entries(str(tmp_path / "cache"))) == 20
+
+
+def test_page_cache__main(capsys, tmp_path, monkeypatch):
+    """Caches pages at the default location or the given one unless disabled"""
+    source = prepare(tmp_path)
+    monkeypatch.setenv("DB2QTHELP_PAGE_CACHE", str(tmp_path / "default"))
+    assert db2qthelp.main(["-i", source, "-a", "tst1", "-d", str(tmp_path / "out1"), "--qt-help", "none"])==0
+    assert len(entries(str(tmp_path / "default"))) == 10
+    assert db2qthelp.main(["-i", source, "-a", "tst1", "-d", str(tmp_path / "out2"), "--qt-help", "none", "--cache-dir", str(tmp_path / "cache")])==0
+    assert len(entries(str(tmp_path / "cache"))) == 10
+    shutil.rmtree(tmp_path / "default")
+    assert db2qthelp.main(["-i", source, "-a", "tst1", "-d", str(tmp_path / "out3"), "--qt-help", "none", "--no-cache"])==0
+    assert not os.path.exists(tmp_path / "default")
@@ -0,0 +1,72 @@
+from __future__ import print_function
+"""db2qthelp - page ordering tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import tread
+
+
+
+# --- test functions ------------------------------------------------
+def test_page_order__unnumbered(tmp_path):
+    """Sections with unnumbered titles are ordered as in the document"""
+    html = ['<html><body><div class="book"><h1><a name="book"></a>Book</h1>',
+        '<div class="chapter"><h1><a name="preface"></a>Preface</h1><p>p</p></div>',
+        '<div class="chapter"><h1><a name="intro"></a>Introduction</h1>',
+        '<div class="sect1"><h2><a name="usage"></a>Usage</h2><p>u</p></div></div>',
+        '<div class="appendix"><h1><a name="apx"></a>Appendix</h1><p>a</p></div>',
+        '</div></body></html>\n']
+    (tmp_path / "doc.html").write_text("".join(html), encoding="utf-8")
+    conv = db2qthelp.Db2QtHelp("", "", "", None, qt_help="none")
+    conv.process(str(tmp_path / "doc.html"), str(tmp_path / "out"), "tst")
+    assert tread(tmp_path / "out" / "tst.qhp").find("""            <section title="Book" ref="book.html">
+            </section>
+            <section title="Preface" ref="preface.html">
+            </section>
+            <section title="Introduction" ref="intro.html">
+                <section title="Usage" ref="usage.html">
+                </section>
+            </section>
+            <section title="Appendix" ref="apx.html">
+            </section>
+""")>=0
+
+
+def test_page_order__document_keys():
+    """Chunked pages are ordered along their navigation links"""
+    links = {
+        "z.html": { "up": "index.html", "prev": "index.html", "next": "a.html" },
+        "a.html": { "up": "z.html", "prev": "z.html", "next": "m.html" },
+        "m.html": { "up": "index.html", "prev": "a.html" },
+        "b.html": {}
+    }
+    assert db2qthelp.document_keys(links) == { "z.html": (0,), "a.html": (0, 1), "m.html": (2,), "b.html": (3,) }
+
+
+def test_page_order__document_keys_cycle():
+    """Broken navigation links do not hang the ordering"""
+    links = {
+        "a.html": { "up": "b.html", "next": "b.html" },
+        "b.html": { "up": "a.html", "next": "a.html" }
+    }
+    keys = db2qthelp.document_keys(links)
+    assert sorted(keys) == ["a.html", "b.html"]
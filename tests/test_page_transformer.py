@@ -0,0 +1,94 @@
+from __future__ import print_function
+"""db2qthelp - page transformer tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+
+
+# --- test functions ------------------------------------------------
+def test_page_transformer__rewrite_links():
+    """Rewrites images and anchor links, including links that wrap markup"""
+    transformer = db2qthelp.PageTransformer("tst", "<style></style>", { "b/img.png": "img-12345678.png" })
+    files = set()
+    html = transformer.rewrite_links("""<p>See <a href="#s1">1. s1</a>, <a href="#s2"><code>s2</code></a>,
+<a class="ulink" href="#s3"><em>s3</em> ref</a>, <a href="#s4"><img src="a/img.png"></a>,
+<img src = "b/img.png">, <a href="http://example.org">web</a>, and <a href="s5.html#x">s5</a>.</p>""", files)
+    assert html == """<p>See <a href="s1.html">1. s1</a>, <a href="s2.html"><code>s2</code></a>,
+<a class="ulink" href="s3.html"><em>s3</em> ref</a>, <a href="s4.html"><img src="qthelp://tst/doc/img.png"></a>,
+<img src = "qthelp://tst/doc/img-12345678.png">, <a href="http://example.org">web</a>, and <a href="s5.html#x">s5</a>.</p>"""
+    assert files == { "a/img.png", "b/img.png" }
+
+
+def test_page_transformer__page():
+    """Embeds a section into the prebuilt head and foot"""
+    transformer = db2qthelp.PageTransformer("tst", "<style></style>", {})
+    assert transformer.page("<p>x</p>") == '<html><head><meta http-equiv="Content-Type" content="text/html; charset=UTF-8"/><style></style></head><body><p>x</p></body></html>'
+
+
+def test_page_transformer__page_parts():
+    """Returns the encoded head, content, and foot of a page"""
+    transformer = db2qthelp.PageTransformer("tst", "<style></style>", {})
+    parts = transformer.page_parts("<p>\u00e4</p>")
+    assert parts[1] == "<p>\u00e4</p>".encode("utf-8")
+    assert b"".join(parts) == transformer.page("<p>\u00e4</p>").encode("utf-8")
+
+
+def test_page_transformer__anchors():
+    """Resolves links to anchors within sections; unresolved ones are collected"""
+    transformer = db2qthelp.PageTransformer("tst", "", {}, { "s1": "s1.html", "fig1": "s1.html", "tab1": "s2.html" })
+    html = transformer.rewrite_links('<a href="#s1">s1</a> <a class="ulink" href="#fig1">fig1</a> <a href="#tab1"><b>tab1</b></a> <a href="#nope">nope</a>', set())
+    assert html == '<a href="s1.html">s1</a> <a class="ulink" href="s1.html#fig1">fig1</a> <a href="s2.html#tab1"><b>tab1</b></a> <a href="nope.html">nope</a>'
+    assert transformer.unresolved == { "nope" }
+
+
+def test_page_transformer__anchor_attributes():
+    """Rewrites links to anchors of any kind, keeping their other attributes"""
+    html = """<a class="xref" href="#s1" title="1. s1">s1</a> <a class="link" href="#fig1">fig1</a>
+<a href="#tab1" target="_top">tab1</a> <a
+ class="xref" href="#nope">nope</a> <a data-href="#s1" href="s2.html">s2</a> <abbr title="#s1">s1</abbr>"""
+    transformer = db2qthelp.PageTransformer("tst", "", {})
+    assert transformer.rewrite_links(html, set()) == """<a class="xref" href="s1.html" title="1. s1">s1</a> <a class="link" href="fig1.html">fig1</a>
+<a href="tab1.html" target="_top">tab1</a> <a
+ class="xref" href="nope.html">nope</a> <a data-href="#s1" href="s2.html">s2</a> <abbr title="#s1">s1</abbr>"""
+    transformer = db2qthelp.PageTransformer("tst", "", {}, { "s1": "s1.html", "fig1": "s1.html", "tab1": "s2.html" })
+    expected = """<a class="xref" href="s1.html" title="1. s1">s1</a> <a class="link" href="s1.html#fig1">fig1</a>
+<a href="s2.html#tab1" target="_top">tab1</a> <a
+ class="xref" href="nope.html">nope</a> <a data-href="#s1" href="s2.html">s2</a> <abbr title="#s1">s1</abbr>"""
+    assert transformer.rewrite_links(html, set()) == expected
+    assert transformer.rewrite_links(html.encode("utf-8"), set()) == expected.encode("utf-8")
+    assert transformer.unresolved == { "nope" }
+
+
+def test_page_transformer__rewrite_links_bytes():
+    """Rewrites encoded content like decoded one; content without links is kept as-is"""
+    html = '<p>ä <a href="#s1">s1</a>, <a href="#nöpe">x</a>, <img src="b/ümg.png"> <img src="b/img.png"></p>'
+    for anchors in [None, { "s1": "s0.html" }]:
+        transformer = db2qthelp.PageTransformer("tst", "", { "b/img.png": "img-12345678.png" }, anchors)
+        files = set()
+        expected = transformer.rewrite_links(html, files)
+        transformer = db2qthelp.PageTransformer("tst", "", { "b/img.png": "img-12345678.png" }, anchors)
+        files_bytes = set()
+        assert transformer.rewrite_links(html.encode("utf-8"), files_bytes) == expected.encode("utf-8")
+        assert files_bytes == files == { "b/ümg.png", "b/img.png" }
+    assert transformer.unresolved == { "nöpe" }
+    plain = "<p>ä <b>no links</b></p>".encode("utf-8")
+    assert transformer.rewrite_links_bytes(plain, set()) is plain
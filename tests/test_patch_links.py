@@ -0,0 +1,45 @@
+from __future__ import print_function
+"""db2qthelp - link patching tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+
+
+# --- test functions ------------------------------------------------
+def test_patch_links__rewrites_src():
+    """Rewrites all src attributes and collects the referenced files"""
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    files = set()
+    doc = '<img src="images/a.gif"><img src = "b.png"><img src="images/a.gif">'
+    doc = conv.patch_links(doc, "tst", files)
+    assert doc == '<img src="qthelp://tst/doc/a.gif"><img src = "qthelp://tst/doc/b.png"><img src="qthelp://tst/doc/a.gif">'
+    assert files == {"images/a.gif", "b.png"}
+
+
+def test_patch_links__keeps_text():
+    """Text that contains a referenced path outside of a src attribute is kept"""
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    files = set()
+    doc = '<p>see images/a.gif</p><img src="images/a.gif"><a href="images/a.gif">x</a>'
+    doc = conv.patch_links(doc, "tst", files)
+    assert doc == '<p>see images/a.gif</p><img src="qthelp://tst/doc/a.gif"><a href="images/a.gif">x</a>'
+    assert files == {"images/a.gif"}
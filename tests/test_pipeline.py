@@ -0,0 +1,150 @@
+from __future__ import print_function
+"""db2qthelp - pipelined build tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import time
+import threading
+import concurrent.futures
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import pytest
+import db2qthelp
+from util import copy_files, compare_files, bread
+from test_xslt_lxml import write_docbook_xsl
+
+
+# --- helper functions ----------------------------------------------
+def assert_same_folders(folder1, folder2):
+    """Asserts that both folders contain the same files"""
+    assert sorted(os.listdir(folder1)) == sorted(os.listdir(folder2))
+    for file in os.listdir(folder1):
+        assert bread(folder1 / file) == bread(folder2 / file)
+
+
+# --- test functions ------------------------------------------------
+def test_pipeline__single_html(capsys, tmp_path):
+    """Splits a single HTML document using the pipeline; the output equals the one of a sequential run"""
+    os.makedirs(tmp_path / "images")
+    copy_files(tmp_path, ["tstdoc2.html"])
+    copy_files(tmp_path / "images", ["img1.gif", "img2.gif"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc2.html"), "-a", "tst2", "--destination", str(tmp_path / "tstdoc2_single_html"), "--pipeline", "--qt-help", "none"])
+    assert ret==0
+    assert compare_files(tmp_path, "tstdoc2_single_html", ".html")==(2, 0)
+    assert compare_files(tmp_path, "tstdoc2_single_html", ".qhp")==(1, 0)
+    assert compare_files(tmp_path, "tstdoc2_single_html", ".gif")==(2, 0)
+    assert capsys.readouterr().err == ""
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_pipeline__chunked_html(capsys, tmp_path, jobs):
+    """Processes chunked HTML using the pipeline; the output equals the one of a sequential run"""
+    source = os.path.join(os.path.split(__file__)[0], "tstdoc1_chunked_html")
+    db2qthelp.Db2QtHelp("", "", None, None, qt_help="none").process(source, str(tmp_path / "sequential"), "tst1")
+    db2qthelp.Db2QtHelp("", "", None, None, jobs, qt_help="none", pipeline=True).process(source, str(tmp_path / "pipelined"), "tst1")
+    assert_same_folders(tmp_path / "sequential", tmp_path / "pipelined")
+
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_pipeline__docbook(capsys, tmp_path, jobs):
+    """Processes the pages of a DocBook document while it is transformed"""
+    pytest.importorskip("lxml")
+    docbook_xsl = write_docbook_xsl(tmp_path / "xsl")
+    copy_files(tmp_path, ["tstdoc1.xml"])
+    for folder, pipeline in [("sequential", False), ("pipelined", True)]:
+        conv = db2qthelp.Db2QtHelp("", "", None, None, jobs, qt_help="none", xslt_backend="lxml", docbook_xsl=docbook_xsl, pipeline=pipeline)
+        conv.process(str(tmp_path / "tstdoc1.xml"), str(tmp_path / folder), "tst1")
+    assert_same_folders(tmp_path / "sequential", tmp_path / "pipelined")
+    assert [stage["stage"] for stage in conv.timings] == ["prepare", "pages", "assets", "toc", "qt_help", "manifest"]
+
+
+def test_pipeline__completed_chunks(tmp_path):
+    """Yields pages once they are complete, and the remaining and changed ones once the XSLT processor has finished"""
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    producer = concurrent.futures.Future()
+    (tmp_path / "index.html").write_text("<html></html>\n", encoding="utf-8")
+    (tmp_path / "a.html").write_text("<html><body>a</body></html>\n", encoding="utf-8")
+    (tmp_path / "b.html").write_text("<html><body>b", encoding="utf-8")
+    chunks = conv._completed_chunks(str(tmp_path), producer)
+    assert next(chunks) == str(tmp_path / "a.html")
+    (tmp_path / "a.html").write_text("<html><body>a, changed</body></html>\n", encoding="utf-8")
+    producer.set_result(0)
+    assert list(chunks) == [str(tmp_path / "a.html"), str(tmp_path / "b.html")]
+
+
+def test_pipeline__write_error(tmp_path):
+    """Reports errors of writing pages when the pipeline is closed"""
+    pipeline = db2qthelp.Pipeline(None, str(tmp_path))
+    pipeline.write(str(tmp_path / "missing" / "a.html"), "a")
+    pipeline.write(str(tmp_path / "b.html"), b"b")
+    with pytest.raises(OSError):
+        pipeline.close()
+
+
+def test_pipeline__write_parts(tmp_path):
+    """Writes pages given as binary parts"""
+    pipeline = db2qthelp.Pipeline(None, str(tmp_path))
+    pipeline.write(str(tmp_path / "a.html"), [b"<html>", b"a", b"</html>"])
+    pipeline.close()
+    assert (tmp_path / "a.html").read_bytes() == b"<html>a</html>"
+
+
+def test_pipeline__consume_while_producing(tmp_path, monkeypatch):
+    """Consumes the results of processed pages while the XSLT processor is still writing pages"""
+    os.makedirs(tmp_path / "html")
+    consumed = threading.Event()
+    monkeypatch.setattr(db2qthelp.Db2QtHelp, "_prestage", lambda self, files: consumed.set())
+    def produce():
+        # keep on writing pages until a result was consumed
+        for num in range(200):
+            (tmp_path / "html" / f"p{num:03d}.html").write_text(f"<html><head><title>{num}</title></head><body>{num}</body></html>\n", encoding="utf-8")
+            if consumed.wait(0.05):
+                return 0
+        return 1
+    conv = db2qthelp.Db2QtHelp("", "", None, None, 2, qt_help="none")
+    conv._start_build({})
+    os.makedirs(tmp_path / "out")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=1) as xslt:
+        producer = xslt.submit(produce)
+        pages = []
+        conv._process_chunked(str(tmp_path / "html"), pages, set(), "tst", str(tmp_path / "out"), producer)
+        assert producer.result()==0
+    assert len(pages) == len(os.listdir(tmp_path / "html"))
+
+
+def test_pipeline__process_completed_again(tmp_path, monkeypatch):
+    """A page yielded again while it is being processed is processed once more after the running job has finished"""
+    lock = threading.Lock()
+    active = set()
+    processed = []
+    def process_page(self, file, app_name, dst_folder):
+        with lock:
+            assert file not in active
+            active.add(file)
+        time.sleep(0.05)
+        with lock:
+            active.discard(file)
+            processed.append(file)
+        return file
+    monkeypatch.setattr(db2qthelp.Db2QtHelp, "_process_page", process_page)
+    conv = db2qthelp.Db2QtHelp("", "", None, None, 2, qt_help="none")
+    with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+        results = list(conv._process_completed(executor, iter(["a.html", "b.html", "a.html", "a.html"]), "tst", str(tmp_path)))
+    assert sorted(results) == ["a.html", "a.html", "b.html"]
+    assert processed[-1] == "a.html"
@@ -0,0 +1,103 @@
+from __future__ import print_function
+"""db2qthelp - native Qt Help generation tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import struct
+import sqlite3
+import zlib
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import copy_files, bread
+
+
+
+# --- helper functions ----------------------------------------------
+def read_contents(data):
+    """Decodes the table of contents as stored by Qt's QDataStream"""
+    entries = []
+    pos = 0
+    while pos<len(data):
+        depth = struct.unpack(">i", data[pos:pos+4])[0]
+        pos += 4
+        strings = []
+        for _ in range(2):
+            length = struct.unpack(">I", data[pos:pos+4])[0]
+            strings.append(data[pos+4:pos+4+length].decode("utf-16-be"))
+            pos += 4 + length
+        entries.append((depth, *strings))
+    return entries
+
+
+def query(path, statement):
+    connection = sqlite3.connect(path)
+    try:
+        return connection.execute(statement).fetchall()
+    finally:
+        connection.close()
+
+
+# --- test functions ------------------------------------------------
+def test_qch__native(capsys, tmp_path):
+    """The .qch and the .qhc are written without qhelpgenerator"""
+    os.makedirs(tmp_path / "images")
+    copy_files(tmp_path, ["tstdoc2.html"])
+    copy_files(tmp_path / "images", ["img1.gif", "img2.gif"])
+    dst_folder = tmp_path / "out"
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc2.html"), "-a", "tst2", "-d", str(dst_folder), "-Q", str(tmp_path / "nonexisting"), "--qt-help-backend", "native"])
+    assert ret==0
+    qch = str(dst_folder / "tst2.qch")
+    assert query(qch, "SELECT * FROM NamespaceTable") == [(1, "tst2")]
+    assert query(qch, "SELECT * FROM FolderTable") == [(1, "doc", 1)]
+    assert query(qch, "SELECT * FROM FilterAttributeTable") == [(1, "tst2")]
+    files = query(qch, "SELECT FileNameTable.Name, FileNameTable.Title, FileDataTable.Data FROM FileNameTable JOIN FileDataTable ON FileNameTable.FileId=FileDataTable.Id ORDER BY FileNameTable.Name")
+    assert [(name, title) for name, title, _ in files] == [("doc2-chp1.html", "1.\xa0chp1title"), ("img1.gif", ""), ("img2.gif", ""), ("user.html", "Documentation")]
+    for name, _, data in files:
+        assert struct.unpack(">I", data[:4])[0] == os.path.getsize(dst_folder / name)
+        assert zlib.decompress(data[4:]) == bread(dst_folder / name)
+    contents = query(qch, "SELECT Data FROM ContentsTable")[0][0]
+    assert read_contents(contents) == [(0, "user.html", "Documentation"), (0, "doc2-chp1.html", "1.\xa0chp1title")]
+    assert query(qch, "SELECT Name, FileId, Anchor FROM IndexTable") == [("Documentation", 4, ""), ("1.\xa0chp1title", 1, "")]
+    assert query(qch, "SELECT COUNT(*) FROM FileFilterTable") == [(4,)]
+    qhc = str(dst_folder / "tst2.qhc")
+    assert query(qhc, "SELECT * FROM NamespaceTable") == [(1, "tst2", "tst2.qch")]
+    assert query(qhc, "SELECT * FROM FilterAttributeTable") == [(1, "tst2")]
+
+
+def test_qch__parallel(tmp_path):
+    """Pages compressed by worker processes are packed"""
+    conv = db2qthelp.Db2QtHelp("", "", None, None, jobs=2, qt_help="qch", qt_help_backend="native")
+    conv.process(os.path.join(os.path.split(__file__)[0], "tstdoc1_chunked_html"), str(tmp_path / "out"), "tst1")
+    qch = str(tmp_path / "out" / "tst1.qch")
+    assert query(qch, "SELECT COUNT(*) FROM FileNameTable") == [(10,)]
+    assert not os.path.exists(tmp_path / "out" / "tst1.qhc")
+    contents = read_contents(query(qch, "SELECT Data FROM ContentsTable")[0][0])
+    assert [entry[0] for entry in contents] == [0, 0, 1, 1, 0, 1, 2, 2, 1, 1]
+
+
+def test_qch__project():
+    """The project settings are taken from the template"""
+    template = """<QtHelpProject version="1.0"><namespace>org.%appname%</namespace><virtualFolder>help</virtualFolder>
+<customFilter name="App 1.0"><filterAttribute>app</filterAttribute><filterAttribute>1.0</filterAttribute></customFilter>
+<filterSection><filterAttribute>app</filterAttribute><filterAttribute>1.0</filterAttribute><toc>%toc%</toc><keywords>%keywords%</keywords>
+<files><file>*.html</file></files></filterSection></QtHelpProject>"""
+    assert db2qthelp.qhp_project(template, "tst") == {
+        "namespace": "org.tst", "virtual_folder": "help", "filter_attributes": ["app", "1.0"],
+        "custom_filters": [("App 1.0", ["app", "1.0"])], "file_patterns": ["*.html"] }
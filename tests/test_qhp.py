@@ -0,0 +1,56 @@
+from __future__ import print_function
+"""db2qthelp - QtHelp project writing tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import io
+import db2qthelp
+
+
+
+# --- test functions ------------------------------------------------
+def test_qhp__escaping():
+    """Titles are converted to text and escaped"""
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    pages = [["a.html", "1.&#160;A &amp; <code>B</code> &lt;C&gt;", [1]]]
+    assert conv.build_toc_sections(pages) == '            <section title="1.\xa0A &amp; B &lt;C&gt;" ref="a.html">\n            </section>\n'
+    fdo = io.StringIO()
+    conv.write_keywords(fdo, pages)
+    assert fdo.getvalue() == '            <keyword name="1.\xa0A &amp; B &lt;C&gt;" ref="./a.html"/>'
+
+
+def test_qhp__template():
+    """Only the template's placeholders are replaced"""
+    conv = db2qthelp.Db2QtHelp("", "", None, "<p n='%appname%'>\n%toc%</p>\n<k>\n%keywords%\n</k>\n")
+    pages = [["a.html", "1. %keywords%", [1]], ["b.html", "1.1. %appname%", [1, 1]]]
+    fdo = io.StringIO()
+    conv.write_qhp(fdo, pages, "tst")
+    assert fdo.getvalue() == """<p n='tst'>
+            <section title="1. %keywords%" ref="a.html">
+                <section title="1.1. %appname%" ref="b.html">
+                </section>
+            </section>
+</p>
+<k>
+            <keyword name="1. %keywords%" ref="./a.html"/>
+            <keyword name="1.1. %appname%" ref="./b.html"/>
+</k>
+"""
@@ -0,0 +1,132 @@
+from __future__ import print_function
+"""db2qthelp - Qt Help generation tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import copy_files
+
+
+
+# --- helper functions ----------------------------------------------
+def write_qhelpgenerator(path, ret=0):
+    """Writes a fake qhelpgenerator that logs its call and writes the output file"""
+    os.makedirs(path, exist_ok=True)
+    script = path / "qhelpgenerator"
+    script.write_text(f"""#!{sys.executable}
+import sys
+with open(sys.argv[3], "w") as fd:
+    fd.write(sys.argv[1])
+print("called " + " ".join(sys.argv[1:]))
+sys.exit({ret})
+""")
+    os.chmod(script, 0o755)
+
+
+# --- test functions ------------------------------------------------
+def test_qt_help__all(capsys, tmp_path):
+    """Generates both, the .qch and the .qhc using the collection project"""
+    write_qhelpgenerator(tmp_path / "qt")
+    copy_files(tmp_path, ["tstdoc1.html"])
+    conv = db2qthelp.Db2QtHelp(str(tmp_path / "qt"), "", None, None)
+    conv.process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "out"), "tst1")
+    assert len(conv.tool_results)==1
+    result = conv.tool_results[0]
+    assert result.command[1:] == [str(tmp_path / "out" / "tst1.qhcp"), "-o", str(tmp_path / "out" / "tst1.qhc")]
+    assert result.returncode==0
+    assert result.output.startswith("called ")
+    assert result.duration>=0
+
+
+def test_qt_help__qch(capsys, tmp_path):
+    """Generates the .qch only"""
+    write_qhelpgenerator(tmp_path / "qt")
+    copy_files(tmp_path, ["tstdoc1.html"])
+    conv = db2qthelp.Db2QtHelp(str(tmp_path / "qt"), "", None, None, qt_help="qch")
+    conv.process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "out"), "tst1")
+    assert [result.command[1] for result in conv.tool_results] == [str(tmp_path / "out" / "tst1.qhp")]
+
+
+def test_qt_help__qhc(capsys, tmp_path):
+    """Generates the .qhc only; the collection project does not generate the .qch"""
+    write_qhelpgenerator(tmp_path / "qt")
+    copy_files(tmp_path, ["tstdoc1.html"])
+    db2qthelp.Db2QtHelp(str(tmp_path / "qt"), "", None, None, qt_help="qch").process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "out"), "tst1")
+    conv = db2qthelp.Db2QtHelp(str(tmp_path / "qt"), "", None, None, qt_help="qhc")
+    conv.process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "out"), "tst1")
+    assert [result.command[1] for result in conv.tool_results] == [str(tmp_path / "out" / "tst1.qhcp")]
+    assert "<generate>" not in (tmp_path / "out" / "tst1.qhcp").read_text()
+
+
+def test_qt_help__qhc_missing_qch(capsys, tmp_path):
+    """Reports a collection that registers a .qch that does not exist"""
+    write_qhelpgenerator(tmp_path / "qt")
+    copy_files(tmp_path, ["tstdoc1.html"])
+    for backend in ["qhelpgenerator", "native"]:
+        ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.html"), "-a", "tst1", "-d", str(tmp_path / backend), "-Q", str(tmp_path / "qt"), "--qt-help", "qhc", "--qt-help-backend", backend])
+        assert ret==2
+        captured = capsys.readouterr()
+        assert captured.err == f"db2qthelp: error: the Qt Help collection registers '{tmp_path / backend / 'tst1'}.qch', which does not exist; generate it using --qt-help qch or all\n"
+        assert not (tmp_path / backend / "tst1.qhc").exists()
+
+
+def test_qt_help__none(capsys, tmp_path):
+    """Does not generate Qt Help files"""
+    write_qhelpgenerator(tmp_path / "qt")
+    copy_files(tmp_path, ["tstdoc1.html"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.html"), "-a", "tst1", "-d", str(tmp_path / "out"), "-Q", str(tmp_path / "qt"), "--qt-help", "none"])
+    assert ret==0
+    assert not (tmp_path / "out" / "tst1.qch").exists()
+    assert not (tmp_path / "out" / "tst1.qhc").exists()
+
+
+def test_qt_help__failure(capsys, tmp_path):
+    """Reports a failing qhelpgenerator"""
+    write_qhelpgenerator(tmp_path / "qt", 3)
+    copy_files(tmp_path, ["tstdoc1.html"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.html"), "-a", "tst1", "-d", str(tmp_path / "out"), "-Q", str(tmp_path / "qt")])
+    assert ret==2
+    captured = capsys.readouterr()
+    assert captured.err.startswith("db2qthelp: error: qhelpgenerator failed with ret=3 for ")
+
+
+def test_qt_help__missing(capsys, tmp_path):
+    """Reports a qhelpgenerator that cannot be invoked"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.html"), "-a", "tst1", "-d", str(tmp_path / "out"), "-Q", str(tmp_path / "nonexisting")])
+    assert ret==2
+    captured = capsys.readouterr()
+    assert captured.err.startswith(f"db2qthelp: error: could not invoke qhelpgenerator for '{tmp_path / 'out' / 'tst1.qhcp'}': ")
+    assert not (tmp_path / "out" / "tst1.qhc").exists()
+
+
+def test_qt_help__projects(capsys, tmp_path):
+    """Runs the generation for several projects concurrently"""
+    write_qhelpgenerator(tmp_path / "qt")
+    conv = db2qthelp.Db2QtHelp(str(tmp_path / "qt"), "", None, None, jobs=4)
+    projects = []
+    for i in range(6):
+        os.makedirs(tmp_path / f"out{i}")
+        projects.append((str(tmp_path / f"out{i}"), f"app{i}"))
+    results = conv.generate_qt_help(projects)
+    assert [result.command[1] for result in results] == [os.path.join(folder, app_name + ".qhcp") for folder, app_name in projects]
+    for folder, app_name in projects:
+        assert os.path.exists(os.path.join(folder, app_name + ".qhc"))
@@ -0,0 +1,69 @@
+from __future__ import print_function
+"""db2qthelp - full-text search index tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import copy_files, bread
+
+
+
+# --- test functions ------------------------------------------------
+def test_search_index__single(capsys, tmp_path):
+    """The index is written next to the Qt Help files"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.html"), "-a", "tst1", "-d", str(tmp_path / "out"), "--qt-help", "none", "--search-index"])
+    assert ret==0
+    index = db2qthelp.SearchIndex.load(str(tmp_path / "out" / "tst1.search.json.gz"))
+    assert len(index.pages) == 11
+    assert index.search("CHP2BLURB") == [("doc1-chp2.html", "2.\xa0chp2title")]
+    assert index.search("font") == []
+    assert sorted(page[0] for page in index.search("chp3title")) == ["doc1-chp3.html", "user.html"]
+    assert [page[0] for page in index.search("sect311title")] == ["doc1-chp3-sect1-sect1.html"]
+
+
+def test_search_index__chunked(tmp_path):
+    """Pages indexed by worker processes equal the ones indexed serially"""
+    source = os.path.join(os.path.split(__file__)[0], "tstdoc1_chunked_html")
+    for jobs in [1, 2]:
+        conv = db2qthelp.Db2QtHelp("", "", None, None, jobs=jobs, qt_help="none", search_index=True)
+        conv.process(source, str(tmp_path / f"out{jobs}"), "tst1")
+        assert "search" in [stage["stage"] for stage in conv.timings]
+    assert bread(tmp_path / "out1" / "tst1.search.json.gz") == bread(tmp_path / "out2" / "tst1.search.json.gz")
+    index = db2qthelp.SearchIndex.load(str(tmp_path / "out1" / "tst1.search.json.gz"))
+    assert [page[0] for page in index.search("sect32blurb")] == ["doc1-chp3-sect2.html"]
+
+
+def test_search_index__query():
+    """Terms are looked up with their positions; phrases are matched"""
+    pages = [("a.html", "A"), ("b.html", "B"), ("c.html", "C")]
+    index = db2qthelp.SearchIndex.build(pages, {
+        "a.html": db2qthelp.page_terms("<html><head><title>x</title><style>p { color: red; }</style></head><body><p>Red fish, blue fish</p></body></html>"),
+        "c.html": db2qthelp.page_terms("<body>blue red fish &amp; fish</body>")
+    })
+    assert index.lookup("fish") == { 0: [1, 3], 2: [2, 3] }
+    assert index.lookup("Red") == { 0: [0], 2: [1] }
+    assert index.lookup("color") == {}
+    assert index.search("fish red") == [("a.html", "A"), ("c.html", "C")]
+    assert index.search("red fish", phrase=True) == [("a.html", "A"), ("c.html", "C")]
+    assert index.search("blue red", phrase=True) == [("c.html", "C")]
+    assert index.search("fish red", phrase=True) == []
+    assert index.search("") == []
@@ -0,0 +1,101 @@
+from __future__ import print_function
+"""db2qthelp - single HTML splitting tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import pdirtimename, copy_files
+
+
+
+# --- test functions ------------------------------------------------
+def test_split_single__deep_nesting(tmp_path):
+    """Splits a document that is nested deeper than the recursion limit"""
+    depth = sys.getrecursionlimit() + 100
+    html = ['<html><body><div class="book"><h1><a name="book"></a>Book</h1>', '<div class="chapter"><h1><a name="c1"></a>1. c1 </h1>']
+    for i in range(1, depth):
+        html.append(f'<div class="sect{i}"><h2><a name="s{i}"></a>1.{i}. s{i}</h2><p>s{i}</p>\n')
+    html.append("</div>\n" * depth)
+    html.append("</div></body></html>\n")
+    (tmp_path / "deep.html").write_text("".join(html), encoding="utf-8")
+    os.makedirs(tmp_path / "out")
+    pages = []
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    conv._process_single(str(tmp_path / "deep.html"), str(tmp_path / "out"), pages, set(), "tst")
+    assert len(pages) == depth + 1
+    assert pages[-1] == [f"s{depth-1}.html", f"1.{depth-1}. s{depth-1}", tuple(range(1, depth+1))]
+    assert (tmp_path / "out" / "s1.html").read_text(encoding="utf-8").endswith("<p>s1</p>\n</body></html>")
+
+
+def test_split_single__cross_references(capsys, tmp_path):
+    """Links to anchors within sections point to the sections' pages; unresolved ones are reported"""
+    (tmp_path / "doc.html").write_text("""<html><body><div class="book"><h1><a name="book"></a>Book</h1>
+<div class="chapter"><h1><a name="c1"></a>1. c1 </h1><p>See <a class="xref" href="#fig2">Figure 1</a>, <a href="#fig2">Figure 1</a>, <a href="#c2"><em>c2</em></a>, and <a href="#missing">x</a>.</p></div>
+<div class="chapter"><h1><a name="c2"></a>2. c2 </h1><div class="figure"><a name="fig2"></a><p class="title">Figure 1</p></div>
+<div class="table" id="tab1"><p>A table, see <a href="#c1">c1</a> and <a href="#tab1">here</a></p></div></div>
+</div></body></html>
+""", encoding="utf-8")
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none")
+    conv.process(str(tmp_path / "doc.html"), str(tmp_path / "out"), "tst")
+    assert '<p>See <a class="xref" href="c2.html#fig2">Figure 1</a>, <a href="c2.html#fig2">Figure 1</a>, <a href="c2.html"><em>c2</em></a>, and <a href="missing.html">x</a>.</p>' in (tmp_path / "out" / "c1.html").read_text(encoding="utf-8")
+    assert '<p>A table, see <a href="c1.html">c1</a> and <a href="c2.html#tab1">here</a></p>' in (tmp_path / "out" / "c2.html").read_text(encoding="utf-8")
+    assert conv.unresolved == ["missing"]
+    captured = capsys.readouterr()
+    assert pdirtimename(captured.err, tmp_path) == "db2qthelp: warning: unresolved links to missing in '<DIR>/doc.html'\n"
+
+
+def test_split_single__sections(tmp_path):
+    """Yields the encoded sections of the mapped document"""
+    (tmp_path / "doc.html").write_bytes('<html><body><a name="book"></a>ä<div class="chapter"><a name="c1"></a>c1<div class="sect1"><a name="s1"></a>s1<div class="sect3">x</div></div></div><div class="appendix"><a name="a"></a>a</div></body></html>'.encode("utf-8"))
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    assert list(conv._split_single(str(tmp_path / "doc.html"))) == [
+        ('<html><body><a name="book"></a>ä'.encode("utf-8"), 0, 1),
+        (b'<a name="c1"></a>c1', 0, 1),
+        (b'<a name="s1"></a>s1<div class="sect3">x</div></div></div>', 1, 2),
+        (b'<a name="a"></a>a</div></body></html>', 0, 1)]
+    (tmp_path / "empty.html").write_bytes(b"")
+    assert list(conv._split_single(str(tmp_path / "empty.html"))) == [(b"", 0, 1)]
+
+
+def test_split_single__release_mapping(tmp_path, monkeypatch):
+    """Releases processed parts of the mapping while splitting"""
+    monkeypatch.setattr(db2qthelp, "MAPPING_RELEASE_SIZE", 1)
+    html = ['<html><body><div class="book"><h1><a name="book"></a>Book</h1>']
+    for i in range(1, 100):
+        html.append(f'<div class="chapter"><h1><a name="c{i}"></a>{i}. c{i} </h1><p>{"x" * 1000}</p></div>\n')
+    html.append("</div></body></html>\n")
+    (tmp_path / "doc.html").write_text("".join(html), encoding="utf-8")
+    conv = db2qthelp.Db2QtHelp("", "", None, None)
+    sections = list(conv._split_single(str(tmp_path / "doc.html")))
+    assert b"".join(section for section, _, _ in sections) == "".join(html).encode("utf-8").replace(b'<div class="chapter">', b"")
+
+
+def test_split_single__line_ends(tmp_path):
+    """Pages of documents using CR/LF line ends are written as if the document was read in text mode"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    doc = (tmp_path / "tstdoc1.html").read_bytes()
+    (tmp_path / "crlf.html").write_bytes(doc.replace(b"\n", b"\r\n"))
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none")
+    conv.process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "lf"), "tst1")
+    conv.process(str(tmp_path / "crlf.html"), str(tmp_path / "crlf"), "tst1")
+    for page in os.listdir(tmp_path / "lf"):
+        if page.endswith(".html"):
+            assert (tmp_path / "crlf" / page).read_bytes() == (tmp_path / "lf" / page).read_bytes()
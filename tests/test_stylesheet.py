@@ -0,0 +1,113 @@
+from __future__ import print_function
+"""db2qthelp - external stylesheet tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import sqlite3
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import copy_files
+
+
+# --- test functions ------------------------------------------------
+def test_stylesheet__minify_css():
+    """Removes comments and unneeded whitespace, keeping strings"""
+    assert db2qthelp.minify_css("""/* comment */
+h1  >  b , a:hover {
+ margin : 0 0;
+ content: "a  /* b */ ;";
+}
+h2 /**/ h3 { color: red; }
+""") == 'h1>b,a:hover{margin :0 0;content:"a  /* b */ ;"}h2 h3{color:red}'
+
+
+def test_stylesheet__minify_css_literals():
+    """Keeps semicolons followed by closing braces within strings and URLs"""
+    assert db2qthelp.minify_css("""a::after {
+ content: ";}" ;
+ background: url(data:x;}/*y*/) ;
+ /* last */
+}
+b { content: ';}' }
+""") == """a::after{content:";}";background:url(data:x;}/*y*/)}b{content:';}'}"""
+
+
+def test_stylesheet__external(capsys, tmp_path):
+    """Writes the CSS definition into a stylesheet that is linked by the pages and listed in the project"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    conv = db2qthelp.Db2QtHelp("", "", "p { color: red; }\n", None, qt_help="none", stylesheet="external")
+    conv.process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "out"), "tst1")
+    assert (tmp_path / "out" / "db2qthelp.css").read_text(encoding="utf-8") == "p { color: red; }\n"
+    page = (tmp_path / "out" / "doc1-chp1.html").read_text(encoding="utf-8")
+    assert '<link rel="stylesheet" type="text/css" href="db2qthelp.css"/>' in page
+    assert "<style>" not in page
+    qhp = (tmp_path / "out" / "tst1.qhp").read_text(encoding="utf-8")
+    assert """            <file>*.gif</file>
+            <file>db2qthelp.css</file>
+        </files>""" in qhp
+
+
+def test_stylesheet__external_minified(capsys, tmp_path):
+    """Minifies the written stylesheet"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", stylesheet="external", minify_css=True)
+    conv.process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "out"), "tst1")
+    assert (tmp_path / "out" / "db2qthelp.css").read_text(encoding="utf-8") == db2qthelp.minify_css(db2qthelp.CSS_DEFINITION)
+
+
+def test_stylesheet__inline_minified(capsys, tmp_path):
+    """Embeds the minified CSS definition"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    conv = db2qthelp.Db2QtHelp("", "", "p {\n color: red;\n}\n", None, qt_help="none", minify_css=True)
+    conv.process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "out"), "tst1")
+    assert "\n<style>\np{color:red}</style>\n" in (tmp_path / "out" / "doc1-chp1.html").read_text(encoding="utf-8")
+    assert not (tmp_path / "out" / "db2qthelp.css").exists()
+
+
+def test_stylesheet__changed(capsys, tmp_path):
+    """Changing the CSS definition only rewrites the stylesheet"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none", stylesheet="external")
+    conv.process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "out"), "tst1")
+    conv.set_css_definition("p { color: red; }\n")
+    conv.process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "out"), "tst1")
+    assert (tmp_path / "out" / "db2qthelp.css").read_text(encoding="utf-8") == "p { color: red; }\n"
+    stages = { stage["stage"]: stage for stage in conv.timings }
+    assert stages["pages"]["bytes_written"] == 0
+    assert stages["assets"]["bytes_written"] == len("p { color: red; }\n")
+
+
+def test_stylesheet__native(capsys, tmp_path):
+    """Adds the stylesheet to the files of the .qch file"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="qch", qt_help_backend="native", stylesheet="external")
+    conv.process(str(tmp_path / "tstdoc1.html"), str(tmp_path / "out"), "tst1")
+    connection = sqlite3.connect(str(tmp_path / "out" / "tst1.qch"))
+    names = [row[0] for row in connection.execute("SELECT Name FROM FileNameTable")]
+    connection.close()
+    assert "db2qthelp.css" in names
+
+
+def test_stylesheet__main(capsys, tmp_path):
+    """Selects the external stylesheet on the command line"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.html"), "-a", "tst1", "-d", str(tmp_path / "out"), "--qt-help", "none", "--stylesheet", "external", "--minify-css"])
+    assert ret==0
+    assert (tmp_path / "out" / "db2qthelp.css").read_text(encoding="utf-8").startswith("body{margin:0;")
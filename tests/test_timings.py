@@ -0,0 +1,101 @@
+from __future__ import print_function
+"""db2qthelp - timings and profiling tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import json
+import pstats
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+from util import copy_files
+
+
+
+# --- test functions ------------------------------------------------
+def test_timings__stages(tmp_path):
+    """The build stages are measured"""
+    os.makedirs(tmp_path / "images")
+    copy_files(tmp_path, ["tstdoc2.html"])
+    copy_files(tmp_path / "images", ["img1.gif", "img2.gif"])
+    conv = db2qthelp.Db2QtHelp("", "", None, None, qt_help="none")
+    conv.process(str(tmp_path / "tstdoc2.html"), str(tmp_path / "out"), "tst2")
+    stages = { stage["stage"]: stage for stage in conv.timings }
+    assert [stage["stage"] for stage in conv.timings] == ["prepare", "pages", "assets", "toc", "qt_help", "manifest"]
+    assert all(stage["wall"]>=0 and stage["cpu"]>=0 for stage in conv.timings)
+    size = os.path.getsize(tmp_path / "tstdoc2.html")
+    # the inputs are not read while preparing the build
+    assert stages["prepare"]["bytes_read"] == 0
+    assert stages["pages"]["pages"] == 2
+    # the document is scanned for anchors before being split
+    assert stages["pages"]["bytes_read"] == 2 * size
+    assert stages["pages"]["bytes_written"] == sum(os.path.getsize(tmp_path / "out" / page) for page in ["user.html", "doc2-chp1.html"])
+    assert stages["assets"]["assets"] == 2
+    assert stages["assets"]["bytes_written"] == sum(os.path.getsize(tmp_path / "images" / image) for image in ["img1.gif", "img2.gif"])
+    assert stages["toc"]["bytes_written"] == os.path.getsize(tmp_path / "out" / "tst2.qhp") + os.path.getsize(tmp_path / "out" / "tst2.qhcp")
+    # nothing is written when building again
+    conv.process(str(tmp_path / "tstdoc2.html"), str(tmp_path / "out"), "tst2")
+    assert sum(stage["bytes_written"] for stage in conv.timings[:-1]) == 0
+
+
+def test_timings__main(capsys, tmp_path):
+    """The timings report and the profile are written if wished"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.html"), "-a", "tst1", "-d", str(tmp_path / "out"), "--qt-help", "none",
+        "--timings", str(tmp_path / "timings.json"), "--profile", str(tmp_path / "profile.prof")])
+    assert ret==0
+    with open(tmp_path / "timings.json", encoding="utf-8") as fdi:
+        report = json.load(fdi)
+    assert list(report["manuals"]) == ["tst1"]
+    assert report["manuals"]["tst1"]["total"]["pages"] == 11
+    assert len(report["manuals"]["tst1"]["stages"]) == 6
+    stats = pstats.Stats(str(tmp_path / "profile.prof"))
+    assert any(function[2]=="_process_single" for function in stats.stats)
+
+
+def test_timings__main_jobs(tmp_path):
+    """Profiling does not hinder processing the pages by worker processes"""
+    os.makedirs(tmp_path / "tstdoc1_chunked_html")
+    copy_files(tmp_path, ["tstdoc1_chunked_html/*.html"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1_chunked_html"), "-a", "tst1", "-d", str(tmp_path / "out"), "--qt-help", "none",
+        "--jobs", "4", "--profile", str(tmp_path / "profile.prof")])
+    assert ret==0
+    assert len([file for file in os.listdir(tmp_path / "out") if file.endswith(".html")]) == 10
+    stats = pstats.Stats(str(tmp_path / "profile.prof"))
+    assert any(function[2]=="_process_chunked" for function in stats.stats)
+
+
+def test_timings__main_batch_jobs(capsys, tmp_path):
+    """Profiling is rejected for batches built by worker processes"""
+    copy_files(tmp_path, ["tstdoc1.html"])
+    (tmp_path / "batch.cfg").write_text(f"[tst1]\ninput={tmp_path / 'tstdoc1.html'}\n", encoding="utf-8")
+    try:
+        db2qthelp.main(["--batch", str(tmp_path / "batch.cfg"), "--jobs", "2", "--profile", str(tmp_path / "profile.prof")])
+        assert False # pragma: no cover
+    except SystemExit as e:
+        assert e.code==2
+    captured = capsys.readouterr()
+    assert captured.err == "db2qthelp: error: the option --profile cannot be used together with --batch and more than one job\n"
+    assert not (tmp_path / "profile.prof").exists()
+
+
+def test_timings__report():
+    """The report sums up the stages"""
+    report = db2qthelp.timings_report({ "a": [{ "stage": "pages", "wall": 1., "pages": 3 }, { "stage": "toc", "wall": 2., "pages": 0 }] })
+    assert report["manuals"]["a"]["total"] == { "wall": 3., "pages": 3 }
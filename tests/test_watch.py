@@ -0,0 +1,117 @@
+from __future__ import print_function
+"""db2qthelp - watch mode tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+import time
+import threading
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import db2qthelp
+
+
+# --- helper functions ----------------------------------------------
+def document(text):
+    return f"""<html><body><div class="book"><h1><a name="book"></a>Book</h1>
+<div class="chapter"><h1><a name="c1"></a>1. c1 </h1><p>{text}</p><img src="img.gif"></div>
+<div class="chapter"><h1><a name="c2"></a>2. c2 </h1><p>c2</p></div>
+</div></body></html>
+"""
+
+
+def wait_for(condition, timeout=10.):
+    """Waits until the given condition holds"""
+    end = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic()<end
+        time.sleep(.01)
+
+
+def read(path):
+    """Returns the content of the given file, an empty string if it does not exist (yet)"""
+    try:
+        return path.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        return ""
+
+
+def touch(path, content):
+    """Writes the given content and makes sure the modification time changes"""
+    stat = os.stat(path)
+    path.write_text(content, encoding="utf-8")
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+
+
+# --- test functions ------------------------------------------------
+def test_watch__document_includes(tmp_path):
+    """Collects XIncludes recursively, skipping remote ones"""
+    os.makedirs(tmp_path / "chapters")
+    (tmp_path / "book.xml").write_text("""<book xmlns:xi="http://www.w3.org/2001/XInclude">
+<xi:include href="chapters/c1.xml"/><xi:include href='http://example.org/c.xml'/>
+</book>""", encoding="utf-8")
+    (tmp_path / "chapters" / "c1.xml").write_text('<chapter><include xmlns="http://www.w3.org/2001/XInclude" parse="text" href="code.txt"/><xi:include href="../book.xml"/></chapter>', encoding="utf-8")
+    assert db2qthelp.document_includes(str(tmp_path / "book.xml")) == [str(tmp_path / "book.xml"), str(tmp_path / "chapters" / "c1.xml"), str(tmp_path / "chapters" / "code.txt")]
+
+
+def test_watch__rebuild(capsys, tmp_path):
+    """Rebuilds changed pages once after a burst of changes, and after changes of the CSS definition"""
+    source = tmp_path / "doc.html"
+    source.write_text(document("first"), encoding="utf-8")
+    (tmp_path / "img.gif").write_bytes(b"GIF89a")
+    css = tmp_path / "style.css"
+    css.write_text("body { color: red; }\n", encoding="utf-8")
+    conv = db2qthelp.Db2QtHelp("", "", css.read_text(encoding="utf-8"), None, qt_help="none")
+    stop = threading.Event()
+    result = []
+    thread = threading.Thread(target=lambda: result.append(conv.watch(str(source), str(tmp_path / "out"), "tst", str(css), None, .01, .1, stop)))
+    thread.start()
+    try:
+        output = []
+        def printed(text):
+            output.append(capsys.readouterr().out)
+            return text in "".join(output)
+        wait_for(lambda: printed("Watching"))
+        page2 = (tmp_path / "out" / "c2.html").stat().st_mtime_ns
+        touch(source, document("second"))
+        touch(source, document("third"))
+        wait_for(lambda: "third" in read(tmp_path / "out" / "c1.html"))
+        assert (tmp_path / "out" / "c2.html").stat().st_mtime_ns==page2
+        touch(css, "body { color: blue; }\n")
+        wait_for(lambda: "blue" in read(tmp_path / "out" / "c2.html"))
+        touch(tmp_path / "img.gif", "GIF89b")
+        wait_for(lambda: printed("changes of img.gif") and read(tmp_path / "out" / "img.gif")=="GIF89b")
+    finally:
+        stop.set()
+        thread.join()
+    assert result==[3]
+    captured = capsys.readouterr()
+    assert captured.err == ""
+
+
+def test_watch__batch(capsys, tmp_path):
+    """Watching is not supported for batch builds"""
+    (tmp_path / "batch.cfg").write_text(f"[tst]\ninput={tmp_path / 'doc.html'}\n", encoding="utf-8")
+    (tmp_path / "doc.html").write_text(document("first"), encoding="utf-8")
+    try:
+        db2qthelp.main(["--batch", str(tmp_path / "batch.cfg"), "--watch"])
+        assert False # pragma: no cover
+    except SystemExit as e:
+        assert e.code==2
+    captured = capsys.readouterr()
+    assert captured.err == "db2qthelp: error: the option --watch cannot be used together with --batch\n"
@@ -0,0 +1,77 @@
+from __future__ import print_function
+"""db2qthelp - in-process XSLT tests.
+"""
+# ===========================================================================
+__author__     = "Daniel Krajzewicz"
+__copyright__  = "Copyright 2022-2025, Daniel Krajzewicz"
+__credits__    = ["Daniel Krajzewicz"]
+__license__    = "GPLv3"
+__version__    = "0.4.0"
+__maintainer__ = "Daniel Krajzewicz"
+__email__      = "daniel@krajzewicz.de"
+__status__     = "Development"
+# ===========================================================================
+# - https://github.com/dkrajzew/db2qthelp
+# - http://www.krajzewicz.de/docs/db2qthelp/index.html
+# - http://www.krajzewicz.de
+# ===========================================================================
+
+
+# --- imports -----------------------------------------------------------------
+import sys
+import os
+sys.path.append(os.path.join(os.path.split(__file__)[0], "..", "db2qthelp"))
+import pytest
+import db2qthelp
+from util import copy_files
+
+
+
+# --- helper functions ----------------------------------------------
+CHUNK_XSL = """<xsl:stylesheet xmlns:xsl="http://www.w3.org/1999/XSL/Transform"
+  xmlns:exsl="http://exslt.org/common" extension-element-prefixes="exsl" version="1.0">
+<xsl:param name="base.dir"/>
+<xsl:template match="/">
+  <xsl:for-each select="//chapter">
+    <exsl:document href="{concat($base.dir, '/', @id, '.html')}" method="html" encoding="UTF-8">
+      <html><head><title><xsl:value-of select="position()"/>. <xsl:value-of select="title"/></title></head>
+      <body><p><xsl:value-of select="para"/></p></body></html>
+    </exsl:document>
+  </xsl:for-each>
+</xsl:template>
+</xsl:stylesheet>
+"""
+
+
+# --- helper functions ----------------------------------------------
+def write_docbook_xsl(path):
+    """Writes a minimal replacement of the DocBook XSL chunking stylesheet"""
+    os.makedirs(path / "html")
+    (path / "html" / "chunk.xsl").write_text(CHUNK_XSL, encoding="utf-8")
+    return str(path)
+
+
+# --- test functions ------------------------------------------------
+def test_xslt_lxml__process(capsys, tmp_path):
+    """Converts a DocBook document using the in-process XSLT backend and cached stylesheets"""
+    pytest.importorskip("lxml")
+    docbook_xsl = write_docbook_xsl(tmp_path / "xsl")
+    copy_files(tmp_path, ["tstdoc1.xml"])
+    conv = db2qthelp.Db2QtHelp("", "", None, None, xslt_backend="lxml", docbook_xsl=docbook_xsl)
+    conv.process(str(tmp_path / "tstdoc1.xml"), str(tmp_path / "out"), "tst1")
+    assert sorted(f for f in os.listdir(tmp_path / "out") if f.endswith(".html")) == ["doc1-chp1.html", "doc1-chp2.html", "doc1-chp3.html"]
+    qhp = (tmp_path / "out" / "tst1.qhp").read_text(encoding="utf-8")
+    assert '<section title="2. chp2title" ref="doc1-chp2.html">' in qhp
+    # the stylesheet is compiled once
+    assert db2qthelp.get_transform(db2qthelp.CHUNK_XSL_PATH, docbook_xsl) is db2qthelp.get_transform(db2qthelp.CHUNK_XSL_PATH, docbook_xsl)
+
+
+def test_xslt_lxml__missing(capsys, tmp_path, monkeypatch):
+    """Reports a missing lxml"""
+    monkeypatch.setattr(db2qthelp, "etree", None)
+    docbook_xsl = write_docbook_xsl(tmp_path / "xsl")
+    copy_files(tmp_path, ["tstdoc1.xml"])
+    ret = db2qthelp.main(["-i", str(tmp_path / "tstdoc1.xml"), "-d", str(tmp_path / "out"), "--xslt-backend", "lxml", "--docbook-xsl", docbook_xsl])
+    assert ret==2
+    captured = capsys.readouterr()
+    assert captured.err == "db2qthelp: error: the lxml XSLT backend needs lxml to be installed...\n"